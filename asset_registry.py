@@ -0,0 +1,52 @@
+"""进程内共享的贴图/动画帧缓存：同一个key只加载一次，所有实例拿到的是同一份
+
+敌人和掉落物的贴图总共只有几份，一直留到进程结束，不计引用也不释放（游戏没有换关、重开，
+释放了下一只同类敌人生成时还得再加载）。拿到的贴图和帧是共享的，调用方不能在上面画东西或改透明度，
+需要改的话先copy()。
+"""
+
+
+class AssetRegistry:
+    def __init__(self):
+        self.assets = {}  # key -> 资源
+        self.loads = 0  # 真正调用loader的次数
+
+    def __contains__(self, key):
+        return key in self.assets
+
+    def __len__(self):
+        return len(self.assets)
+
+    def get(self, key, loader):
+        """取key对应的资源，没有时调用loader()加载"""
+        asset = self.assets.get(key)
+        if asset is None and key not in self.assets:
+            asset = loader()
+            self.assets[key] = asset
+            self.loads += 1
+        return asset
+
+    def clear(self):
+        self.assets.clear()
+
+    def stats(self):
+        return {"entries": len(self.assets), "loads": self.loads}
+
+
+_registry = AssetRegistry()
+
+
+def get_registry():
+    return _registry
+
+
+def set_registry(registry):
+    """替换共用的缓存，返回旧的"""
+    global _registry
+    old = _registry
+    _registry = registry
+    return old
+
+
+def get(key, loader):
+    return _registry.get(key, loader)
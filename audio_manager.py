@@ -1,5 +1,6 @@
 import pygame
 import os
+import preloader
 from enum import Enum
 
 class SoundCategory(Enum):
@@ -40,7 +41,7 @@ class AudioManager:
     def _load_sounds(self):
         def load(category, name, path, volume=0.5):
             try:
-                sound = pygame.mixer.Sound(path)
+                sound = preloader.load_sound(path)
                 sound.set_volume(volume * self.volumes[category])
                 self.sounds[category][name] = sound
             except Exception as e:
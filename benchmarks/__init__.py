@@ -0,0 +1,5 @@
+"""游戏主循环热点的基准测试
+
+    python -m benchmarks --out results.json
+    python -m benchmarks --compare results.json   # 和之前的结果对比
+"""
@@ -0,0 +1,53 @@
+import sys
+import json
+import argparse
+
+from benchmarks.harness import BENCHMARKS, init_headless, run_benchmark, environment_info
+
+BENCH_MODULES = ("bench_map", "bench_pathfinding", "bench_world", "bench_assets")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="运行游戏热点基准测试，结果输出为JSON")
+    parser.add_argument("--out", help="结果JSON路径（默认只打印）")
+    parser.add_argument("--compare", help="与之前保存的结果JSON对比")
+    parser.add_argument("--filter", default="", help="只运行名字包含该字符串的基准")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="每个基准重复几轮，取最快的一轮")
+    parser.add_argument("--quick", action="store_true", help="迭代次数缩小到1/10，用于冒烟检查")
+    args = parser.parse_args(argv)
+
+    init_headless()
+    for module in BENCH_MODULES:
+        __import__(f"benchmarks.{module}")
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f).get("results", {})
+
+    results = {}
+    for bench in BENCHMARKS:
+        if args.filter not in bench.name:
+            continue
+        result = run_benchmark(bench, seed=args.seed, repeat=args.repeat, scale=0.1 if args.quick else 1.0)
+        results[bench.name] = result
+        line = f"{bench.name:<32} {result['ms_per_op']:10.4f} ms/{bench.unit:<12} {result['ops_per_sec']:12.1f} ops/s"
+        old = baseline.get(bench.name)
+        if old:
+            line += f"   {old['ms_per_op'] / result['ms_per_op']:6.2f}x"
+        print(line, flush=True)
+
+    report = {"environment": environment_info(), "seed": args.seed, "repeat": args.repeat,
+              "quick": args.quick, "results": results}
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"结果已写入 {args.out}")
+    else:
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+
+
+if __name__ == "__main__":
+    main()
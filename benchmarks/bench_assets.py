@@ -0,0 +1,81 @@
+"""角色动画帧和大图的冷启动加载：逐张PNG、图集、磁盘贴图缓存"""
+from benchmarks.harness import benchmark, fresh_state
+
+ATLAS_NAMES = ("player", "transform", "skeleton")
+
+
+def _load_character_frames():
+    """玩家（含变身、技能、弹幕）和骷髅启动时要加载的全部帧"""
+    from player import Player
+    from skeleton_enemy import SkeletonEnemy
+    player = Player.__new__(Player)
+    player._load_all_frames()
+    player._load_transform_frames()
+    player._load_bianshen_frames()
+    player._load_skill_frames()
+    player._load_bullet_frames()
+    SkeletonEnemy.__new__(SkeletonEnemy)._load_all_frames()
+
+
+@benchmark("assets.character_frames_files", iterations=5, unit="load")
+def character_frames_files(seed):
+    import sprite_atlas
+    fresh_state(seed)
+
+    def run():
+        for name in ATLAS_NAMES:
+            sprite_atlas.set_atlas(name, None)
+        _load_character_frames()
+        sprite_atlas.clear()
+    return run
+
+
+@benchmark("assets.character_frames_atlas", iterations=5, unit="load")
+def character_frames_atlas(seed):
+    import sprite_atlas
+    fresh_state(seed)
+
+    def run():
+        # 每次都清掉已加载的图集，测的是冷启动的一次解码
+        sprite_atlas.clear()
+        _load_character_frames()
+    return run
+
+
+# 冷启动时最大的几张图：两张图集和死亡画面
+_LARGE_IMAGES = ("assets/characters/atlas/transform.png", "assets/characters/atlas/skeleton.png", "assets/title/gg.png")
+
+
+def _load_large_images(cache):
+    import disk_cache
+    from preloader import AssetPreloader
+    old = disk_cache.set_cache(cache)
+    try:
+        import pygame
+        loader = AssetPreloader()
+        target = pygame.display.get_surface()
+        for path in _LARGE_IMAGES:
+            # 画一次：映射的像素第一次被读到时才真正从磁盘进内存，这部分也要计入
+            target.blit(loader.load_image(path), (0, 0))
+    finally:
+        disk_cache.set_cache(old)
+
+
+@benchmark("assets.large_images_png", iterations=5, unit="load")
+def large_images_png(seed):
+    fresh_state(seed)
+    return lambda: _load_large_images(None)
+
+
+@benchmark("assets.large_images_disk_cache", iterations=5, unit="load")
+def large_images_disk_cache(seed):
+    import tempfile
+    from disk_cache import SurfaceDiskCache
+    fresh_state(seed)
+    cache = SurfaceDiskCache(tempfile.mkdtemp(prefix="surface_cache_"))
+    _load_large_images(cache)  # 先写入缓存，计时的是命中后的加载
+    hits = cache.hits
+    _load_large_images(cache)
+    if cache.hits - hits != len(_LARGE_IMAGES):
+        raise RuntimeError(f"贴图缓存没有命中: {cache.stats()}")
+    return lambda: _load_large_images(cache)
@@ -0,0 +1,60 @@
+"""地图绘制和碰撞查询"""
+import random
+
+import pygame
+
+from benchmarks.harness import benchmark, fresh_state, load_map
+
+VIEW_W, VIEW_H = 320, 240  # 800x600窗口在2.5倍缩放下的可见区域
+
+
+def _random_cameras(map_manager, count, seed):
+    rng = random.Random(seed)
+    return [(rng.randint(0, map_manager.map_width - VIEW_W), rng.randint(0, map_manager.map_height - VIEW_H))
+            for _ in range(count)]
+
+
+@benchmark("map.draw_map", iterations=600, unit="frame")
+def draw_map(seed):
+    fresh_state(seed)
+    map_manager = load_map()
+    surface = pygame.Surface((VIEW_W, VIEW_H), pygame.SRCALPHA)
+    cameras = _random_cameras(map_manager, 600, seed)
+    state = {"i": 0}
+
+    def run():
+        camera_x, camera_y = cameras[state["i"] % len(cameras)]
+        state["i"] += 1
+        map_manager.draw_map(surface, camera_x, camera_y, VIEW_W, VIEW_H)
+    return run
+
+
+@benchmark("map.draw_collision_overlay", iterations=600, unit="frame")
+def draw_collision_overlay(seed):
+    fresh_state(seed)
+    map_manager = load_map()
+    map_manager.debug = True  # 碰撞显示只在debug模式下绘制
+    surface = pygame.Surface((VIEW_W, VIEW_H), pygame.SRCALPHA)
+    cameras = _random_cameras(map_manager, 600, seed)
+    state = {"i": 0}
+
+    def run():
+        camera_x, camera_y = cameras[state["i"] % len(cameras)]
+        state["i"] += 1
+        map_manager.draw_collision_overlay(surface, camera_x, camera_y, VIEW_W, VIEW_H)
+    return run
+
+
+@benchmark("map.is_valid_position", iterations=20, unit="10k queries")
+def is_valid_position(seed):
+    fresh_state(seed)
+    map_manager = load_map()
+    rng = random.Random(seed)
+    points = [(rng.uniform(-16, map_manager.map_width + 16), rng.uniform(-16, map_manager.map_height + 16))
+              for _ in range(10000)]
+    check = map_manager.is_valid_position
+
+    def run():
+        for x, y in points:
+            check(x, y)
+    return run
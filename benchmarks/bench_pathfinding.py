@@ -0,0 +1,169 @@
+"""Boss的A*寻路"""
+import random
+
+from benchmarks.harness import benchmark, fresh_state, load_map
+
+
+def random_queries(map_manager, count, seed):
+    """随机挑选(起点, 目标邻居格子列表)，和Boss追玩家时的调用方式一样"""
+    rng = random.Random(seed)
+    grid = map_manager.collision_map
+    walkable = [(x, y) for y in range(grid.height) for x in range(grid.width) if not grid.is_blocked(x, y)]
+    queries = []
+    for _ in range(count):
+        start = rng.choice(walkable)
+        target = rng.choice(walkable)
+        goals = [(target[0] + dx, target[1] + dy) for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1))
+                 if not grid.is_blocked(target[0] + dx, target[1] + dy)] or [target]
+        queries.append((start, goals))
+    return queries
+
+
+@benchmark("pathfinding.astar_multi_goal", iterations=200, unit="query")
+def astar_multi_goal(seed):
+    from enemy import BossEnemy
+    fresh_state(seed)
+    map_manager = load_map()
+    boss = BossEnemy((0, 0))
+    boss.set_map_manager(map_manager)
+    queries = random_queries(map_manager, 200, seed)
+    state = {"i": 0}
+
+    def run():
+        start, goals = queries[state["i"] % len(queries)]
+        state["i"] += 1
+        boss.astar_multi_goal(start, goals)
+    return run
+
+
+@benchmark("pathfinding.astar_reference", iterations=200, unit="query")
+def astar_reference(seed):
+    """原来的字典版A*，和astar_multi_goal使用同一组查询，用于对比"""
+    from pathfinding import astar_multi_goal_reference
+    fresh_state(seed)
+    map_manager = load_map()
+    queries = random_queries(map_manager, 200, seed)
+    state = {"i": 0}
+
+    def run():
+        start, goals = queries[state["i"] % len(queries)]
+        state["i"] += 1
+        astar_multi_goal_reference(map_manager.collision_map, start, goals)
+    return run
+
+
+@benchmark("pathfinding.flow_field_rebuild", iterations=200, unit="rebuild")
+def flow_field_rebuild(seed):
+    from pathfinding import FlowField
+    fresh_state(seed)
+    map_manager = load_map()
+    flow_field = FlowField(map_manager)
+    targets = [(x * map_manager.tile_width + 8, y * map_manager.tile_height + 8)
+               for (x, y), _ in random_queries(map_manager, 200, seed)]
+    state = {"i": 0}
+
+    def run():
+        # 每次换一个目标格子，强制重算整张流场
+        flow_field.update(targets[state["i"] % len(targets)])
+        state["i"] += 1
+    return run
+
+
+def _chase_sequence(map_manager, steps, seed):
+    """模拟Boss追玩家时的重新规划：每次要么玩家走了一格，要么Boss走了一格（玩家更频繁），偶尔进入脱困模式带一个临时障碍"""
+    rng = random.Random(seed)
+    grid = map_manager.collision_map
+    walkable = [(x, y) for y in range(grid.height) for x in range(grid.width) if not grid.is_blocked(x, y)]
+    target = rng.choice(walkable)
+    sequence = []
+    for _ in range(steps):
+        boss_moves = rng.random() < 0.25
+        if not boss_moves:
+            dx, dy = rng.choice(((-1, 0), (1, 0), (0, -1), (0, 1)))
+            if not grid.is_blocked(target[0] + dx, target[1] + dy):
+                target = (target[0] + dx, target[1] + dy)
+        goals = [(target[0] + dx, target[1] + dy) for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1))
+                 if not grid.is_blocked(target[0] + dx, target[1] + dy)] or [target]
+        sequence.append((goals, boss_moves, rng.random() < 0.1))
+    return rng.choice(walkable), sequence
+
+
+def _register_chase(name, make_planner):
+    @benchmark(name, iterations=400, unit="replan")
+    def chase(seed):
+        fresh_state(seed)
+        map_manager = load_map()
+        plan = make_planner(map_manager)
+        start, sequence = _chase_sequence(map_manager, 400, seed)
+        state = {"i": 0, "start": start}
+
+        def run():
+            goals, boss_moves, stuck = sequence[state["i"] % len(sequence)]
+            state["i"] += 1
+            start = state["start"]
+            path = plan(start, goals, {start} if stuck else None)
+            if boss_moves and len(path) > 1 and not stuck:
+                state["start"] = path[1]
+        return run
+    return chase
+
+
+def _grid_planner(map_manager):
+    from pathfinding import GridPathfinder
+    return GridPathfinder(map_manager).find_path
+
+
+def _cached_planner(map_manager):
+    from pathfinding import GridPathfinder
+    return GridPathfinder(map_manager).plan
+
+
+_register_chase("pathfinding.chase_full_astar", _grid_planner)
+_register_chase("pathfinding.chase_cached", _cached_planner)
+
+
+class _TiledMap:
+    """把关卡的碰撞地图平铺成factor x factor倍大小，模拟大地牢（只提供寻路器需要的接口）"""
+
+    def __init__(self, map_manager, factor):
+        from collision_grid import CollisionGrid
+        small = map_manager.collision_map
+        self.collision_map = CollisionGrid(small.width * factor, small.height * factor)
+        for y in range(self.collision_map.height):
+            row = small.cells[(y % small.height) * small.width:(y % small.height + 1) * small.width]
+            self.collision_map.cells[y * self.collision_map.width:(y + 1) * self.collision_map.width] = row * factor
+        self.collision_listeners = []
+
+    def add_collision_listener(self, callback):
+        self.collision_listeners.append(callback)
+
+    def remove_collision_listener(self, callback):
+        self.collision_listeners.remove(callback)
+
+
+def _register_large(name, make_planner):
+    @benchmark(name, iterations=50, unit="query")
+    def large(seed):
+        fresh_state(seed)
+        big = _TiledMap(load_map(), 8)
+        plan = make_planner(big)
+        queries = random_queries(big, 50, seed)
+        plan(*queries[0])  # 抽象图/邻居表在第一次查询时构建，不计入
+
+        state = {"i": 0}
+
+        def run():
+            start, goals = queries[state["i"] % len(queries)]
+            state["i"] += 1
+            plan(start, goals)
+        return run
+    return large
+
+
+def _hierarchical_planner(map_manager):
+    from pathfinding import HierarchicalPlanner
+    return HierarchicalPlanner(map_manager).plan
+
+
+_register_large("pathfinding.large_map_astar", _grid_planner)
+_register_large("pathfinding.large_map_hierarchical", _hierarchical_planner)
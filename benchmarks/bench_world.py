@@ -0,0 +1,155 @@
+"""敌人更新、爆炸粒子和HUD冷却按钮"""
+import os
+import random
+
+import pygame
+
+from benchmarks.harness import benchmark, fresh_state, load_map
+
+
+def _enemy_world(seed, enemy_count):
+    from player import Player
+    from enemy_manager import EnemyManager
+    clock = fresh_state(seed)
+    map_manager = load_map()
+    player = Player(map_manager.find_safe_spawn(), (map_manager.tile_width, map_manager.tile_height),
+                    map_manager.is_valid_position, map_manager=map_manager)
+    # 玩家不死，测的是稳定状态下的敌人开销
+    player.max_health = player.current_health = 10 ** 9
+    enemy_manager = EnemyManager(map_manager, player)
+    player.enemy_manager = enemy_manager
+    enemy_manager.max_enemies = enemy_count
+    enemy_manager.spawn_interval = float("inf")  # 计时期间不再刷怪
+    for _ in range(enemy_count * 4):
+        if len(enemy_manager.enemies) >= enemy_count:
+            break
+        enemy_manager.spawn_enemy()
+    player.set_enemies(enemy_manager.targets)
+    return clock, map_manager, enemy_manager
+
+
+def _register_enemy_update(enemy_count, iterations):
+    @benchmark(f"enemies.update_{enemy_count}", iterations=iterations, unit="frame")
+    def enemy_update(seed):
+        import game_clock
+        clock, map_manager, enemy_manager = _enemy_world(seed, enemy_count)
+
+        def run():
+            clock.advance()
+            enemy_manager.update(map_manager.is_valid_position, game_clock.FIXED_DT)
+        return run
+    return enemy_update
+
+
+for _count, _iterations in ((8, 600), (50, 300), (200, 120)):
+    _register_enemy_update(_count, _iterations)
+
+
+@benchmark("enemies.attack_query_200", iterations=2000, unit="query")
+def enemy_attack_query(seed):
+    """在玩家攻击框附近查找敌人（check_attacks和技能弹的判定都走这条路径）"""
+    _, map_manager, enemy_manager = _enemy_world(seed, 200)
+    rng = random.Random(seed)
+    rects = [pygame.Rect(rng.randrange(map_manager.map_width), rng.randrange(map_manager.map_height), 48, 48)
+             for _ in range(200)]
+    state = {"i": 0}
+
+    def run():
+        enemy_manager.enemies_in_rect(rects[state["i"] % len(rects)])
+        state["i"] += 1
+    return run
+
+
+@benchmark("enemies.find_safe_spawn", iterations=1000, unit="spawn")
+def enemy_find_safe_spawn(seed):
+    """敌人出生点抽样（普通敌人离玩家100像素，Boss 200像素）"""
+    _, _, enemy_manager = _enemy_world(seed, 8)
+    state = {"i": 0}
+
+    def run():
+        enemy_manager.find_safe_enemy_spawn(100 if state["i"] % 4 else 200)
+        state["i"] += 1
+    return run
+
+
+@benchmark("enemies.spawn_skeleton", iterations=200, unit="spawn")
+def enemy_spawn_skeleton(seed):
+    """生成一只骷髅；帧从asset_registry共享，只有第一只会真正加载"""
+    from skeleton_enemy import SkeletonEnemy
+    fresh_state(seed)
+
+    def run():
+        SkeletonEnemy((100, 100))
+    return run
+
+
+def _register_explosions(count, iterations):
+    @benchmark(f"effects.explosions_{count}", iterations=iterations, unit="frame")
+    def explosions(seed):
+        import game_clock
+        from effects import EffectManager
+        clock = fresh_state(seed)
+        effect_manager = EffectManager(particle_capacity=count)
+        for i in range(3):
+            effect_manager.create_explosion((200 + i * 40, 150), particle_count=count // 3)
+        surface = pygame.Surface((800, 600))
+
+        def run():
+            clock.advance()
+            effect_manager.update(game_clock.FIXED_DT)
+            effect_manager.draw(surface, 0, 0, 2.5)
+        return run
+    return explosions
+
+
+_register_explosions(3000, 60)
+# 远超游戏里实际的粒子数，用来看池子的上限
+_register_explosions(30000, 20)
+
+
+@benchmark("hud.skill_buttons", iterations=600, unit="frame")
+def hud_skill_buttons(seed):
+    from ui_manager import UIManager
+    fresh_state(seed)
+    ui_manager = UIManager(800, 600)
+    icons = [pygame.image.load(os.path.join("assets", "icon", name)).convert_alpha()
+             for name in ("bsicon.png", "attackicon.png", "dashicon.png", "skillicon1.png")]
+    base_icon = pygame.image.load(os.path.join("assets", "icon", "base.png")).convert_alpha()
+    surface = pygame.Surface((800, 600))
+    labels = (("L", (180, 255, 80)), ("J", (255, 180, 80)), ("K", (80, 180, 255)), ("I", (255, 255, 120)))
+    state = {"i": 0}
+
+    def run():
+        # 冷却比例每帧变化，四个按钮都在冷却中
+        remain = 1.0 - (state["i"] % 120) / 120
+        state["i"] += 1
+        for slot, (icon, (label, color)) in enumerate(zip(icons, labels)):
+            ui_manager.draw_skill_button(surface, icon, 500 + slot * 66, 532, label, color,
+                                         remain, 1.0, base_icon, 48, 6)
+    return run
+
+
+@benchmark("hud.skill_bar", iterations=600, unit="frame")
+def hud_skill_bar(seed):
+    """和hud.skill_buttons同样的四个按钮和冷却变化，走预缩放、按档位重绘的SkillBar"""
+    from types import SimpleNamespace
+    from ui_manager import UIManager, SkillBar, SkillSlot
+    fresh_state(seed)
+    ui_manager = UIManager(800, 600)
+    icons = [pygame.image.load(os.path.join("assets", "icon", name)).convert_alpha()
+             for name in ("bsicon.png", "attackicon.png", "dashicon.png", "skillicon1.png")]
+    base_icon = pygame.image.load(os.path.join("assets", "icon", "base.png")).convert_alpha()
+    surface = pygame.Surface((800, 600))
+    player = SimpleNamespace(remain=1.0)
+    labels = (("L", (180, 255, 80)), ("J", (255, 180, 80)), ("K", (80, 180, 255)), ("I", (255, 255, 120)))
+    slots = [SkillSlot(label, color, icon, lambda p: (p.remain, 1.0), row=1 if label == "I" else 0,
+                       column=0 if label == "I" else slot)
+             for slot, (icon, (label, color)) in enumerate(zip(icons, labels))]
+    skill_bar = SkillBar(800, 600, slots, ui_manager.key_font, base_icon)
+    state = {"i": 0}
+
+    def run():
+        player.remain = 1.0 - (state["i"] % 120) / 120
+        state["i"] += 1
+        skill_bar.draw(surface, player)
+    return run
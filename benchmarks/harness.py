@@ -0,0 +1,106 @@
+"""基准测试的公共部分：无窗口初始化、注册、计时和结果格式"""
+import os
+import sys
+import time
+import random
+import platform
+import subprocess
+import contextlib
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAP_PATH = "Tiled/myMap.tmx"
+
+BENCHMARKS = []  # 按注册顺序保存的Benchmark
+
+
+class Benchmark:
+    """一个基准：setup(seed)构造好状态并返回要计时的函数，每次调用算一个操作
+
+    每轮都重新setup，所以有状态的基准（敌人、粒子）在每轮里走的是同一段固定流程。
+    """
+
+    def __init__(self, name, setup, iterations, unit="op"):
+        self.name = name
+        self.setup = setup
+        self.iterations = iterations
+        self.unit = unit
+
+
+def benchmark(name, iterations, unit="op"):
+    """注册基准的装饰器"""
+    def register(setup):
+        BENCHMARKS.append(Benchmark(name, setup, iterations, unit))
+        return setup
+    return register
+
+
+def init_headless():
+    """dummy驱动初始化pygame，并切到仓库根目录（资源路径都是相对路径）"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.chdir(REPO_ROOT)
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    import pygame
+    pygame.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((800, 600))
+
+
+def fresh_state(seed):
+    """固定随机种子并换上一个新的游戏时钟"""
+    import game_clock
+    random.seed(seed)
+    clock = game_clock.GameClock()
+    game_clock.set_clock(clock)
+    return clock
+
+
+def load_map():
+    from map_manager import MapManager
+    # 不存在的二进制文件会让MapManager从仓库里的collision_map.json导入，保证每次数据一致
+    return MapManager(MAP_PATH, collision_file=os.path.join(REPO_ROOT, "benchmarks", ".none.bin"), debug=False)
+
+
+def run_benchmark(bench, seed=0, repeat=3, scale=1.0, quiet=True):
+    """每轮setup后调用iterations次，取最快的一轮"""
+    iterations = max(1, int(bench.iterations * scale))
+    best = None
+    output = open(os.devnull, "w") if quiet else sys.stdout
+    try:
+        with contextlib.redirect_stdout(output):
+            for _ in range(repeat):
+                func = bench.setup(seed)
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    func()
+                elapsed = time.perf_counter() - start
+                if best is None or elapsed < best:
+                    best = elapsed
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return {
+        "unit": bench.unit,
+        "iterations": iterations,
+        "seconds": best,
+        "ops_per_sec": iterations / best if best > 0 else float("inf"),
+        "ms_per_op": best * 1000 / iterations,
+    }
+
+
+def environment_info():
+    """记录运行环境，方便跨提交对比"""
+    import pygame
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                stdout=subprocess.PIPE, universal_newlines=True, timeout=10).stdout.strip()
+    except Exception:
+        commit = ""
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
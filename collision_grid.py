@@ -0,0 +1,181 @@
+import mmap
+import os
+import struct
+
+# 二进制碰撞文件：文件头(魔数, 版本, 宽, 高) + 按行对齐的位图，每行(width+7)//8字节，低位在前
+COLLISION_MAGIC = b"SRCM"
+COLLISION_VERSION = 1
+_HEADER = struct.Struct("<4sHHH")
+
+# 一个字节 <-> 8个格子的查找表，打包/解包时不用逐位运算
+_UNPACK_TABLE = [bytes((b >> i) & 1 for i in range(8)) for b in range(256)]
+_PACK_TABLE = {cells: b for b, cells in enumerate(_UNPACK_TABLE)}
+
+
+class CollisionGrid:
+    """紧凑的碰撞网格：每个格子一个字节（1=墙壁，0=可通行），按行优先存放在一个bytearray里
+
+    地图外的格子一律视为墙壁。修改过的行记录在dirty_rows里，保存时只需写回这些行。
+    """
+
+    def __init__(self, width, height, blocked=False):
+        self.width = width
+        self.height = height
+        self.cells = bytearray([1 if blocked else 0]) * (width * height)
+        self.dirty_rows = set()
+        self.version = 0  # 每次修改加1，依赖地图的缓存（流场等）据此判断是否过期
+
+    @classmethod
+    def from_rows(cls, rows):
+        """从JSON风格的二维bool列表创建"""
+        height = len(rows)
+        width = len(rows[0]) if height else 0
+        grid = cls(width, height)
+        cells = grid.cells
+        for y, row in enumerate(rows):
+            base = y * width
+            for x, blocked in enumerate(row):
+                if blocked:
+                    cells[base + x] = 1
+        return grid
+
+    def to_rows(self):
+        """导出为二维bool列表（用于JSON）"""
+        w = self.width
+        return [[bool(v) for v in self.cells[y * w:(y + 1) * w]] for y in range(self.height)]
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_blocked(self, x, y):
+        if x < 0 or y < 0 or x >= self.width or y >= self.height:
+            return True
+        return self.cells[y * self.width + x] != 0
+
+    def set_blocked(self, x, y, blocked):
+        if self.in_bounds(x, y):
+            self.cells[y * self.width + x] = 1 if blocked else 0
+            self.dirty_rows.add(y)
+            self.version += 1
+
+    def toggle(self, x, y):
+        """切换一个格子，返回切换后的状态"""
+        if not self.in_bounds(x, y):
+            return True
+        i = y * self.width + x
+        self.cells[i] ^= 1
+        self.dirty_rows.add(y)
+        self.version += 1
+        return self.cells[i] != 0
+
+    def toggle_rect(self, x0, y0, x1, y1):
+        """切换矩形[x0,x1]x[y0,y1]（含端点，已裁剪到地图内）里的每个格子"""
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(self.width - 1, x1), min(self.height - 1, y1)
+        cells = self.cells
+        for y in range(y0, y1 + 1):
+            base = y * self.width
+            for i in range(base + x0, base + x1 + 1):
+                cells[i] ^= 1
+        self.dirty_rows.update(range(y0, y1 + 1))
+        self.version += 1
+
+    def any_blocked(self, x0, y0, x1, y1):
+        """矩形[x0,x1]x[y0,y1]（含端点）里是否有墙壁；超出地图的部分算作墙壁"""
+        if x1 < x0 or y1 < y0:
+            return False
+        if x0 < 0 or y0 < 0 or x1 >= self.width or y1 >= self.height:
+            return True
+        cells = self.cells
+        w = self.width
+        for y in range(y0, y1 + 1):
+            base = y * w
+            # bytearray.find在C里扫描整行，比逐格判断快得多
+            if cells.find(1, base + x0, base + x1 + 1) != -1:
+                return True
+        return False
+
+    def test_cells(self, cells):
+        """批量查询格子坐标列表，返回对应的是否为墙壁列表"""
+        is_blocked = self.is_blocked
+        return [is_blocked(x, y) for x, y in cells]
+
+    def count_blocked(self):
+        return self.cells.count(1)
+
+    @property
+    def row_bytes(self):
+        return (self.width + 7) // 8
+
+    def pack_row(self, y):
+        """把第y行打包成位图字节"""
+        w = self.width
+        row = bytes(self.cells[y * w:(y + 1) * w])
+        row += bytes(self.row_bytes * 8 - w)  # 末尾补0凑满整字节
+        return bytes(_PACK_TABLE[row[i:i + 8]] for i in range(0, len(row), 8))
+
+    def unpack_row(self, y, data):
+        """把位图字节解包到第y行"""
+        w = self.width
+        self.cells[y * w:(y + 1) * w] = b"".join(_UNPACK_TABLE[b] for b in data)[:w]
+
+    def save_binary(self, path):
+        """完整写出二进制碰撞文件（先写临时文件再替换，避免写一半损坏）"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(COLLISION_MAGIC, COLLISION_VERSION, self.width, self.height))
+            for y in range(self.height):
+                f.write(self.pack_row(y))
+        os.replace(tmp_path, path)
+        self.dirty_rows.clear()
+
+    def patch_binary(self, path):
+        """只把dirty_rows写回已有的二进制文件；文件不存在或尺寸不符时返回False"""
+        if not self.dirty_rows:
+            return True
+        if read_binary_header(path) != (self.width, self.height):
+            return False
+        row_bytes = self.row_bytes
+        with open(path, 'r+b') as f:
+            rows = sorted(self.dirty_rows)
+            start = 0
+            # 相邻的脏行合并成一次写入
+            while start < len(rows):
+                end = start
+                while end + 1 < len(rows) and rows[end + 1] == rows[end] + 1:
+                    end += 1
+                f.seek(_HEADER.size + rows[start] * row_bytes)
+                f.write(b"".join(self.pack_row(y) for y in range(rows[start], rows[end] + 1)))
+                start = end + 1
+        self.dirty_rows.clear()
+        return True
+
+    @classmethod
+    def load_binary(cls, path):
+        """用mmap读取二进制碰撞文件"""
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                magic, version, width, height = _HEADER.unpack_from(mm, 0)
+                if magic != COLLISION_MAGIC or version != COLLISION_VERSION:
+                    raise ValueError(f"不支持的碰撞文件格式: {magic!r} v{version}")
+                grid = cls(width, height)
+                row_bytes = grid.row_bytes
+                if len(mm) < _HEADER.size + row_bytes * height:
+                    raise ValueError("碰撞文件长度不足")
+                offset = _HEADER.size
+                for y in range(height):
+                    grid.unpack_row(y, mm[offset:offset + row_bytes])
+                    offset += row_bytes
+        return grid
+
+
+def read_binary_header(path):
+    """读取二进制碰撞文件的(宽, 高)，文件无效时返回None"""
+    try:
+        with open(path, 'rb') as f:
+            magic, version, width, height = _HEADER.unpack(f.read(_HEADER.size))
+    except (OSError, struct.error):
+        return None
+    if magic != COLLISION_MAGIC or version != COLLISION_VERSION:
+        return None
+    return width, height
@@ -0,0 +1,132 @@
+"""转换好的贴图存到磁盘，下次启动不用再解码PNG、再缩放
+
+每个条目一个文件：文件头(魔数, 版本, 宽, 高, 行跨度, 像素格式, 源文件大小和修改时间) + convert_alpha之后的原始像素。
+读取时用mmap映射文件，pygame.image.frombuffer直接用映射的内存做像素，不经过PNG解码也不拷贝；
+源文件的大小或修改时间一变条目就作废，下次写入时覆盖。
+同一张图的缩放、裁剪等派生图用recipe区分（如"scale32x32"），生成逻辑变了recipe也要跟着变。
+"""
+import hashlib
+import mmap
+import os
+import struct
+import sys
+
+import pygame
+
+SURFACE_MAGIC = b"SRSF"
+SURFACE_VERSION = 2
+_HEADER = struct.Struct("<4sHHHI8sQq")
+# frombuffer支持的32位格式；传给frombuffer的一律用这里的常量字符串
+_FORMATS = {name.encode("ascii"): name for name in ("RGBA", "BGRA", "ARGB", "RGBX")}
+
+
+def pixel_format(surface):
+    """32位贴图按字节顺序的格式名（如"BGRA"），frombuffer不支持的格式返回None"""
+    if surface.get_bytesize() != 4:
+        return None
+    channels = []
+    for i in range(4):
+        shift = 8 * i if sys.byteorder == "little" else 8 * (3 - i)
+        for name, mask in zip("RGBA", surface.get_masks()):
+            if mask == 0xFF << shift:
+                channels.append(name)
+                break
+        else:
+            channels.append("X")
+    fmt = "".join(channels)
+    return fmt if fmt.encode("ascii") in _FORMATS else None
+
+
+class SurfaceDiskCache:
+    def __init__(self, cache_dir=".surface_cache"):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def entry_path(self, path, recipe=""):
+        name = hashlib.sha1(f"{os.path.normpath(path)}|{recipe}".encode("utf-8")).hexdigest()[:20]
+        return os.path.join(self.cache_dir, f"{name}.surf")
+
+    def read(self, path, recipe=""):
+        """读出缓存的贴图，没有或已过期时返回None；只做文件映射和frombuffer，可以在工作线程里调用
+
+        返回的贴图直接用映射的内存做像素（写时复制的私有映射，不会改到磁盘文件），
+        贴图持有映射的引用，贴图释放后映射才释放。像素格式就是写入时convert_alpha的格式。
+        """
+        entry = self.entry_path(path, recipe)
+        try:
+            stat = os.stat(path)
+            with open(entry, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        try:
+            magic, version, width, height, pitch, fmt, src_size, src_mtime = _HEADER.unpack_from(mm, 0)
+            fmt = _FORMATS.get(fmt.rstrip(b"\0"))
+            if (magic != SURFACE_MAGIC or version != SURFACE_VERSION or fmt is None
+                    or src_size != stat.st_size or src_mtime != stat.st_mtime_ns
+                    or len(mm) < _HEADER.size + pitch * height):
+                mm.close()
+                self.misses += 1
+                return None
+            pixels = memoryview(mm)[_HEADER.size:_HEADER.size + pitch * height]
+            if pitch != width * 4:
+                # 不传pitch给frombuffer：pygame 2.5带pitch创建的贴图释放时会崩溃，行有填充时先拼成紧凑的
+                row = width * 4
+                pixels = b"".join(pixels[y * pitch:y * pitch + row] for y in range(height))
+            surface = pygame.image.frombuffer(pixels, (width, height), fmt)
+        except (ValueError, struct.error, pygame.error):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return surface
+
+    def write(self, path, surface, recipe=""):
+        """把convert_alpha之后的贴图写入缓存，格式不支持或写入失败时返回False"""
+        fmt = pixel_format(surface)
+        if fmt is None:
+            return False
+        entry = self.entry_path(path, recipe)
+        tmp_path = f"{entry}.tmp"
+        try:
+            stat = os.stat(path)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            width, height = surface.get_size()
+            with open(tmp_path, "wb") as f:
+                f.write(_HEADER.pack(SURFACE_MAGIC, SURFACE_VERSION, width, height, surface.get_pitch(),
+                                     fmt.encode("ascii"), stat.st_size, stat.st_mtime_ns))
+                f.write(surface.get_buffer().raw)
+            os.replace(tmp_path, entry)
+        except (OSError, pygame.error) as e:
+            print(f"写入贴图缓存失败 {path}: {e}")
+            return False
+        self.writes += 1
+        return True
+
+    def clear(self):
+        """删掉所有缓存条目"""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for fname in os.listdir(self.cache_dir):
+            if fname.endswith(".surf"):
+                os.remove(os.path.join(self.cache_dir, fname))
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "writes": self.writes}
+
+
+_cache = SurfaceDiskCache()
+
+
+def get_cache():
+    return _cache
+
+
+def set_cache(cache):
+    """替换共用的磁盘缓存（传None表示不用），返回旧的"""
+    global _cache
+    old = _cache
+    _cache = cache
+    return old
@@ -1,13 +1,43 @@
 import pygame
 from pathlib import Path
-import time
+import game_clock
 import random
-import heapq
 import math
+from pathfinding import create_planner
+import sprite_cache
+import asset_registry
+import preloader
+
+
+def move_with_collision(entity, move_x, move_y, is_valid_position):
+    """按(move_x, move_y)移动entity的float坐标，以中心点判定碰撞，返回实际移动的(dx, dy)
+
+    有map_manager时用扫掠一次求出不穿墙的最远位置，否则退回到只检测终点的is_valid_position。
+    """
+    cx = entity.float_x + entity.rect.width // 2
+    cy = entity.float_y + entity.rect.height // 2
+    if entity.map_manager:
+        new_cx, new_cy = entity.map_manager.sweep_rect(cx, cy, 1, 1, move_x, move_y)
+        entity.float_x += new_cx - cx
+        entity.float_y += new_cy - cy
+        return new_cx - cx, new_cy - cy
+    if is_valid_position(int(cx + move_x), int(cy + move_y)):
+        entity.float_x += move_x
+        entity.float_y += move_y
+        return move_x, move_y
+    return 0, 0
+
+
+def _crop_and_scale(size):
+    """裁掉透明边再缩放到size"""
+    return lambda img: pygame.transform.scale(img.subsurface(img.get_bounding_rect()), size)
+
 
 class Enemy:
     def __init__(self, pos, size=(24, 24)):
-        self.image = self.load_image(size)
+        # 贴图按加载函数和尺寸共享，同类敌人只加载一次
+        self.image = asset_registry.get((type(self).load_image.__qualname__, tuple(size)),
+                                        lambda: self.load_image(size))
         self.rect = self.image.get_rect()
         self.rect.topleft = pos
         self.float_x = float(self.rect.x)
@@ -30,7 +60,7 @@ class Enemy:
         self.patrol_center = pos
         self.patrol_dir = 1      # 1/-1，左右或上下巡逻
         self.patrol_axis = 'x'   # 'x'或'y'，巡逻方向
-        self.patrol_timer = time.time()  # 初始化为当前时间
+        self.patrol_timer = game_clock.now()  # 初始化为当前时间
         self.patrol_interval = 2.0  # 每隔2秒换方向
         self.state = 'patrol'    # 'patrol' or 'chase'
         # 防卡墙参数
@@ -46,12 +76,20 @@ class Enemy:
         self.orbit_attack_duration = 0.5  # 环绕动画时长（秒）
         self.orbit_attack_angle = 0
         self.orbit_attack_hit = False  # 防止多次判定
+        self.map_manager = None  # 由EnemyManager在生成时设置
+        self.flow_field = None  # EnemyManager共享的朝玩家的流场
+
+    def set_map_manager(self, map_manager):
+        self.map_manager = map_manager
+
+    def set_flow_field(self, flow_field):
+        self.flow_field = flow_field
 
     def load_image(self, size):
         ghost_path = Path("assets/characters/ghost.png")
         if ghost_path.exists():
-            img = pygame.image.load(str(ghost_path)).convert_alpha()
-            return pygame.transform.scale(img, size)
+            return preloader.load_image(str(ghost_path), f"scale{size[0]}x{size[1]}",
+                                        lambda img: pygame.transform.scale(img, size))
         else:
             img = pygame.Surface(size, pygame.SRCALPHA)
             pygame.draw.circle(img, (200, 200, 255), (size[0]//2, size[1]//2), size[0]//2)
@@ -70,7 +108,7 @@ class Enemy:
         # 检测是否卡住(位置长时间不变)
         if (abs(self.rect.x - self.last_position[0]) < 0.1 and 
             abs(self.rect.y - self.last_position[1]) < 0.1):
-            self.stuck_time += 0.016  # 假设每帧约16ms
+            self.stuck_time += game_clock.dt()
         else:
             self.stuck_time = 0
             self.last_position = (self.rect.x, self.rect.y)
@@ -98,12 +136,12 @@ class Enemy:
         
         # 更新无敌状态
         if self.invincible:
-            if time.time() - self.invincible_timer > self.invincible_duration:
+            if game_clock.now() - self.invincible_timer > self.invincible_duration:
                 self.invincible = False
         
         # 环绕攻击逻辑
         if self.attack_mode == "orbit" and self.orbit_attack_anim:
-            elapsed = time.time() - self.orbit_attack_start_time
+            elapsed = game_clock.now() - self.orbit_attack_start_time
             t = min(elapsed / self.orbit_attack_duration, 1.0)
             self.orbit_attack_angle = 360 * t
             if t >= 1.0:
@@ -125,7 +163,7 @@ class Enemy:
     
     def patrol(self):
         """巡逻行为的移动逻辑（只能单轴移动）"""
-        now = time.time()
+        now = game_clock.now()
         if now - self.patrol_timer > self.patrol_interval:
             self.patrol_dir *= -1
             self.patrol_axis = 'y' if self.patrol_axis == 'x' else 'x'
@@ -147,7 +185,7 @@ class Enemy:
     
     def unstuck(self):
         """当幽灵卡住时尝试脱困（无视碰撞）"""
-        now = time.time()
+        now = game_clock.now()
         if now - self.random_dir_timer > self.random_dir_interval:
             self.random_direction = (random.uniform(-1, 1), random.uniform(-1, 1))
             self.random_dir_timer = now
@@ -167,7 +205,7 @@ class Enemy:
         if not self.invincible and self.alive:
             self.current_health -= damage
             self.invincible = True
-            self.invincible_timer = time.time()
+            self.invincible_timer = game_clock.now()
             if self.current_health <= 0:
                 self.current_health = 0
                 self.alive = False
@@ -180,7 +218,7 @@ class Enemy:
         # 受伤时闪烁
         visible = True
         if self.invincible:
-            visible = int(time.time() * 10) % 2 == 0
+            visible = int(game_clock.now() * 10) % 2 == 0
         if visible:
             surface.blit(self.image, (x, y))
         # 绘制血条
@@ -188,8 +226,7 @@ class Enemy:
         # 调试：绘制碰撞体和攻击范围
         if show_debug_hitbox:
             # 敌人碰撞体
-            debug_rect = pygame.Surface((self.rect.width, self.rect.height), pygame.SRCALPHA)
-            pygame.draw.rect(debug_rect, (255, 0, 0, 128), debug_rect.get_rect())
+            debug_rect = sprite_cache.rect(self.rect.size, (255, 0, 0), 128)
             surface.blit(debug_rect, (self.rect.x - camera_x, self.rect.y - camera_y))
             # 攻击范围（假设攻击时有attack_rect属性）
             if hasattr(self, 'attacking') and self.attacking and hasattr(self, 'attack_rect'):
@@ -208,7 +245,7 @@ class Enemy:
     def try_attack(self, player):
         if not self.alive:
             return
-        now = time.time()
+        now = game_clock.now()
         px, py = player.rect.center
         ex, ey = self.rect.center
         dist = ((px - ex) ** 2 + (py - ey) ** 2) ** 0.5
@@ -221,7 +258,10 @@ class BossEnemy:
     def __init__(self, pos, size=(32, 32)):
         self.image = self.load_image(size)
         self.normal_image = self.image.copy()
-        self.attack_image = self.load_attack_image(size)
+        # 哈气图和弹幕图要到二阶段才用，先在后台预读，第一次用到时再convert、裁剪缩放
+        self.attack_image_asset = preloader.LazyAsset(lambda: self.load_attack_image(size),
+                                                      ["assets/characters/haqi.png"])
+        self.attack_image_asset.prefetch()
         self.rect = self.image.get_rect()
         self.rect.topleft = pos
         self.float_x = float(self.rect.x)
@@ -244,7 +284,7 @@ class BossEnemy:
         self.patrol_center = pos
         self.patrol_dir = 1
         self.patrol_axis = 'x'
-        self.patrol_timer = time.time()
+        self.patrol_timer = game_clock.now()
         self.patrol_interval = 3.0
         self.state = 'patrol'
         # 防卡墙参数
@@ -274,6 +314,7 @@ class BossEnemy:
         self.astar_interval = 0.3  # 每0.3秒寻路一次
         self.last_astar_target = None
         self.map_manager = None  # 需要在创建Boss时传入map_manager
+        self.pathfinder = None  # set_map_manager时按地图大小创建（格子A*或分层寻路）
         # 脱困相关
         self.stuck_time = 0
         self.stuck_threshold = 1.0  # 1秒未大幅移动判定为卡住
@@ -284,8 +325,9 @@ class BossEnemy:
         self.phase = 1
         self.phase2_triggered = False
         self.ha_bullets = []  # 存储弹幕
-        self.ha_img = None
-        self.load_ha_image((24, 24))  # 弹幕缩小一点更美观
+        self.ha_img_asset = preloader.LazyAsset(lambda: self.load_ha_image((24, 24)),  # 弹幕缩小一点更美观
+                                                ["assets/characters/ha.png"])
+        self.ha_img_asset.prefetch()
         self.phase2_particles = []  # 二阶段粒子特效
         self.phase2_particle_timer = 0
         self.phase2_tip = None  # (显示时间戳, alpha)
@@ -298,15 +340,15 @@ class BossEnemy:
 
     def set_map_manager(self, map_manager):
         self.map_manager = map_manager
+        if self.pathfinder:
+            self.pathfinder.close()
+        self.pathfinder = create_planner(map_manager)
 
     def load_image(self, size):
         boss_path = Path("assets/characters/maodie.png")
         if boss_path.exists():
             try:
-                img = pygame.image.load(str(boss_path)).convert_alpha()
-                rect = img.get_bounding_rect()
-                cropped_img = img.subsurface(rect)
-                return pygame.transform.scale(cropped_img, size)
+                return preloader.load_image(str(boss_path), f"crop_scale{size[0]}x{size[1]}", _crop_and_scale(size))
             except Exception as e:
                 print(f"加载Boss图片时出错: {e}，使用默认图形")
                 img = pygame.Surface(size, pygame.SRCALPHA)
@@ -317,14 +359,19 @@ class BossEnemy:
             pygame.draw.circle(img, (255, 200, 0), (size[0]//2, size[1]//2), size[0]//2)
             return img
 
+    @property
+    def attack_image(self):
+        return self.attack_image_asset.get()
+
+    @property
+    def ha_img(self):
+        return self.ha_img_asset.get()
+
     def load_attack_image(self, size):
         haqi_path = Path("assets/characters/haqi.png")
         if haqi_path.exists():
             try:
-                img = pygame.image.load(str(haqi_path)).convert_alpha()
-                rect = img.get_bounding_rect()
-                cropped_img = img.subsurface(rect)
-                return pygame.transform.scale(cropped_img, size)
+                return preloader.load_image(str(haqi_path), f"crop_scale{size[0]}x{size[1]}", _crop_and_scale(size))
             except Exception as e:
                 print(f"加载haqi图片时出错: {e}，使用默认图形")
                 img = pygame.Surface(size, pygame.SRCALPHA)
@@ -337,12 +384,13 @@ class BossEnemy:
 
     def load_ha_image(self, size):
         try:
-            img = pygame.image.load("assets/characters/ha.png").convert_alpha()
-            self.ha_img = pygame.transform.scale(img, size)
+            return preloader.load_image("assets/characters/ha.png", f"scale{size[0]}x{size[1]}",
+                                        lambda img: pygame.transform.scale(img, size))
         except Exception as e:
             print(f"加载ha弹幕图片失败: {e}")
-            self.ha_img = pygame.Surface(size, pygame.SRCALPHA)
-            pygame.draw.circle(self.ha_img, (255, 0, 0), (size[0]//2, size[1]//2), size[0]//2)
+            img = pygame.Surface(size, pygame.SRCALPHA)
+            pygame.draw.circle(img, (255, 0, 0), (size[0]//2, size[1]//2), size[0]//2)
+            return img
 
     def update(self, player, is_valid_position):
         if not self.alive:
@@ -352,9 +400,9 @@ class BossEnemy:
             self.phase = 2
             self.phase2_triggered = True
             print("Boss进入二阶段！无视碰撞")
-            self.phase2_tip = (time.time(), 255)  # 进入二阶段时触发提示
+            self.phase2_tip = (game_clock.now(), 255)  # 进入二阶段时触发提示
         # 更新加速状态
-        current_time = time.time()
+        current_time = game_clock.now()
         if self.is_dashing:
             if current_time - self.dash_timer >= self.dash_duration:
                 self.is_dashing = False
@@ -371,7 +419,7 @@ class BossEnemy:
             
         # 攻击动画计时
         if self.is_attacking:
-            if time.time() - self.attack_anim_timer > self.attack_anim_duration:
+            if game_clock.now() - self.attack_anim_timer > self.attack_anim_duration:
                 self.is_attacking = False
                 self.image = self.normal_image
             
@@ -384,7 +432,7 @@ class BossEnemy:
         # --- 卡住检测 ---
         move_dist = ((self.float_x - self.last_position[0]) ** 2 + (self.float_y - self.last_position[1]) ** 2) ** 0.5
         if move_dist < 1.0:
-            self.stuck_time += 0.016
+            self.stuck_time += game_clock.dt()
         else:
             self.stuck_time = 0
             self.last_position = (self.float_x, self.float_y)
@@ -397,7 +445,7 @@ class BossEnemy:
                 self.stuck_tile = self.get_tile_pos(self.rect.center)
         # 脱困模式
         if self.unstuck_mode:
-            self.unstuck_timer += 0.016
+            self.unstuck_timer += game_clock.dt()
             # 重新A*寻路，临时把卡住格子设为障碍
             player_tile = self.get_tile_pos(player.rect.center)
             my_tile = self.get_tile_pos(self.rect.center)
@@ -405,9 +453,8 @@ class BossEnemy:
             if self.map_manager:
                 for dx, dy in [(-1,0),(1,0),(0,-1),(0,1)]:
                     nx, ny = player_tile[0]+dx, player_tile[1]+dy
-                    if 0<=nx<self.map_manager.width and 0<=ny<self.map_manager.height:
-                        if not self.map_manager.collision_map[ny][nx]:
-                            neighbor_tiles.append((nx, ny))
+                    if not self.map_manager.collision_map.is_blocked(nx, ny):
+                        neighbor_tiles.append((nx, ny))
             if not neighbor_tiles:
                 neighbor_tiles = [player_tile]
             # 临时障碍
@@ -445,11 +492,11 @@ class BossEnemy:
         
         # 更新无敌状态
         if self.invincible:
-            if time.time() - self.invincible_timer > self.invincible_duration:
+            if game_clock.now() - self.invincible_timer > self.invincible_duration:
                 self.invincible = False
         
         # --- A*寻路 ---
-        self.astar_timer += 0.016  # 假设每帧16ms
+        self.astar_timer += game_clock.dt()
         player_tile = self.get_tile_pos(player.rect.center)
         my_tile = self.get_tile_pos(self.rect.center)
         # 计算玩家周围一圈可通行格子
@@ -457,9 +504,8 @@ class BossEnemy:
         if self.map_manager:
             for dx, dy in [(-1,0),(1,0),(0,-1),(0,1)]:
                 nx, ny = player_tile[0]+dx, player_tile[1]+dy
-                if 0<=nx<self.map_manager.width and 0<=ny<self.map_manager.height:
-                    if not self.map_manager.collision_map[ny][nx]:
-                        neighbor_tiles.append((nx, ny))
+                if not self.map_manager.collision_map.is_blocked(nx, ny):
+                    neighbor_tiles.append((nx, ny))
         # 如果没有可通行邻居，仍以玩家格子为目标
         if not neighbor_tiles:
             neighbor_tiles = [player_tile]
@@ -480,12 +526,12 @@ class BossEnemy:
             self.update_phase2_particles()
         # 发射ha后形象切回
         if hasattr(self, 'haqi_switch_time') and self.image == self.attack_image:
-            if time.time() - self.haqi_switch_time > 0.2:
+            if game_clock.now() - self.haqi_switch_time > 0.2:
                 self.image = self.normal_image
         
         # 环绕攻击逻辑
         if self.attack_mode == "orbit" and self.orbit_attack_anim:
-            elapsed = time.time() - self.orbit_attack_start_time
+            elapsed = game_clock.now() - self.orbit_attack_start_time
             t = min(elapsed / self.orbit_attack_duration, 1.0)
             self.orbit_attack_angle = 360 * t
             if t >= 1.0:
@@ -504,32 +550,22 @@ class BossEnemy:
             return
             
         # 优先移动距离更远的轴
+        step_x = self.move_speed * (1 if dx > 0 else -1)
+        step_y = self.move_speed * (1 if dy > 0 else -1)
         if abs(dx) > abs(dy):
-            move_x = self.move_speed * (1 if dx > 0 else -1)
-            next_x = self.float_x + move_x
-            if is_valid_position(int(next_x + self.rect.width//2), int(self.float_y + self.rect.height//2)):
-                self.float_x = next_x
-            else:
+            moved_x, _ = move_with_collision(self, step_x, 0, is_valid_position)
+            if moved_x == 0:
                 # X方向被阻挡，尝试Y方向
-                move_y = self.move_speed * (1 if dy > 0 else -1)
-                next_y = self.float_y + move_y
-                if is_valid_position(int(self.float_x + self.rect.width//2), int(next_y + self.rect.height//2)):
-                    self.float_y = next_y
+                move_with_collision(self, 0, step_y, is_valid_position)
         else:
-            move_y = self.move_speed * (1 if dy > 0 else -1)
-            next_y = self.float_y + move_y
-            if is_valid_position(int(self.float_x + self.rect.width//2), int(next_y + self.rect.height//2)):
-                self.float_y = next_y
-            else:
+            _, moved_y = move_with_collision(self, 0, step_y, is_valid_position)
+            if moved_y == 0:
                 # Y方向被阻挡，尝试X方向
-                move_x = self.move_speed * (1 if dx > 0 else -1)
-                next_x = self.float_x + move_x
-                if is_valid_position(int(next_x + self.rect.width//2), int(self.float_y + self.rect.height//2)):
-                    self.float_x = next_x
+                move_with_collision(self, step_x, 0, is_valid_position)
     
     def patrol(self, is_valid_position):
         """巡逻行为的移动逻辑（只能单轴移动，有碰撞检测）"""
-        now = time.time()
+        now = game_clock.now()
         if now - self.patrol_timer > self.patrol_interval:
             self.patrol_dir *= -1
             self.patrol_axis = 'y' if self.patrol_axis == 'x' else 'x'
@@ -548,17 +584,13 @@ class BossEnemy:
             self.patrol_dir *= -1
         # 只允许单轴移动并检测碰撞
         if move_x != 0:
-            next_x = self.float_x + move_x
-            if is_valid_position(int(next_x + self.rect.width//2), int(self.float_y + self.rect.height//2)):
-                self.float_x = next_x
+            move_with_collision(self, move_x, 0, is_valid_position)
         elif move_y != 0:
-            next_y = self.float_y + move_y
-            if is_valid_position(int(self.float_x + self.rect.width//2), int(next_y + self.rect.height//2)):
-                self.float_y = next_y
+            move_with_collision(self, 0, move_y, is_valid_position)
     
     def unstuck(self, is_valid_position):
         """当Boss卡住时尝试脱困 (有碰撞检测)"""
-        now = time.time()
+        now = game_clock.now()
         
         if now - self.random_dir_timer > self.random_dir_interval:
             self.random_direction = (random.uniform(-1, 1), random.uniform(-1, 1))
@@ -572,13 +604,8 @@ class BossEnemy:
             
         escape_speed = self.move_speed * 1.5
         
-        next_x = self.float_x + dir_x * escape_speed
-        if is_valid_position(int(next_x + self.rect.width//2), int(self.float_y + self.rect.height//2)):
-            self.float_x = next_x
-            
-        next_y = self.float_y + dir_y * escape_speed
-        if is_valid_position(int(self.float_x + self.rect.width//2), int(next_y + self.rect.height//2)):
-            self.float_y = next_y
+        move_with_collision(self, dir_x * escape_speed, 0, is_valid_position)
+        move_with_collision(self, 0, dir_y * escape_speed, is_valid_position)
             
         if is_valid_position(int(self.float_x + self.rect.width//2), int(self.float_y + self.rect.height//2)):
             if (abs(self.float_x - self.last_position[0]) > 0.5 or 
@@ -589,7 +616,7 @@ class BossEnemy:
         if not self.invincible and self.alive:
             self.current_health -= damage
             self.invincible = True
-            self.invincible_timer = time.time()
+            self.invincible_timer = game_clock.now()
             if self.current_health <= 0:
                 self.current_health = 0
                 self.alive = False
@@ -602,7 +629,7 @@ class BossEnemy:
     def try_attack(self, player):
         if not self.alive:
             return
-        now = time.time()
+        now = game_clock.now()
         px, py = player.rect.center
         ex, ey = self.rect.center
         dist = ((px - ex) ** 2 + (py - ey) ** 2) ** 0.5
@@ -613,7 +640,7 @@ class BossEnemy:
                         self.last_attack_time = now
                         # 攻击动画切换
                         self.is_attacking = True
-                        self.attack_anim_timer = time.time()
+                        self.attack_anim_timer = game_clock.now()
                         self.image = self.attack_image
             else:
                 # 二阶段无视距离直接发射弹幕
@@ -645,7 +672,7 @@ class BossEnemy:
         }
         self.ha_bullets.append(bullet)
         # 发射后0.2秒切回普通形象
-        self.haqi_switch_time = time.time()
+        self.haqi_switch_time = game_clock.now()
 
     def update_ha_bullets(self, player):
         for bullet in self.ha_bullets:
@@ -709,17 +736,16 @@ class BossEnemy:
                     draw_color = color[:3]
                 pygame.draw.circle(surface, draw_color, (px, py), 4)
             # 绘制动态光环
-            t = pygame.time.get_ticks() / 1000.0
+            t = game_clock.now()
             for r in range(self.rect.width//2+8, self.rect.width+8, 6):
                 alpha = int(80 + 40*math.sin(t*2 + r))
                 color = (255, 200, 50, alpha)
-                halo = pygame.Surface((r*2, r*2), pygame.SRCALPHA)
-                pygame.draw.circle(halo, color, (r, r), r, 2)
+                halo = sprite_cache.circle(r, color, alpha, 2)
                 surface.blit(halo, (cx-r, cy-r), special_flags=pygame.BLEND_RGBA_ADD)
         # 绘制加速粒子效果
         if self.is_dashing:
             for particle in self.dash_trail_particles:
-                alpha = int(255 * (1 - (time.time() - particle['birth']) / particle['life']))
+                alpha = int(255 * (1 - (game_clock.now() - particle['birth']) / particle['life']))
                 color = (*particle['color'][:3], alpha)
                 pygame.draw.circle(surface, color, 
                                  (int(particle['x'] - camera_x), 
@@ -728,7 +754,7 @@ class BossEnemy:
         # 受伤时闪烁
         visible = True
         if self.invincible:
-            visible = int(time.time() * 10) % 2 == 0
+            visible = int(game_clock.now() * 10) % 2 == 0
         if visible:
             surface.blit(self.image, (x, y))
         # Boss血条加长并居中
@@ -741,13 +767,13 @@ class BossEnemy:
             by = bullet['y'] - camera_y - bullet['img'].get_height()//2
             # 计算缩放比例，最大2.5倍
             scale = min(1.0 + bullet['age'] * 0.02, 2.5)
-            img = pygame.transform.rotozoom(bullet['img'], 0, scale)
+            img = sprite_cache.rotozoom(bullet['img'], 0, scale)
             img_rect = img.get_rect(center=(bullet['x']-camera_x, bullet['y']-camera_y))
             surface.blit(img, img_rect)
         # ====== 新增：绘制"飞升喵星！"浮动提示 ======
         if self.phase2_tip and font is not None:
             start_time, _ = self.phase2_tip
-            elapsed = time.time() - start_time
+            elapsed = game_clock.now() - start_time
             duration = 2  # 总显示时长（秒）
             fade_duration = 0.8  # 渐隐时长
             if elapsed < duration:
@@ -788,8 +814,7 @@ class BossEnemy:
         # ====== 新增结束 ======
         # 调试：绘制碰撞体和攻击范围
         if show_debug_hitbox:
-            debug_rect = pygame.Surface((self.rect.width, self.rect.height), pygame.SRCALPHA)
-            pygame.draw.rect(debug_rect, (255, 0, 0, 128), debug_rect.get_rect())
+            debug_rect = sprite_cache.rect(self.rect.size, (255, 0, 0), 128)
             surface.blit(debug_rect, (self.rect.x - camera_x, self.rect.y - camera_y))
             # 攻击范围（假设攻击时有attack_rect属性）
             if hasattr(self, 'attacking') and self.attacking and hasattr(self, 'attack_rect'):
@@ -828,8 +853,8 @@ class BossEnemy:
     def trigger_dash(self):
         """触发加速能力"""
         self.is_dashing = True
-        self.dash_timer = time.time()
-        self.last_dash_time = time.time()
+        self.dash_timer = game_clock.now()
+        self.last_dash_time = game_clock.now()
         self.move_speed = 3.5  # 提升速度
         # 切换到加速状态图片
         self.image = self.attack_image
@@ -843,13 +868,13 @@ class BossEnemy:
                 'x': self.rect.centerx,
                 'y': self.rect.centery,
                 'life': 0.5,  # 粒子生命周期
-                'birth': time.time(),
+                'birth': game_clock.now(),
                 'color': (255, 200, 0, 128)  # 半透明的金色
             })
 
     def update_dash_particles(self):
         """更新加速粒子效果"""
-        current_time = time.time()
+        current_time = game_clock.now()
         # 生成新的粒子
         if random.random() < 0.3:  # 30%的概率生成新粒子
             self.generate_dash_particles()
@@ -875,27 +900,17 @@ class BossEnemy:
             return
         move_x = self.move_speed * dx / dist
         move_y = self.move_speed * dy / dist
-        next_x = self.float_x + move_x
-        next_y = self.float_y + move_y
         
         # 二阶段无视碰撞直接移动
         if self.phase == 2:
-            self.float_x = next_x
-            self.float_y = next_y
+            self.float_x += move_x
+            self.float_y += move_y
             return
             
-        if is_valid_position(int(next_x + self.rect.width//2), int(next_y + self.rect.height//2)):
-            self.float_x = next_x
-            self.float_y = next_y
+        move_with_collision(self, move_x, move_y, is_valid_position)
 
     def astar_multi_goal(self, start, goals, avoid_tiles=None):
         # A*算法，目标为goals中的任意一个，avoid_tiles为临时障碍集合
-        width = self.map_manager.width
-        height = self.map_manager.height
-        collision = self.map_manager.collision_map
-        if avoid_tiles is None:
-            avoid_tiles = set()
-            
         # 二阶段无视碰撞，直接返回目标路径
         if self.phase == 2:
             # 如果有多个目标，选择最近的
@@ -906,40 +921,12 @@ class BossEnemy:
                 return [start, goals[0]]
             else:
                 return [start]
-                
-        def heuristic(a, b):
-            return abs(a[0] - b[0]) + abs(a[1] - b[1])
-        open_set = []
-        heapq.heappush(open_set, (0, start))
-        came_from = {}
-        g_score = {start: 0}
-        f_score = {start: min(heuristic(start, g) for g in goals)}
-        goal_set = set(goals)
-        while open_set:
-            _, current = heapq.heappop(open_set)
-            if current in goal_set:
-                # 回溯路径
-                path = [current]
-                while current in came_from:
-                    current = came_from[current]
-                    path.append(current)
-                path.reverse()
-                return path
-            for dx, dy in [(-1,0),(1,0),(0,-1),(0,1)]:
-                neighbor = (current[0]+dx, current[1]+dy)
-                if 0<=neighbor[0]<width and 0<=neighbor[1]<height:
-                    if collision[neighbor[1]][neighbor[0]] or neighbor in avoid_tiles:
-                        continue
-                    tentative_g = g_score[current] + 1
-                    if neighbor not in g_score or tentative_g < g_score[neighbor]:
-                        came_from[neighbor] = current
-                        g_score[neighbor] = tentative_g
-                        f_score[neighbor] = tentative_g + min(heuristic(neighbor, g) for g in goals)
-                        heapq.heappush(open_set, (f_score[neighbor], neighbor))
-        return [start]  # 找不到路径时只返回起点 
+        if self.pathfinder is None or self.pathfinder.map_manager is not self.map_manager:
+            self.set_map_manager(self.map_manager)
+        return self.pathfinder.plan(start, goals, avoid_tiles)
 
     def attack(self):
-        current_time = time.time()
+        current_time = game_clock.now()
         if self.attack_mode == "orbit":
             if not self.orbit_attack_anim and current_time - self.attack_last_time >= self.attack_cooldown:
                 self.orbit_attack_anim = True
@@ -967,7 +954,5 @@ class BossEnemy:
             sword_y = center[1] + radius * math.sin(angle_rad)
             # 剑柄始终朝向玩家
             sword_angle = angle_deg + 90
-            rotated_sword = pygame.transform.rotate(self.sword_img, -sword_angle)
-            sword_rect = rotated_sword.get_rect(center=(sword_x, sword_y))
-            return sword_rect
+            return sprite_cache.rotated_rect(self.sword_img, -sword_angle, (sword_x, sword_y))
         return pygame.Rect(0, 0, 0, 0) 
\ No newline at end of file
@@ -3,6 +3,9 @@ from enemy import Enemy, BossEnemy
 from skeleton_enemy import SkeletonEnemy
 import pygame
 from weapon_drop import WeaponDrop
+from pathfinding import FlowField
+from spatial_hash import SpatialHash
+from spawn_index import SpawnIndex
 
 class EnemyManager:
     def __init__(self, map_manager, player):
@@ -18,6 +21,13 @@ class EnemyManager:
         self.boss_spawned = False
         self.on_boss_spawn = None  # Boss出现回调
         self.weapon_drop = None  # 添加武器掉落物属性
+        # 所有追击的敌人共用一张朝玩家的流场，玩家换格子时才重算
+        self.flow_field = FlowField(map_manager)
+        # 敌人和Boss的空间索引，随移动更新，攻击判定和技能弹只查附近的格子
+        self.spatial_index = SpatialHash(cell_size=64)
+        self.targets = []  # 活着的敌人（含Boss），只在增删时重建，供Player.set_enemies直接使用
+        # 可出生格子的索引，碰撞地图修改时同步；可用spawn_index.add_zone设置加权出生区域
+        self.spawn_index = SpawnIndex(map_manager)
         
         # 初始生成2只骷髅
         self.spawn_initial_enemies()
@@ -42,7 +52,11 @@ class EnemyManager:
                     enemy = Enemy(pos)
                 # 调高巡逻范围
                 enemy.patrol_range = 180  # 或更大，根据地图大小调整
+                enemy.set_map_manager(self.map_manager)
+                enemy.set_flow_field(self.flow_field)
                 self.enemies.append(enemy)
+                self.spatial_index.insert(enemy, enemy.rect)
+                self._refresh_targets()
                 print(f"生成了一个新的{'骷髅' if isinstance(enemy, SkeletonEnemy) else '幽灵'}敌人，当前敌人数: {len(self.enemies)}")
             else:
                 print("未找到安全的敌人出生点，本次不生成敌人。")
@@ -57,6 +71,11 @@ class EnemyManager:
                 self.boss.patrol_range = 300  # Boss巡逻范围更大
                 self.boss.enemy_manager = self  # 关键：让Boss能访问manager
                 self.boss_spawned = True
+                self.spatial_index.insert(self.boss, self.boss.rect)
+                self._refresh_targets()
+                # 打败Boss才能拿到耄耋之卵，这时候开始在后台预读变身相关的帧
+                if hasattr(self.player, 'prefetch_transform_assets'):
+                    self.player.prefetch_transform_assets()
                 # 播放BGM
                 try:
                     pygame.mixer.music.load("assets/bgm/mdam.mp3")
@@ -71,21 +90,8 @@ class EnemyManager:
                 print("未找到安全的Boss出生点，Boss未生成。")
     
     def find_safe_enemy_spawn(self, min_distance_from_player=64):
-        """查找安全的敌人出生点，不能在墙壁里"""
-        valid_positions = []
-        px, py = self.player.position
-        for y in range(1, self.map_manager.height - 1):
-            for x in range(1, self.map_manager.width - 1):
-                # 不能在墙壁里
-                if not self.map_manager.collision_map[y][x]:
-                    pos_x = x * self.map_manager.tile_width
-                    pos_y = y * self.map_manager.tile_height
-                    # 确保离玩家有一定距离
-                    if ((pos_x - px) ** 2 + (pos_y - py) ** 2) ** 0.5 > min_distance_from_player:
-                        valid_positions.append((pos_x, pos_y))
-        if valid_positions:
-            return random.choice(valid_positions)
-        return None
+        """查找安全的敌人出生点：不在墙壁里（不含地图最外一圈），离玩家超过min_distance_from_player像素"""
+        return self.spawn_index.sample(self.player.position, min_distance_from_player)
     
     def update(self, is_valid_position, delta_time):
         # 更新敌人生成计时器（只有在Boss不存在时才生成新敌人）
@@ -96,13 +102,18 @@ class EnemyManager:
                 self.spawn_enemy()
         
         # 更新所有敌人
+        if self.enemies:
+            self.flow_field.update(self.player.rect.center)
         for enemy in self.enemies[:]:  # 使用副本遍历，以便安全删除
             enemy.update(self.player, is_valid_position)
             enemy.try_attack(self.player)
+            self.spatial_index.update(enemy, enemy.rect)
             
             # 检查是否已死亡并需要清除
             if not enemy.alive:
                 self.enemies.remove(enemy)
+                self.spatial_index.remove(enemy)
+                self._refresh_targets()
                 self.killed_count += 1
                 print(f"击败了一个敌人！已击败: {self.killed_count}/{self.boss_spawn_threshold}")
                 # 玩家击杀回血
@@ -116,13 +127,33 @@ class EnemyManager:
         if self.boss and self.boss.alive:
             self.boss.update(self.player, is_valid_position)
             self.boss.try_attack(self.player)
+            self.spatial_index.update(self.boss, self.boss.rect)
+        elif self.boss and self.boss in self.spatial_index:
+            self.spatial_index.remove(self.boss)
+            self._refresh_targets()
+
+    def _refresh_targets(self):
+        targets = list(self.enemies)
+        if self.boss and self.boss.alive:
+            targets.append(self.boss)
+        self.targets = targets
+
+    def enemies_in_rect(self, rect, margin=0):
+        """与rect相交的活着的普通敌人（不含Boss），按生成顺序"""
+        return [enemy for enemy in self.spatial_index.query_rect(rect, margin)
+                if enemy is not self.boss and enemy.alive]
+
+    def enemies_in_radius(self, pos, radius):
+        """碰撞框与以pos为圆心的圆相交的活着的普通敌人（不含Boss），按生成顺序"""
+        return [enemy for enemy in self.spatial_index.query_radius(pos[0], pos[1], radius)
+                if enemy is not self.boss and enemy.alive]
     
     def check_attacks(self, attack_rect):
         """检查玩家攻击是否命中敌人或Boss"""
         hit = False
         # 检查是否命中普通敌人
-        for enemy in self.enemies:
-            if enemy.alive and attack_rect.colliderect(enemy.rect):
+        for enemy in self.enemies_in_rect(attack_rect):
+            if attack_rect.colliderect(enemy.rect):
                 enemy.take_damage(self.player.attack_damage)
                 hit = True
                 if hasattr(self.player, 'play_hit_sound'):
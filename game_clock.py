@@ -0,0 +1,50 @@
+"""游戏内的模拟时钟
+
+玩法相关的计时（冷却、无敌、动画、特效寿命）都从这里读时间，而不是直接调用time.time()。
+主循环每走一个固定步长就advance一次，暂停时不走；无窗口模拟可以用任意速度推进。
+"""
+
+FIXED_DT = 1 / 60  # 固定步长（秒）
+
+# 起始时间取一个较大的值：很多冷却计时初始化为0，这样开局时它们都已经冷却完毕，和用time.time()时一致
+START_TIME = 1_000_000.0
+
+
+class GameClock:
+    def __init__(self, start_time=START_TIME, fixed_dt=FIXED_DT):
+        self.time = start_time
+        self.fixed_dt = fixed_dt
+        self.frame = 0
+
+    def now(self):
+        return self.time
+
+    def advance(self, dt=None):
+        """前进一个步长（默认fixed_dt）"""
+        self.time += self.fixed_dt if dt is None else dt
+        self.frame += 1
+
+
+_clock = GameClock()
+
+
+def get_clock():
+    return _clock
+
+
+def set_clock(clock):
+    """替换当前时钟（无窗口模拟、测试时注入自己的时钟），返回旧时钟"""
+    global _clock
+    old = _clock
+    _clock = clock
+    return old
+
+
+def now():
+    """当前的游戏时间（秒）"""
+    return _clock.time
+
+
+def dt():
+    """每一步的时长（秒），用于替代写死的1/60、0.016"""
+    return _clock.fixed_dt
@@ -10,6 +10,7 @@ class GameStateManager:
         self.current_state = GameState.RUNNING
         self.show_collision = False
         self.show_debug = False
+        self.show_profiler = False
         self.collision_modified = False
         self.auto_save_timer = 0
         self.AUTO_SAVE_INTERVAL = 60 * 30  # 30分钟自动保存一次
@@ -37,6 +38,10 @@ class GameStateManager:
             
     def toggle_debug_display(self):
         self.show_debug = not self.show_debug
+
+    def toggle_profiler_display(self):
+        self.show_profiler = not self.show_profiler
+        print(f"帧耗时分析: {'开启' if self.show_profiler else '关闭'}")
         
     def mark_collision_modified(self):
         if self.DEVELOPER_MODE:  # 只有在开发者模式下才能修改碰撞
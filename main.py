@@ -1,17 +1,22 @@
 import pygame
 import sys
 import time
+import game_clock
 import os
-import math
 from player import Player
 from map_manager import MapManager
 from enemy_manager import EnemyManager
 from effects import EffectManager
 from weapon_drop import WeaponDrop
 from game_state import GameState, GameStateManager
-from ui_manager import UIManager
+from ui_manager import UIManager, SkillBar, SkillSlot
 from audio_manager import AudioManager, SoundCategory
 from menu import GameMenu  # 导入新添加的菜单模块
+from simulation import step_world
+from profiler import FrameProfiler
+import sprite_cache
+import sprite_atlas
+import preloader
 
 # 初始化
 pygame.init()
@@ -25,19 +30,46 @@ screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
 pygame.display.set_caption("Tom's Dungeon")
 clock = pygame.time.Clock()
 
+# 菜单显示期间后台预读游戏要用的图片和音效，地图在菜单的主线程空闲帧里加载
+# 变身图集、Boss的哈气/弹幕图是按需加载的（Boss出现时才预读），这里不读
+PRELOAD_IMAGES = sprite_atlas.image_paths(("player", "skeleton")) + [
+    "assets/title/gg.png",
+    "assets/title/Bosswarning.png",
+    "assets/icon/dashicon.png",
+    "assets/icon/base.png",
+    "assets/icon/attackicon.png",
+    "assets/icon/bsicon.png",
+    "assets/icon/skillicon1.png",
+    "assets/characters/ghost.png",
+    "assets/characters/maodie.png",
+    "assets/weapon/maoluan.png",
+    "assets/weapon/swd2.png",
+]
+PRELOAD_SOUNDS = [
+    os.path.join("assets", "sound", name)
+    for name in ("hit.wav", "hitnone.wav", "firehit.wav", "dash.wav", "firedash.wav", "walk.wav",
+                 "hurt_out.wav", "Tom_Scream.wav", "death.wav", "wuhu.wav", "fireskill.wav", "pickup.wav",
+                 "transform.wav", "wind.wav", "boss_roar.wav")
+]
+asset_preloader = preloader.get_preloader()
+asset_preloader.start(PRELOAD_IMAGES, PRELOAD_SOUNDS)
+asset_preloader.add_task("map", lambda: MapManager("tiled/myMap.tmx", debug=True))
+
 # 显示主菜单
 menu = GameMenu(WINDOW_WIDTH, WINDOW_HEIGHT)
-start_game = menu.run(screen)
+start_game = menu.run(screen, asset_preloader)
 
 # 如果玩家选择了退出，menu.run会调用sys.exit()
 # 所以只有当玩家选择"开始游戏"时，才会继续下面的代码
 
-# 初始化各个管理器
+# 初始化各个管理器（菜单里没加载完的部分在这里补完）
 try:
-    map_manager = MapManager("tiled/myMap.tmx", debug=True)
+    map_manager = asset_preloader.result("map")
 except Exception as e:
     print(f"加载地图时出错: {e}")
     sys.exit(1)
+asset_preloader.finish()
+asset_preloader.close()
 
 # 摄像机参数
 ZOOM_LEVEL = 2.5
@@ -49,7 +81,8 @@ zoomed_height = int(WINDOW_HEIGHT / ZOOM_LEVEL)
 # 初始化玩家
 try:
     spawn_pos = map_manager.find_safe_spawn()
-    player = Player(spawn_pos, (map_manager.tile_width, map_manager.tile_height), map_manager.is_valid_position)
+    player = Player(spawn_pos, (map_manager.tile_width, map_manager.tile_height), map_manager.is_valid_position,
+                    map_manager=map_manager)
 except Exception as e:
     print(f"初始化玩家时出错: {e}")
     sys.exit(1)
@@ -61,11 +94,16 @@ effect_manager = EffectManager()
 game_state_manager = GameStateManager()
 ui_manager = UIManager(WINDOW_WIDTH, WINDOW_HEIGHT, game_state_manager)
 audio_manager = AudioManager()
+profiler = FrameProfiler()
 player.audio_manager = audio_manager  # 设置player的audio_manager引用
 
 # 全局变量
 # weapon_drop = None  # 武器掉落物（改为使用enemy_manager.weapon_drop）
 last_time = time.time()
+# 固定步长：逻辑每次前进game_clock.FIXED_DT，渲染帧之间的真实时间先攒进accumulator
+accumulator = 0.0
+MAX_FRAME_TIME = 0.25  # 单帧最多追赶的真实时间，防止卡顿后一次推进太多
+MAX_STEPS_PER_FRAME = 5
 
 # 新增：批量碰撞体编辑相关变量
 selecting = False
@@ -104,7 +142,7 @@ print("Boss相关回调注册完成")
 show_debug_hitbox = False
 
 try:
-    gg_img = pygame.image.load("assets/title/gg.png").convert_alpha()
+    gg_img = preloader.load_image("assets/title/gg.png")
 except Exception as e:
     gg_img = None
     print("死亡图片加载失败:", e)
@@ -114,7 +152,7 @@ gg_show_timer = 0  # 死亡动画结束后计时器
 # 在初始化部分加载dashicon.png
 try:
     dash_icon_path = os.path.join("assets", "icon", "dashicon.png")
-    dash_icon = pygame.image.load(dash_icon_path).convert_alpha()
+    dash_icon = preloader.load_image(dash_icon_path)
 except Exception as e:
     dash_icon = None
     print("Dash图标加载失败:", e)
@@ -122,7 +160,7 @@ except Exception as e:
 # 在初始化部分加载base.png
 try:
     base_icon_path = os.path.join("assets", "icon", "base.png")
-    base_icon = pygame.image.load(base_icon_path).convert_alpha()
+    base_icon = preloader.load_image(base_icon_path)
 except Exception as e:
     base_icon = None
     print("Base图标加载失败:", e)
@@ -130,7 +168,7 @@ except Exception as e:
 # 在初始化部分加载attackicon.png
 try:
     attack_icon_path = os.path.join("assets", "icon", "attackicon.png")
-    attack_icon = pygame.image.load(attack_icon_path).convert_alpha()
+    attack_icon = preloader.load_image(attack_icon_path)
 except Exception as e:
     attack_icon = None
     print("Attack图标加载失败:", e)
@@ -138,7 +176,7 @@ except Exception as e:
 # 在初始化部分加载bsicon.png
 try:
     bs_icon_path = os.path.join("assets", "icon", "bsicon.png")
-    bs_icon = pygame.image.load(bs_icon_path).convert_alpha()
+    bs_icon = preloader.load_image(bs_icon_path)
 except Exception as e:
     bs_icon = None
     print("变身图标加载失败:", e)
@@ -146,15 +184,26 @@ except Exception as e:
 # 在初始化部分加载skillicon.png
 try:
     skill_icon_path = os.path.join("assets", "icon", "skillicon1.png")
-    skill_icon = pygame.image.load(skill_icon_path).convert_alpha()
+    skill_icon = preloader.load_image(skill_icon_path)
 except Exception as e:
     skill_icon = None
     print("技能图标加载失败:", e)
 
+# 右下角技能栏：L变身（拿到耄耋之卵后显示，变身中不显示冷却）、J攻击、K冲刺，I技能（变身后显示在L上方）
+skill_bar = SkillBar(WINDOW_WIDTH, WINDOW_HEIGHT, [
+    SkillSlot("L", (180, 255, 80), bs_icon,
+              lambda p: (0, p.transform_cooldown) if p.transformed else p.get_transform_cooldown_info(),
+              visible=lambda p: getattr(p, 'has_maoluan', False), column=0),
+    SkillSlot("J", (255, 180, 80), attack_icon, lambda p: p.get_attack_cooldown_info(), column=1),
+    SkillSlot("K", (80, 180, 255), dash_icon, lambda p: p.get_dash_cooldown_info(), column=2),
+    SkillSlot("I", (255, 255, 120), skill_icon, lambda p: p.get_skill_cooldown_info(),
+              visible=lambda p: getattr(p, 'transformed', False), row=1, column=0),
+], ui_manager.key_font, base_icon)
+
 # 在初始化部分加载pickup.wav
 try:
     pickup_sound_path = os.path.join("assets", "sound", "pickup.wav")
-    pickup_sound = pygame.mixer.Sound(pickup_sound_path)
+    pickup_sound = preloader.load_sound(pickup_sound_path)
     pickup_sound.set_volume(0.5)
 except Exception as e:
     pickup_sound = None
@@ -166,13 +215,7 @@ while running:
     current_time = time.time()
     delta_time = current_time - last_time
     last_time = current_time
-    
-    # 技能按钮通用参数（每帧都重新计算，防止窗口尺寸变化导致坐标错误）
-    icon_size = 48
-    gap = 18
-    base_size = icon_size + 12
-    base_offset = 6
-    y_pos = WINDOW_HEIGHT - icon_size - 20
+    profiler.begin_frame()
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
@@ -217,6 +260,11 @@ while running:
                         enemy_manager.weapon_drop = None
                 elif event.key == pygame.K_TAB:
                     game_state_manager.toggle_debug_display()
+                elif event.key == pygame.K_F3:  # F3 帧耗时分析
+                    game_state_manager.toggle_profiler_display()
+                    profiler.set_enabled(game_state_manager.show_profiler)
+                elif event.key == pygame.K_F4:  # F4 导出帧耗时CSV（需先用F3开启记录）
+                    profiler.dump_csv()
                 elif event.key == pygame.K_c:
                     game_state_manager.toggle_collision_display()
                 elif event.key == pygame.K_k:
@@ -224,17 +272,17 @@ while running:
                 elif event.key == pygame.K_l:
                     if player.toggle_transform():
                         game_state_manager.console_tip = "变身状态切换！"
-                        game_state_manager.console_tip_timer = time.time()
+                        game_state_manager.console_tip_timer = game_clock.now()
                 elif event.key == pygame.K_i:
                     if player.use_skill():
                         game_state_manager.console_tip = "技能释放！"
-                        game_state_manager.console_tip_timer = time.time()
+                        game_state_manager.console_tip_timer = game_clock.now()
                 # 开发者控制台按键
                 elif game_state_manager.is_developer_mode():
                     if event.key == pygame.K_F1:  # 按F1生成耄耋之卵
                         enemy_manager.weapon_drop = WeaponDrop(player.rect.center, "assets/weapon/maoluan.png")
                         game_state_manager.console_tip = "已生成耄耋之卵"
-                        game_state_manager.console_tip_timer = time.time()
+                        game_state_manager.console_tip_timer = game_clock.now()
                     elif event.key == pygame.K_o:
                         show_debug_hitbox = not show_debug_hitbox
                         print(f"碰撞体/攻击范围显示: {'开启' if show_debug_hitbox else '关闭'}")
@@ -248,13 +296,16 @@ while running:
                     if game_state_manager.is_developer_mode():
                         if map_manager.save_collision_map():
                             game_state_manager.reset_auto_save()
+                        # Shift+S另外导出仓库里跟踪的collision_map.json
+                        if event.mod & pygame.KMOD_SHIFT:
+                            map_manager.export_collision_json()
                     else:
                         print("需要开启开发者模式才能保存碰撞地图")
                 elif event.key == pygame.K_d:
                     tile_x = player.rect.centerx // map_manager.tile_width
                     tile_y = player.rect.centery // map_manager.tile_height
                     print(f"玩家当前位置: 像素({player.position}) 瓦片({tile_x},{tile_y})")
-                    print(f"该位置是否为墙壁: {map_manager.collision_map[tile_y][tile_x]}")
+                    print(f"该位置是否为墙壁: {map_manager.collision_map.is_blocked(tile_x, tile_y)}")
                 elif event.key == pygame.K_h:
                     player.take_damage(10)
                     print(f"Player took damage! Health: {player.current_health}/{player.max_health}")
@@ -297,50 +348,30 @@ while running:
                 tile_y1 = max(0, map_y1 // map_manager.tile_height)
                 tile_y2 = min(map_manager.height-1, map_y2 // map_manager.tile_height)
                 # 批量切换碰撞体
-                for ty in range(tile_y1, tile_y2+1):
-                    for tx in range(tile_x1, tile_x2+1):
-                        map_manager.collision_map[ty][tx] = not map_manager.collision_map[ty][tx]
+                map_manager.toggle_collision_area(tile_x1, tile_y1, tile_x2, tile_y2)
                 game_state_manager.collision_modified = True
                 print(f"批量切换碰撞体：({tile_x1},{tile_y1}) 到 ({tile_x2},{tile_y2})")
 
+    profiler.lap("事件处理")
+
     if game_state_manager.current_state == GameState.RUNNING:
-        # 玩家移动
+        # 玩家移动、攻击和敌人更新（与无窗口模拟共用），按固定步长推进
         keys = pygame.key.get_pressed()
-        player.move(keys, map_manager.is_valid_position)
-        
-        # 更新玩家状态
-        player.update()
-        
-        # 环绕攻击模式下，动画期间每帧都判定一次
-        if player.attack_mode == "orbit" and player.orbit_attack_anim:
-            attack_rect = player.get_orbit_attack_rect()
-            if attack_rect.width > 0 and not player.orbit_attack_hit:
-                if enemy_manager.check_attacks(attack_rect):
-                    player.orbit_attack_hit = True
-        
-        # 更新敌人管理器
-        enemy_manager.update(map_manager.is_valid_position, delta_time)
-        
-        # 更新音频管理器
-        audio_manager.update(delta_time)
-
-        # 更新玩家的敌人列表
-        player.set_enemies(enemy_manager.enemies)
-        if enemy_manager.boss and enemy_manager.boss.alive:
-            player.set_enemies(enemy_manager.enemies + [enemy_manager.boss])
-
-        # 处理攻击按键
-        if keys[pygame.K_j]:
-            if player.attack():
+        accumulator += min(delta_time, MAX_FRAME_TIME)
+        steps = 0
+        while accumulator >= game_clock.FIXED_DT and steps < MAX_STEPS_PER_FRAME:
+            game_clock.get_clock().advance()
+            if step_world(player, map_manager, enemy_manager, keys, game_clock.FIXED_DT, audio_manager, profiler):
                 print("Player attacked!")
-                if player.attack_mode == "orbit":
-                    attack_rect = player.get_orbit_attack_rect()
-                    if attack_rect.width > 0:
-                        enemy_manager.check_attacks(attack_rect)
-                else:
-                    attack_rect = player.attack_rect
-                    enemy_manager.check_attacks(attack_rect)
-                
+            effect_manager.update(game_clock.FIXED_DT)
+            if enemy_manager.weapon_drop:
+                enemy_manager.weapon_drop.update()
+            profiler.lap("特效")
+            accumulator -= game_clock.FIXED_DT
+            steps += 1
+        if steps == MAX_STEPS_PER_FRAME:
+            accumulator = 0.0  # 追不上时丢弃剩余时间，而不是越积越多
+
         # 摄像机跟随逻辑
         camera_x = player.rect.centerx - zoomed_width // 2
         camera_y = player.rect.centery - zoomed_height // 2
@@ -355,26 +386,30 @@ while running:
         map_manager.draw_map(visible_area, camera_x, camera_y, zoomed_width, zoomed_height)
         if game_state_manager.show_collision:
             map_manager.draw_collision_overlay(visible_area, camera_x, camera_y, zoomed_width, zoomed_height)
+        profiler.lap("地图绘制")
         
         # 绘制敌人
         enemy_manager.draw(visible_area, camera_x, camera_y, ui_manager.font, show_debug_hitbox)
         
         # 绘制武器掉落物
         if enemy_manager.weapon_drop:
-            enemy_manager.weapon_drop.update()
             enemy_manager.weapon_drop.draw(visible_area, camera_x, camera_y)
             enemy_manager.weapon_drop.draw_pickup_prompt(visible_area, camera_x, camera_y, player.rect.center, ui_manager.font)
         
+        profiler.lap("敌人绘制")
+        
         # 绘制玩家
         player.draw(visible_area, camera_x, camera_y, show_debug_hitbox)
+        profiler.lap("玩家绘制")
         
         # 缩放并显示
         scaled_area = pygame.transform.scale(visible_area, (WINDOW_WIDTH, WINDOW_HEIGHT))
         screen.blit(scaled_area, (0, 0))
+        profiler.lap("缩放")
 
-        # 更新和绘制特效
-        effect_manager.update(delta_time)
+        # 绘制特效
         effect_manager.draw(screen, camera_x, camera_y, WINDOW_WIDTH / zoomed_width)
+        profiler.lap("特效")
 
         # 绘制UI
         if game_state_manager.show_debug:
@@ -390,105 +425,8 @@ while running:
         # 绘制玩家血条
         player.draw_health_bar(screen, 10, WINDOW_HEIGHT - 30, 200, 20)
 
-        # L键（变身）
-        if hasattr(player, 'has_maoluan') and player.has_maoluan and bs_icon:
-            x_bs = WINDOW_WIDTH - icon_size*3 - gap*2 - 20
-            if base_icon:
-                scaled_base = pygame.transform.smoothscale(base_icon, (base_size, base_size))
-                screen.blit(scaled_base, (x_bs - base_offset, y_pos - base_offset))
-            scaled_icon = pygame.transform.smoothscale(bs_icon, (icon_size, icon_size))
-            screen.blit(scaled_icon, (x_bs, y_pos))
-            # 冷却扇形遮罩
-            remain, total = player.get_transform_cooldown_info()
-            if not player.transformed and remain > 0 and total > 0:
-                ratio = remain / total
-                mask_surf = pygame.Surface((icon_size, icon_size), pygame.SRCALPHA)
-                center = (icon_size // 2, icon_size // 2)
-                radius = icon_size // 2
-                start_angle = -90
-                end_angle = start_angle + int(360 * ratio)
-                points = [center]
-                steps = max(6, int(60 * ratio))
-                for i in range(steps+1):
-                    angle = math.radians(start_angle + (end_angle - start_angle) * i / steps)
-                    x = center[0] + radius * math.cos(angle)
-                    y = center[1] + radius * math.sin(angle)
-                    points.append((x, y))
-                pygame.draw.polygon(mask_surf, (0, 0, 0, 120), points)
-                screen.blit(mask_surf, (x_bs, y_pos))
-            font = pygame.font.Font(None, 28)
-            l_text = font.render("L", True, (180, 255, 80))
-            l_rect = l_text.get_rect(bottomright=(x_bs + icon_size - 4, y_pos + icon_size - 2))
-            l_bg = pygame.Surface((l_rect.width+6, l_rect.height+2), pygame.SRCALPHA)
-            l_bg.fill((0,0,0,120))
-            screen.blit(l_bg, (l_rect.x-3, l_rect.y-1))
-            screen.blit(l_text, l_rect)
-
-        # J键（攻击）
-        if attack_icon:
-            x_j = WINDOW_WIDTH - icon_size*2 - gap - 20
-            if base_icon:
-                scaled_base = pygame.transform.smoothscale(base_icon, (base_size, base_size))
-                screen.blit(scaled_base, (x_j - base_offset, y_pos - base_offset))
-            scaled_icon = pygame.transform.smoothscale(attack_icon, (icon_size, icon_size))
-            screen.blit(scaled_icon, (x_j, y_pos))
-            remain, total = player.get_attack_cooldown_info()
-            if remain > 0 and total > 0:
-                ratio = remain / total
-                mask_surf = pygame.Surface((icon_size, icon_size), pygame.SRCALPHA)
-                center = (icon_size // 2, icon_size // 2)
-                radius = icon_size // 2
-                start_angle = -90
-                end_angle = start_angle + int(360 * ratio)
-                points = [center]
-                steps = max(6, int(60 * ratio))
-                for i in range(steps+1):
-                    angle = math.radians(start_angle + (end_angle - start_angle) * i / steps)
-                    x = center[0] + radius * math.cos(angle)
-                    y = center[1] + radius * math.sin(angle)
-                    points.append((x, y))
-                pygame.draw.polygon(mask_surf, (0, 0, 0, 120), points)
-                screen.blit(mask_surf, (x_j, y_pos))
-            font = pygame.font.Font(None, 28)
-            j_text = font.render("J", True, (255, 180, 80))
-            j_rect = j_text.get_rect(bottomright=(x_j + icon_size - 4, y_pos + icon_size - 2))
-            j_bg = pygame.Surface((j_rect.width+6, j_rect.height+2), pygame.SRCALPHA)
-            j_bg.fill((0,0,0,120))
-            screen.blit(j_bg, (j_rect.x-3, j_rect.y-1))
-            screen.blit(j_text, j_rect)
-
-        # K键（冲刺）
-        if dash_icon:
-            x_k = WINDOW_WIDTH - icon_size - 20
-            if base_icon:
-                scaled_base = pygame.transform.smoothscale(base_icon, (base_size, base_size))
-                screen.blit(scaled_base, (x_k - base_offset, y_pos - base_offset))
-            scaled_icon = pygame.transform.smoothscale(dash_icon, (icon_size, icon_size))
-            screen.blit(scaled_icon, (x_k, y_pos))
-            remain, total = player.get_dash_cooldown_info()
-            if remain > 0 and total > 0:
-                ratio = remain / total
-                mask_surf = pygame.Surface((icon_size, icon_size), pygame.SRCALPHA)
-                center = (icon_size // 2, icon_size // 2)
-                radius = icon_size // 2
-                start_angle = -90
-                end_angle = start_angle + int(360 * ratio)
-                points = [center]
-                steps = max(6, int(60 * ratio))
-                for i in range(steps+1):
-                    angle = math.radians(start_angle + (end_angle - start_angle) * i / steps)
-                    x = center[0] + radius * math.cos(angle)
-                    y = center[1] + radius * math.sin(angle)
-                    points.append((x, y))
-                pygame.draw.polygon(mask_surf, (0, 0, 0, 120), points)
-                screen.blit(mask_surf, (x_k, y_pos))
-            font = pygame.font.Font(None, 28)
-            k_text = font.render("K", True, (80, 180, 255))
-            k_rect = k_text.get_rect(bottomright=(x_k + icon_size - 4, y_pos + icon_size - 2))
-            k_bg = pygame.Surface((k_rect.width+6, k_rect.height+2), pygame.SRCALPHA)
-            k_bg.fill((0,0,0,120))
-            screen.blit(k_bg, (k_rect.x-3, k_rect.y-1))
-            screen.blit(k_text, k_rect)
+        # 技能栏（L/J/K，变身后还有I）
+        skill_bar.draw(screen, player)
 
         # 死亡动画播放完后，渐变放大显示gg图片
         if player.is_dead and gg_img:
@@ -498,6 +436,7 @@ while running:
                 duration = 3 # 渐变持续时间（秒）
                 progress = min(gg_show_timer / duration, 1.0)
                 scale = 0.3 + 0.7 * progress  # 从0.3倍放大到1倍
+                scale = round(scale * 50) / 50  # 按0.02一档取整，缩放结果可以缓存
                 alpha = int(255 * progress)   # 从0到255
                 # 缩放图片，最大不超过半屏
                 w, h = gg_img.get_size()
@@ -505,8 +444,11 @@ while running:
                 max_h = WINDOW_HEIGHT // 1
                 new_w = min(int(w * scale), max_w)
                 new_h = min(int(h * scale), max_h)
-                gg_scaled = pygame.transform.smoothscale(gg_img, (new_w, new_h))
-                gg_scaled.set_alpha(alpha)
+                gg_scaled = sprite_cache.smoothscale(gg_img, (new_w, new_h))
+                if alpha < 255:
+                    # 缓存里的缩放图是共用的，改透明度要在副本上改
+                    gg_scaled = gg_scaled.copy()
+                    gg_scaled.set_alpha(alpha)
                 rect = gg_scaled.get_rect(center=(WINDOW_WIDTH//2, WINDOW_HEIGHT//2))
                 screen.blit(gg_scaled, rect)
             else:
@@ -518,47 +460,23 @@ while running:
                 game_state_manager.reset_auto_save()
                 print("已自动保存碰撞地图")
 
-        # 变身技能（I键），仅在变身状态下显示，且在所有技能按钮之后绘制
-        if hasattr(player, 'transformed') and player.transformed and skill_icon:
-            x_skill = WINDOW_WIDTH - icon_size*3 - gap*2 - 20
-            y_skill = y_pos - icon_size - gap
-            if base_icon:
-                scaled_base = pygame.transform.smoothscale(base_icon, (base_size, base_size))
-                screen.blit(scaled_base, (x_skill - base_offset, y_skill - base_offset))
-            scaled_icon = pygame.transform.smoothscale(skill_icon, (icon_size, icon_size))
-            screen.blit(scaled_icon, (x_skill, y_skill))
-            # 冷却扇形遮罩
-            remain, total = player.get_skill_cooldown_info()
-            if remain > 0 and total > 0:
-                ratio = remain / total
-                mask_surf = pygame.Surface((icon_size, icon_size), pygame.SRCALPHA)
-                center = (icon_size // 2, icon_size // 2)
-                radius = icon_size // 2
-                start_angle = -90
-                end_angle = start_angle + int(360 * ratio)
-                points = [center]
-                steps = max(6, int(60 * ratio))
-                for i in range(steps+1):
-                    angle = math.radians(start_angle + (end_angle - start_angle) * i / steps)
-                    x = center[0] + radius * math.cos(angle)
-                    y = center[1] + radius * math.sin(angle)
-                    points.append((x, y))
-                pygame.draw.polygon(mask_surf, (0, 0, 0, 120), points)
-                screen.blit(mask_surf, (x_skill, y_skill))
-            font = pygame.font.Font(None, 28)
-            i_text = font.render("I", True, (255, 255, 120))
-            i_rect = i_text.get_rect(bottomright=(x_skill + icon_size - 4, y_skill + icon_size - 2))
-            i_bg = pygame.Surface((i_rect.width+6, i_rect.height+2), pygame.SRCALPHA)
-            i_bg.fill((0,0,0,120))
-            screen.blit(i_bg, (i_rect.x-3, i_rect.y-1))
-            screen.blit(i_text, i_rect)
+        profiler.lap("HUD")
+
+        # 帧耗时分析面板（F3）
+        if game_state_manager.show_profiler:
+            profiler.draw(screen, ui_manager.font, WINDOW_WIDTH - 470, 10)
     else:
+        # 暂停时游戏时钟停止，也不积累步长
+        accumulator = 0.0
         # 暂停状态显示
         screen.fill((20, 20, 20))
         ui_manager.draw_pause_screen(screen)
 
     pygame.display.flip()
+    profiler.lap("flip")
     clock.tick(60)
+    profiler.lap("空闲")
+    profiler.end_frame()
 
 if game_state_manager.collision_modified:
     map_manager.save_collision_map()
@@ -1,11 +1,82 @@
 import pygame
 import os
 import json
+import math
 from pathlib import Path
 from pytmx.util_pygame import load_pygame
+from collision_grid import CollisionGrid
+
+
+class TileChunkCache:
+    """把地图按 chunk_size x chunk_size 个瓦片预渲染成块表面，绘制时只blit与视口相交的块"""
+
+    def __init__(self, width, height, tile_width, tile_height, render_chunk, chunk_size=16):
+        # render_chunk(surface, x0, y0, x1, y1) 负责把瓦片区间[x0,x1)x[y0,y1)画到块表面上，返回是否画了内容
+        self.width = width
+        self.height = height
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.render_chunk = render_chunk
+        self.chunk_size = chunk_size
+        self.chunk_pixel_width = chunk_size * tile_width
+        self.chunk_pixel_height = chunk_size * tile_height
+        self.cols = (width + chunk_size - 1) // chunk_size
+        self.rows = (height + chunk_size - 1) // chunk_size
+        self.chunks = {}  # (cx, cy) -> Surface，空块存None
+        self.dirty = set()
+
+    def build_all(self):
+        for cy in range(self.rows):
+            for cx in range(self.cols):
+                self._build_chunk(cx, cy)
+        self.dirty.clear()
+
+    def _build_chunk(self, cx, cy):
+        x0 = cx * self.chunk_size
+        y0 = cy * self.chunk_size
+        x1 = min(x0 + self.chunk_size, self.width)
+        y1 = min(y0 + self.chunk_size, self.height)
+        surf = pygame.Surface(((x1 - x0) * self.tile_width, (y1 - y0) * self.tile_height), pygame.SRCALPHA)
+        drawn = self.render_chunk(surf, x0, y0, x1, y1)
+        self.chunks[(cx, cy)] = surf if drawn else None
+
+    def invalidate_tile(self, x, y):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.dirty.add((x // self.chunk_size, y // self.chunk_size))
+
+    def invalidate_area(self, x0, y0, x1, y1):
+        """标记瓦片矩形[x0,x1]x[y0,y1]（含端点）覆盖的所有块需要重建"""
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(self.width - 1, x1), min(self.height - 1, y1)
+        for cy in range(y0 // self.chunk_size, y1 // self.chunk_size + 1):
+            for cx in range(x0 // self.chunk_size, x1 // self.chunk_size + 1):
+                self.dirty.add((cx, cy))
+
+    def invalidate_all(self):
+        self.dirty.update((cx, cy) for cy in range(self.rows) for cx in range(self.cols))
+
+    def draw(self, surface, tile_range, camera_x, camera_y):
+        """绘制与瓦片区间tile_range=(x0, y0, x1, y1)（含端点）相交的块"""
+        x0, y0, x1, y1 = tile_range
+        if x1 < x0 or y1 < y0:
+            return
+        cs = self.chunk_size
+        cw, ch = self.chunk_pixel_width, self.chunk_pixel_height
+        for cy in range(y0 // cs, y1 // cs + 1):
+            for cx in range(x0 // cs, x1 // cs + 1):
+                key = (cx, cy)
+                # 只在块被用到时才重建，编辑大量瓦片时不会一次性重画整张图
+                if key in self.dirty:
+                    self._build_chunk(cx, cy)
+                    self.dirty.discard(key)
+                chunk = self.chunks.get(key)
+                if chunk is not None:
+                    surface.blit(chunk, (cx * cw - camera_x, cy * ch - camera_y))
+
 
 class MapManager:
-    def __init__(self, tmx_path, collision_file="collision_map.json", debug=True):
+    def __init__(self, tmx_path, collision_file="collision_map.bin", debug=True, chunk_size=16,
+                 collision_json_file="collision_map.json"):
         self.debug = debug
         self.tmx_data = load_pygame(tmx_path)
         self.tile_width = self.tmx_data.tilewidth
@@ -14,14 +85,15 @@ class MapManager:
         self.height = self.tmx_data.height
         self.map_width = self.width * self.tile_width
         self.map_height = self.height * self.tile_height
-        self.collision_file = collision_file
+        self.collision_file = collision_file  # 本地的二进制文件，编辑器保存到这里，不进git
+        self.collision_json_file = collision_json_file  # 仓库里跟踪的文件，比二进制文件新（如拉取了别人的修改）时从这里导入
         self.wall_gids = [
             30, 31, 41, 14, 16, 17, 18, 19, 26, 28, 49, 51, 52,
             1, 2, 3, 4, 5, 6, 7, 27,
             1610612787, 1610612789, 3221225485, 2684354573, 2684354610, 2147483698,
         ]
         self.data = list(list(self.tmx_data.visible_layers)[0].data)
-        self.collision_map = [[False for _ in range(self.width)] for _ in range(self.height)]
+        self.collision_map = CollisionGrid(self.width, self.height)
         
         # 打印TMX文件信息
         if self.debug:
@@ -54,35 +126,87 @@ class MapManager:
                 print(f"加载装饰物图片失败 {path}: {e}")
         
         self.decoration_map = [[None for _ in range(self.width)] for _ in range(self.height)]
+        # 碰撞显示层同样按块缓存，第一次打开碰撞显示时才渲染，修改碰撞时只让相关块失效
+        self.collision_overlay = TileChunkCache(
+            self.width, self.height, self.tile_width, self.tile_height,
+            self._render_collision_chunk, chunk_size,
+        )
+        self.collision_overlay.invalidate_all()
+        # 碰撞地图被修改时的回调，参数为被修改的瓦片矩形(x0, y0, x1, y1)（含端点）
+        self.collision_listeners = [self.collision_overlay.invalidate_area]
         self._load_or_generate_collision()
         # self._generate_decorations()
 
+        # 静态瓦片图层预渲染成块，draw_map每帧只blit视口内的几个块
+        self.tile_chunks = TileChunkCache(
+            self.width, self.height, self.tile_width, self.tile_height,
+            self._render_tile_chunk, chunk_size,
+        )
+        self.tile_chunks.build_all()
+
     def _load_or_generate_collision(self):
         loaded = False
-        if os.path.exists(self.collision_file):
+        json_newer = (self.collision_json_file and os.path.exists(self.collision_json_file)
+                      and os.path.exists(self.collision_file)
+                      and os.path.getmtime(self.collision_json_file) > os.path.getmtime(self.collision_file))
+        if os.path.exists(self.collision_file) and not json_newer:
             try:
-                with open(self.collision_file, 'r') as f:
-                    loaded_map = json.load(f)
-                    if len(loaded_map) == self.height and len(loaded_map[0]) == self.width:
-                        self.collision_map = loaded_map
-                        loaded = True
-                        if self.debug:
-                            print(f"已从{self.collision_file}加载碰撞地图")
+                grid = CollisionGrid.load_binary(self.collision_file)
+                if grid.width == self.width and grid.height == self.height:
+                    self.collision_map = grid
+                    loaded = True
+                    if self.debug:
+                        print(f"已从{self.collision_file}加载碰撞地图")
             except Exception as e:
                 print(f"加载碰撞地图时出错: {e}")
+        if not loaded and self.collision_json_file and os.path.exists(self.collision_json_file):
+            loaded = self.import_collision_json(self.collision_json_file)
         if not loaded:
             self._generate_collision_map()
+        # 导入/生成的地图还没有对应的二进制文件（或二进制文件已过时），下次保存时整体写出
+        if not os.path.exists(self.collision_file) or json_newer:
+            self.collision_map.dirty_rows.update(range(self.height))
+
+    def import_collision_json(self, path):
+        """从JSON（二维bool列表）导入碰撞地图"""
+        try:
+            with open(path, 'r') as f:
+                loaded_map = json.load(f)
+            if len(loaded_map) == self.height and len(loaded_map[0]) == self.width:
+                self.collision_map = CollisionGrid.from_rows(loaded_map)
+                self.collision_map.dirty_rows.update(range(self.height))
+                self._notify_collision_changed(0, 0, self.width - 1, self.height - 1)
+                if self.debug:
+                    print(f"已从{path}导入碰撞地图")
+                return True
+            print(f"{path} 的尺寸与地图不符，忽略")
+        except Exception as e:
+            print(f"导入碰撞地图时出错: {e}")
+        return False
+
+    def export_collision_json(self, path=None):
+        """把碰撞地图导出为JSON，供外部工具使用"""
+        path = path or self.collision_json_file
+        try:
+            with open(path, 'w') as f:
+                json.dump(self.collision_map.to_rows(), f)
+            if self.debug:
+                print(f"碰撞地图已导出到 {path}")
+            return True
+        except Exception as e:
+            print(f"导出碰撞地图时出错: {e}")
+            return False
 
     def _generate_collision_map(self):
         wall_count = 0
         # 新逻辑：默认所有格子有碰撞，只有road/walkable属性的图块才无碰撞
         for y, row in enumerate(self.data):
             for x, gid in enumerate(row):
-                self.collision_map[y][x] = True  # 默认有碰撞
+                self.collision_map.set_blocked(x, y, True)  # 默认有碰撞
                 if gid != 0:
                     tile_props = self.tmx_data.get_tile_properties_by_gid(gid)
                     if tile_props and ('road' in tile_props or 'walkable' in tile_props):
-                        self.collision_map[y][x] = False  # 只有"路"才可通行
+                        self.collision_map.set_blocked(x, y, False)  # 只有"路"才可通行
                     else:
                         wall_count += 1
                 else:
@@ -91,11 +215,16 @@ class MapManager:
             print(f"已创建碰撞地图，识别到 {wall_count} 个障碍物瓦片 (只认road/walkable为可通行)")
 
     def save_collision_map(self):
+        """保存碰撞地图：已有二进制文件时只写回修改过的行，否则完整写出"""
         try:
-            with open(self.collision_file, 'w') as f:
-                json.dump(self.collision_map, f)
-            if self.debug:
-                print(f"碰撞地图已保存到 {self.collision_file}")
+            dirty_count = len(self.collision_map.dirty_rows)
+            if self.collision_map.patch_binary(self.collision_file):
+                if self.debug:
+                    print(f"碰撞地图已保存到 {self.collision_file}（更新 {dirty_count} 行）")
+            else:
+                self.collision_map.save_binary(self.collision_file)
+                if self.debug:
+                    print(f"碰撞地图已保存到 {self.collision_file}")
             return True
         except Exception as e:
             print(f"保存碰撞地图时出错: {e}")
@@ -104,22 +233,75 @@ class MapManager:
     def is_valid_position(self, x, y):
         if x < 0 or y < 0 or x >= self.map_width or y >= self.map_height:
             return False
-        tile_x = x // self.tile_width
-        tile_y = y // self.tile_height
-        if tile_x < 0 or tile_y < 0 or tile_x >= self.width or tile_y >= self.height:
+        return not self.collision_map.cells[int(y // self.tile_height) * self.width + int(x // self.tile_width)]
+
+    def is_area_walkable(self, left, top, right, bottom):
+        """像素矩形[left,right]x[top,bottom]（含端点）覆盖的瓦片是否全部可通行，一次查询代替逐点探测"""
+        if left < 0 or top < 0 or right >= self.map_width or bottom >= self.map_height:
             return False
-        return not self.collision_map[int(tile_y)][int(tile_x)]
+        return not self.collision_map.any_blocked(
+            int(left // self.tile_width), int(top // self.tile_height),
+            int(right // self.tile_width), int(bottom // self.tile_height),
+        )
+
+    def sweep_rect(self, x, y, width, height, dx, dy):
+        """把像素矩形(x, y, width, height)先沿x轴移动dx、再沿y轴移动dy，返回不穿墙能到达的最远左上角(x, y)
+
+        假定起点本身是合法的，地图外视为墙壁。每个轴只检查途中新进入的瓦片列/行，
+        开销取决于跨过的瓦片数，与移动速度（像素数）和矩形大小基本无关。
+        """
+        if dx:
+            x = self._sweep_axis(x, y, width, height, dx, True)
+        if dy:
+            y = self._sweep_axis(y, x, height, width, dy, False)
+        return x, y
+
+    def _sweep_axis(self, pos, other, size, other_size, delta, horizontal):
+        if horizontal:
+            tile, other_tile = self.tile_width, self.tile_height
+        else:
+            tile, other_tile = self.tile_height, self.tile_width
+        grid = self.collision_map
+        o0 = int(other // other_tile)
+        o1 = int((other + other_size - 1) // other_tile)
+        if delta > 0:
+            lead = pos + size - 1
+            columns = range(int(lead // tile) + 1, int((lead + delta) // tile) + 1)
+        else:
+            lead = pos
+            columns = range(int(lead // tile) - 1, int((lead + delta) // tile) - 1, -1)
+        for c in columns:
+            if horizontal:
+                blocked = grid.any_blocked(c, o0, c, o1)
+            else:
+                blocked = grid.any_blocked(o0, c, o1, c)
+            if blocked:
+                # 贴着挡住的那一列/行停下
+                if delta > 0:
+                    return max(pos, c * tile - size)
+                return min(pos, (c + 1) * tile)
+        return pos + delta
+
+    def first_invalid_position(self, points):
+        """按顺序检测一串像素坐标，返回第一个不可通行点的下标，全部可通行时返回-1"""
+        cells = self.collision_map.cells
+        tw, th, w = self.tile_width, self.tile_height, self.width
+        mw, mh = self.map_width, self.map_height
+        for i, (x, y) in enumerate(points):
+            if x < 0 or y < 0 or x >= mw or y >= mh or cells[int(y // th) * w + int(x // tw)]:
+                return i
+        return -1
 
     def find_safe_spawn(self):
         good_spawn_points = [
             (10, 3), (10, 10), (20, 10), (15, 15)
         ]
         for tile_x, tile_y in good_spawn_points:
-            if (0 <= tile_x < self.width and 0 <= tile_y < self.height and not self.collision_map[tile_y][tile_x]):
+            if not self.collision_map.is_blocked(tile_x, tile_y):
                 return tile_x * self.tile_width, tile_y * self.tile_height
         for y in range(1, self.height - 1):
             for x in range(1, self.width - 1):
-                if not self.collision_map[y][x]:
+                if not self.collision_map.is_blocked(x, y):
                     return x * self.tile_width, y * self.tile_height
         return self.map_width // 2, self.map_height // 2
 
@@ -127,17 +309,40 @@ class MapManager:
         tile_x = int(x // self.tile_width)
         tile_y = int(y // self.tile_height)
         if 0 <= tile_x < self.width and 0 <= tile_y < self.height:
-            self.collision_map[tile_y][tile_x] = not self.collision_map[tile_y][tile_x]
-            print(f"位置 ({tile_x},{tile_y}) 的碰撞状态: {'墙壁' if self.collision_map[tile_y][tile_x] else '可通行'}")
+            blocked = self.collision_map.toggle(tile_x, tile_y)
+            self._notify_collision_changed(tile_x, tile_y, tile_x, tile_y)
+            print(f"位置 ({tile_x},{tile_y}) 的碰撞状态: {'墙壁' if blocked else '可通行'}")
             print("按S键保存当前碰撞地图")
 
+    def toggle_collision_area(self, tile_x1, tile_y1, tile_x2, tile_y2):
+        """批量切换瓦片矩形（含端点）内的碰撞状态"""
+        self.collision_map.toggle_rect(tile_x1, tile_y1, tile_x2, tile_y2)
+        self._notify_collision_changed(max(0, tile_x1), max(0, tile_y1),
+                                       min(self.width - 1, tile_x2), min(self.height - 1, tile_y2))
+
+    def add_collision_listener(self, callback):
+        """注册碰撞地图修改回调callback(x0, y0, x1, y1)"""
+        if callback not in self.collision_listeners:
+            self.collision_listeners.append(callback)
+
+    def remove_collision_listener(self, callback):
+        if callback in self.collision_listeners:
+            self.collision_listeners.remove(callback)
+
+    def _notify_collision_changed(self, x0, y0, x1, y1):
+        for callback in list(self.collision_listeners):
+            try:
+                callback(x0, y0, x1, y1)
+            except Exception as e:
+                print(f"碰撞地图修改回调出错: {e}")
+
     def _generate_decorations(self):
         """在非碰撞区域随机生成装饰物"""
         import random
         # 遍历所有非碰撞区域
         for y in range(1, self.height - 1):
             for x in range(1, self.width - 1):
-                if not self.collision_map[y][x]:
+                if not self.collision_map.is_blocked(x, y):
                     # 5%的概率放置装饰物
                     if random.random() < 0.02:
                         # 随机选择一个装饰物图片
@@ -146,42 +351,73 @@ class MapManager:
                         if self.debug:
                             print(f"在位置 ({x}, {y}) 放置装饰物")
 
-    def draw_map(self, surface, camera_x, camera_y, zoomed_width, zoomed_height):
-        # 支持多图层绘制
+    def _render_tile_chunk(self, chunk_surface, x0, y0, x1, y1):
+        """把所有可见瓦片图层在[x0,x1)x[y0,y1)范围内的瓦片画到块表面上"""
+        drawn = False
         for layer in self.tmx_data.visible_layers:
-            if hasattr(layer, 'data'):
-                for y, row in enumerate(layer.data):
-                    for x, gid in enumerate(row):
-                        tile_x = x * self.tile_width
-                        tile_y = y * self.tile_height
-                        if (camera_x <= tile_x <= camera_x + zoomed_width and 
-                            camera_y <= tile_y <= camera_y + zoomed_height):
-                            if gid != 0:
-                                tile_img = self.tmx_data.get_tile_image_by_gid(gid)
-                                if tile_img:
-                                    surface.blit(tile_img, (tile_x - camera_x, tile_y - camera_y))
+            if not hasattr(layer, 'data'):
+                continue
+            for y in range(y0, y1):
+                row = layer.data[y]
+                dest_y = (y - y0) * self.tile_height
+                for x in range(x0, x1):
+                    gid = row[x]
+                    if gid != 0:
+                        tile_img = self.tmx_data.get_tile_image_by_gid(gid)
+                        if tile_img:
+                            chunk_surface.blit(tile_img, ((x - x0) * self.tile_width, dest_y))
+                            drawn = True
+        return drawn
+
+    def set_tile_gid(self, layer_index, x, y, gid):
+        """修改某图层的一个瓦片，只让它所在的块失效"""
+        layer = self.tmx_data.layers[layer_index]
+        layer.data[y][x] = gid
+        self.tile_chunks.invalidate_tile(x, y)
+
+    def get_visible_tile_range(self, camera_x, camera_y, zoomed_width, zoomed_height):
+        """返回视口覆盖的瓦片区间(x0, y0, x1, y1)，含端点并裁剪到地图内；视口在地图外时x1<x0或y1<y0"""
+        x0 = max(0, int(camera_x) // self.tile_width)
+        y0 = max(0, int(camera_y) // self.tile_height)
+        x1 = min(self.width - 1, (int(math.ceil(camera_x + zoomed_width)) - 1) // self.tile_width)
+        y1 = min(self.height - 1, (int(math.ceil(camera_y + zoomed_height)) - 1) // self.tile_height)
+        return x0, y0, x1, y1
+
+    def draw_map(self, surface, camera_x, camera_y, zoomed_width, zoomed_height):
+        x0, y0, x1, y1 = tile_range = self.get_visible_tile_range(camera_x, camera_y, zoomed_width, zoomed_height)
+        # 多图层已预渲染进块缓存
+        self.tile_chunks.draw(surface, tile_range, camera_x, camera_y)
         # 绘制装饰物
-        for y in range(self.height):
-            for x in range(self.width):
-                decoration_img = self.decoration_map[y][x]
+        for y in range(y0, y1 + 1):
+            row = self.decoration_map[y]
+            for x in range(x0, x1 + 1):
+                decoration_img = row[x]
                 if decoration_img is not None:
-                    tile_x = x * self.tile_width
-                    tile_y = y * self.tile_height
-                    if (camera_x <= tile_x <= camera_x + zoomed_width and 
-                        camera_y <= tile_y <= camera_y + zoomed_height):
-                        surface.blit(decoration_img, (tile_x - camera_x, tile_y - camera_y))
+                    surface.blit(decoration_img, (x * self.tile_width - camera_x, y * self.tile_height - camera_y))
 
     def draw_collision_overlay(self, surface, camera_x, camera_y, zoomed_width, zoomed_height):
         if not self.debug:
             return
-        for y in range(self.height):
-            for x in range(self.width):
-                tile_x = x * self.tile_width
-                tile_y = y * self.tile_height
-                if (camera_x <= tile_x <= camera_x + zoomed_width and 
-                    camera_y <= tile_y <= camera_y + zoomed_height):
-                    if self.collision_map[y][x]:
-                        rect = pygame.Rect(tile_x - camera_x, tile_y - camera_y, self.tile_width, self.tile_height)
-                        overlay = pygame.Surface((self.tile_width, self.tile_height), pygame.SRCALPHA)
-                        overlay.fill((255, 0, 0, 128))
-                        surface.blit(overlay, rect) 
\ No newline at end of file
+        tile_range = self.get_visible_tile_range(camera_x, camera_y, zoomed_width, zoomed_height)
+        self.collision_overlay.draw(surface, tile_range, camera_x, camera_y)
+
+    def _render_collision_chunk(self, chunk_surface, x0, y0, x1, y1):
+        """把瓦片区间[x0,x1)x[y0,y1)内的墙壁画成半透明红色，每行连续的墙壁合并成一次fill"""
+        cells = self.collision_map.cells
+        drawn = False
+        for y in range(y0, y1):
+            base = y * self.width
+            dest_y = (y - y0) * self.tile_height
+            x = x0
+            while x < x1:
+                start = cells.find(1, base + x, base + x1)
+                if start == -1:
+                    break
+                end = cells.find(0, start, base + x1)
+                if end == -1:
+                    end = base + x1
+                chunk_surface.fill((255, 0, 0, 128), ((start - base - x0) * self.tile_width, dest_y,
+                                                      (end - start) * self.tile_width, self.tile_height))
+                drawn = True
+                x = end - base
+        return drawn 
\ No newline at end of file
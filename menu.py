@@ -3,6 +3,7 @@ import os
 import sys
 import math
 import time
+import preloader
 
 class MenuItem:
     def __init__(self, text, font, pos, color=(255, 255, 255), hover_color=(255, 200, 0)):
@@ -105,11 +106,13 @@ class GameMenu:
         
         # 加载游戏标题图像
         try:
-            self.title_image = pygame.image.load(os.path.join("assets", "title", "title.png")).convert_alpha()
-            # 保持比例缩放标题
-            width = min(screen_width * 0.8, self.title_image.get_width())
-            height = (width / self.title_image.get_width()) * self.title_image.get_height()
-            self.title_image = pygame.transform.smoothscale(self.title_image, (int(width), int(height)))
+            # 保持比例缩放标题，缩放结果存在磁盘缓存里
+            def fit_title(image):
+                width = min(screen_width * 0.8, image.get_width())
+                height = (width / image.get_width()) * image.get_height()
+                return pygame.transform.smoothscale(image, (int(width), int(height)))
+            self.title_image = preloader.load_image(os.path.join("assets", "title", "title.png"),
+                                                    f"fit_width{screen_width}", fit_title)
             self.title_rect = self.title_image.get_rect(midtop=(screen_width // 2, 50))
         except:
             self.title_image = None
@@ -212,13 +215,27 @@ class GameMenu:
             pos = (int(particle["pos"].x), int(particle["pos"].y))
             pygame.draw.circle(surface, color, pos, max(1, int(size.x)))
     
-    def run(self, screen):
-        """运行菜单循环"""
+    def draw_preload_progress(self, surface, preloader):
+        """菜单底部的资源加载进度条，加载完后不再显示"""
+        if preloader.is_done():
+            return
+        width, height = 240, 6
+        x = (self.screen_width - width) // 2
+        y = self.screen_height - 90
+        pygame.draw.rect(surface, (60, 60, 80), (x, y, width, height))
+        pygame.draw.rect(surface, (255, 200, 0), (x, y, int(width * preloader.progress()), height))
+
+    def run(self, screen, preloader=None):
+        """运行菜单循环；传入preloader时每帧推进一点后台加载并显示进度"""
         clock = pygame.time.Clock()
         
         while self.running:
             mouse_pos = pygame.mouse.get_pos()
             
+            # 菜单空闲的时间用来收下后台解码好的资源
+            if preloader is not None:
+                preloader.pump()
+            
             # 事件处理
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -281,6 +298,9 @@ class GameMenu:
             copyright_rect = copyright_text.get_rect(midbottom=(self.screen_width // 2, self.screen_height - 20))
             screen.blit(copyright_text, copyright_rect)
             
+            if preloader is not None:
+                self.draw_preload_progress(screen, preloader)
+            
             pygame.display.flip()
             clock.tick(60)
         
@@ -0,0 +1,584 @@
+"""寻路：以玩家为源的共享流场（flow field）和格子A*
+
+所有追击的敌人共用一张从玩家所在格子出发的BFS距离图，玩家换格子或碰撞地图被修改时才重算一次，
+每个敌人查询下一步只需要O(1)，开销不随敌人数量增长。
+GridPathfinder是多目标A*，结果与astar_multi_goal_reference（原来的实现）完全一致，Boss在小地图上通过plan()带路径缓存使用。
+HierarchicalPlanner是大地图用的分层寻路（HPA*），在区域入口组成的抽象图上搜索，只展开起点附近的路段。
+"""
+import heapq
+from array import array
+from collections import deque
+
+
+class FlowField:
+    UNREACHABLE = -1
+
+    def __init__(self, map_manager):
+        self.map_manager = map_manager
+        self.target = None  # 当前的源格子(x, y)
+        self.dist = array('i')
+        self.parent = array('i')  # 每个格子朝玩家方向的下一个格子下标，-1表示无
+        self._grid = None
+        self._grid_version = -1
+        self.rebuild_count = 0
+
+    def tile_of(self, pos):
+        return int(pos[0] // self.map_manager.tile_width), int(pos[1] // self.map_manager.tile_height)
+
+    def update(self, target_pos):
+        """target_pos为像素坐标；只有目标换格子或碰撞地图有改动时才重算"""
+        grid = self.map_manager.collision_map
+        target = self.tile_of(target_pos)
+        if target == self.target and grid is self._grid and grid.version == self._grid_version:
+            return False
+        self.target = target
+        self._grid = grid
+        self._grid_version = grid.version
+        self._rebuild(grid, target)
+        return True
+
+    def _rebuild(self, grid, target):
+        width, height = grid.width, grid.height
+        n = width * height
+        dist = array('i', [self.UNREACHABLE]) * n
+        parent = array('i', [-1]) * n
+        self.dist, self.parent = dist, parent
+        self.rebuild_count += 1
+        tx, ty = target
+        if not grid.in_bounds(tx, ty):
+            return
+        cells = grid.cells
+        start = ty * width + tx
+        # 玩家站在墙格子上（比如贴墙）时也从这里出发，否则周围的敌人都会找不到路
+        dist[start] = 0
+        queue = deque([start])
+        pop, push = queue.popleft, queue.append
+        last_row = n - width
+        while queue:
+            i = pop()
+            d = dist[i] + 1
+            x = i % width
+            if x > 0:
+                j = i - 1
+                if dist[j] < 0 and not cells[j]:
+                    dist[j] = d
+                    parent[j] = i
+                    push(j)
+            if x < width - 1:
+                j = i + 1
+                if dist[j] < 0 and not cells[j]:
+                    dist[j] = d
+                    parent[j] = i
+                    push(j)
+            if i >= width:
+                j = i - width
+                if dist[j] < 0 and not cells[j]:
+                    dist[j] = d
+                    parent[j] = i
+                    push(j)
+            if i < last_row:
+                j = i + width
+                if dist[j] < 0 and not cells[j]:
+                    dist[j] = d
+                    parent[j] = i
+                    push(j)
+
+    def distance(self, tile):
+        """到玩家格子的步数，不可达返回UNREACHABLE"""
+        x, y = tile
+        grid = self._grid
+        if grid is None or not grid.in_bounds(x, y):
+            return self.UNREACHABLE
+        return self.dist[y * grid.width + x]
+
+    def next_tile(self, tile):
+        """从tile朝玩家走的下一个格子；已经在目标格子或不可达时返回None"""
+        x, y = tile
+        grid = self._grid
+        if grid is None or not grid.in_bounds(x, y):
+            return None
+        j = self.parent[y * grid.width + x]
+        if j < 0:
+            return None
+        return j % grid.width, j // grid.width
+
+    def next_step(self, pos):
+        """从像素坐标pos出发，返回下一格中心的像素坐标；无路可走时返回None"""
+        nxt = self.next_tile(self.tile_of(pos))
+        if nxt is None:
+            return None
+        tw, th = self.map_manager.tile_width, self.map_manager.tile_height
+        return nxt[0] * tw + tw // 2, nxt[1] * th + th // 2
+
+
+def astar_multi_goal_reference(grid, start, goals, avoid_tiles=None):
+    """原来BossEnemy.astar_multi_goal的实现，保留作为结果和性能的对照"""
+    width = grid.width
+    height = grid.height
+    cells = grid.cells
+    if avoid_tiles is None:
+        avoid_tiles = set()
+
+    def heuristic(a, b):
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+    open_set = []
+    heapq.heappush(open_set, (0, start))
+    came_from = {}
+    g_score = {start: 0}
+    f_score = {start: min(heuristic(start, g) for g in goals)}
+    goal_set = set(goals)
+    while open_set:
+        _, current = heapq.heappop(open_set)
+        if current in goal_set:
+            # 回溯路径
+            path = [current]
+            while current in came_from:
+                current = came_from[current]
+                path.append(current)
+            path.reverse()
+            return path
+        for dx, dy in [(-1,0),(1,0),(0,-1),(0,1)]:
+            neighbor = (current[0]+dx, current[1]+dy)
+            if 0<=neighbor[0]<width and 0<=neighbor[1]<height:
+                if cells[neighbor[1] * width + neighbor[0]] or neighbor in avoid_tiles:
+                    continue
+                tentative_g = g_score[current] + 1
+                if neighbor not in g_score or tentative_g < g_score[neighbor]:
+                    came_from[neighbor] = current
+                    g_score[neighbor] = tentative_g
+                    f_score[neighbor] = tentative_g + min(heuristic(neighbor, g) for g in goals)
+                    heapq.heappush(open_set, (f_score[neighbor], neighbor))
+    return [start]  # 找不到路径时只返回起点
+
+
+class GridPathfinder:
+    """绑定在MapManager碰撞网格上的可复用多目标A*
+
+    - 格子用按列优先的整数下标 i = x * height + y，堆里存 f * N + i 一个整数：
+      同f时按(x, y)排序，和原实现里(f, (x, y))元组的比较顺序一致，所以路径完全相同
+    - g/父节点/启发值数组预先分配，用世代计数代替每次清空
+    - 有关闭集合，过期的堆项直接跳过；每个格子的启发值（到所有目标的最小曼哈顿距离）只算一次
+    - 每个格子的可通行邻居预先算好，碰撞地图修改后重建
+    - plan()按(起点, 目标, 临时障碍)缓存路径，碰撞网格换了或被修改过时清空
+    """
+    CACHE_SIZE = 256
+
+    def __init__(self, map_manager):
+        self.map_manager = map_manager
+        self.path_cache = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache_grid = None
+        self._cache_version = -1
+        self._grid = None
+        self._grid_version = -1
+        self.neighbors = []
+        self.generation = 0
+        self.g = array('i')
+        self.parent = array('i')
+        self.h = array('i')
+        self.seen = array('I')
+        self.closed = array('I')
+
+    def _sync(self):
+        """碰撞网格换了或被修改过时，重建邻居表"""
+        grid = self.map_manager.collision_map
+        if grid is self._grid and grid.version == self._grid_version:
+            return grid
+        width, height = grid.width, grid.height
+        n = width * height
+        cells = grid.cells
+        neighbors = [()] * n
+        for x in range(width):
+            for y in range(height):
+                row = y * width + x
+                i = x * height + y
+                nb = []
+                # 顺序和原实现一致：左、右、上、下
+                if x > 0 and not cells[row - 1]:
+                    nb.append(i - height)
+                if x < width - 1 and not cells[row + 1]:
+                    nb.append(i + height)
+                if y > 0 and not cells[row - width]:
+                    nb.append(i - 1)
+                if y < height - 1 and not cells[row + width]:
+                    nb.append(i + 1)
+                neighbors[i] = tuple(nb)
+        self.neighbors = neighbors
+        if len(self.g) != n:
+            self.g = array('i', [0]) * n
+            self.parent = array('i', [0]) * n
+            self.h = array('i', [0]) * n
+            self.seen = array('I', [0]) * n
+            self.closed = array('I', [0]) * n
+            self.generation = 0
+        self._grid = grid
+        self._grid_version = grid.version
+        return grid
+
+    def find_path(self, start, goals, avoid_tiles=None):
+        """从start走到goals中任意一个的最短路径（格子坐标列表，含起点）；找不到时返回[start]"""
+        grid = self._sync()
+        width, height = grid.width, grid.height
+        sx, sy = start
+        if not (0 <= sx < width and 0 <= sy < height):
+            # 起点在地图外的情况很少见，交给原实现处理
+            return astar_multi_goal_reference(grid, start, goals, avoid_tiles)
+        n = width * height
+        self.generation += 1
+        gen = self.generation
+        g, parent, h, seen, closed = self.g, self.parent, self.h, self.seen, self.closed
+        neighbors = self.neighbors
+        goal_points = list(goals)
+        goal_index = {gx * height + gy for gx, gy in goal_points if 0 <= gx < width and 0 <= gy < height}
+        avoid = {ax * height + ay for ax, ay in avoid_tiles if 0 <= ax < width and 0 <= ay < height} \
+            if avoid_tiles else None
+
+        start_i = sx * height + sy
+        g[start_i] = 0
+        parent[start_i] = -1
+        seen[start_i] = gen
+        heap = [start_i]
+        pop, push = heapq.heappop, heapq.heappush
+        while heap:
+            i = pop(heap) % n
+            if closed[i] == gen:
+                continue
+            closed[i] = gen
+            if i in goal_index:
+                path = []
+                while i >= 0:
+                    path.append(divmod(i, height))
+                    i = parent[i]
+                path.reverse()
+                return path
+            ng = g[i] + 1
+            for j in neighbors[i]:
+                if seen[j] == gen:
+                    if ng >= g[j]:
+                        continue
+                else:
+                    if avoid and j in avoid:
+                        continue
+                    seen[j] = gen
+                    jx, jy = divmod(j, height)
+                    best = None
+                    for gx, gy in goal_points:
+                        d = abs(jx - gx) + abs(jy - gy)
+                        if best is None or d < best:
+                            best = d
+                    h[j] = best
+                g[j] = ng
+                parent[j] = i
+                push(heap, (ng + h[j]) * n + j)
+        return [start]
+
+    def plan(self, start, goals, avoid_tiles=None):
+        """带路径缓存的find_path，Boss卡住时每帧用同样的参数重新规划，目标或自身换格子之前都能直接命中"""
+        grid = self.map_manager.collision_map
+        if grid is not self._cache_grid or grid.version != self._cache_version:
+            self.path_cache.clear()
+            self._cache_grid = grid
+            self._cache_version = grid.version
+        key = (start, tuple(goals), frozenset(avoid_tiles) if avoid_tiles else frozenset())
+        path = self.path_cache.get(key)
+        if path is not None:
+            self.cache_hits += 1
+            return list(path)
+        self.cache_misses += 1
+        path = self.find_path(start, goals, avoid_tiles)
+        if len(self.path_cache) >= self.CACHE_SIZE:
+            self.path_cache.clear()
+        self.path_cache[key] = tuple(path)
+        return path
+
+    def close(self):
+        # 没有注册碰撞监听（缓存按网格版本号失效），接口和HierarchicalPlanner保持一致
+        pass
+
+
+class HierarchicalPlanner:
+    """分层寻路（HPA*）：把地图切成cluster_size见方的区域，区域之间的入口作为抽象图的节点
+
+    - 相邻区域交界处每段连续可通行的边界生成入口：短的取中点，长的取两端
+    - 同一区域内的入口之间用区域内BFS算好距离，作为抽象图的边
+    - 远距离查询先在抽象图上A*，再只把靠近起点的前几段展开成格子路径（Boss每次只走path[1]，
+      走几步就会重新规划，远处的路段没必要展开）
+    - 碰撞地图修改时只重建被改区域及其相邻区域的入口和边
+    - 起点离目标很近时直接用GridPathfinder，结果和格子A*一样
+    接口（plan/close）和GridPathfinder一致，大地图上由create_planner选用。
+    """
+    REFINE_HOPS = 3  # 每次展开的抽象路段数
+    CACHE_SIZE = 256
+
+    def __init__(self, map_manager, cluster_size=16):
+        self.map_manager = map_manager
+        self.cluster_size = cluster_size
+        self.path_cache = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.fallback = GridPathfinder(map_manager)
+        self._grid = None
+        self._grid_version = -1
+        self._pending = []  # 监听到的碰撞修改区域，下次plan时局部重建
+        map_manager.add_collision_listener(self._on_collision_changed)
+
+    def close(self):
+        self.map_manager.remove_collision_listener(self._on_collision_changed)
+
+    def _on_collision_changed(self, x0, y0, x1, y1):
+        self._pending.append((x0, y0, x1, y1))
+        self._grid_version = self.map_manager.collision_map.version
+        self.path_cache.clear()
+
+    # ---- 抽象图的构建和局部修补 ----
+
+    def _reset(self, grid):
+        size = self.cluster_size
+        self._grid = grid
+        self._grid_version = grid.version
+        self._pending = []
+        self.path_cache.clear()
+        self.cells = grid.cells
+        self.width, self.height = grid.width, grid.height
+        self.cols = (grid.width + size - 1) // size
+        self.rows = (grid.height + size - 1) // size
+        self.border_pairs = {}  # 边界 -> [(一侧的格子下标, 另一侧的格子下标)]
+        self.inter = {}  # 入口格子 -> 跨边界相连的入口格子集合
+        self.intra = {}  # 入口格子 -> {同区域的入口格子: 步数}
+        self.cluster_nodes = {}  # 区域 -> 入口格子集合
+        self._rebuild_clusters({(cx, cy) for cx in range(self.cols) for cy in range(self.rows)})
+
+    def _bounds(self, cluster):
+        size = self.cluster_size
+        x0, y0 = cluster[0] * size, cluster[1] * size
+        return x0, y0, min(x0 + size, self.width) - 1, min(y0 + size, self.height) - 1
+
+    def _cluster_of(self, i):
+        return (i % self.width) // self.cluster_size, (i // self.width) // self.cluster_size
+
+    def _borders_of(self, cluster):
+        """区域四周的边界，('v', cx, cy)是(cx, cy)和(cx+1, cy)之间，('h', cx, cy)是(cx, cy)和(cx, cy+1)之间"""
+        cx, cy = cluster
+        borders = []
+        if cx > 0:
+            borders.append(('v', cx - 1, cy))
+        if cx < self.cols - 1:
+            borders.append(('v', cx, cy))
+        if cy > 0:
+            borders.append(('h', cx, cy - 1))
+        if cy < self.rows - 1:
+            borders.append(('h', cx, cy))
+        return borders
+
+    def _scan_border(self, border):
+        """沿边界找出连续可通行的段，每段生成一到两个入口"""
+        kind, cx, cy = border
+        cells, width = self.cells, self.width
+        x0, y0, x1, y1 = self._bounds((cx, cy))
+        if kind == 'v':
+            side = [(y * width + x1, y * width + x1 + 1) for y in range(y0, y1 + 1)]
+        else:
+            side = [(y1 * width + x, (y1 + 1) * width + x) for x in range(x0, x1 + 1)]
+        pairs = []
+        run = []
+        for a, b in side + [(None, None)]:
+            if a is not None and not cells[a] and not cells[b]:
+                run.append((a, b))
+                continue
+            if run:
+                if len(run) < 6:
+                    pairs.append(run[len(run) // 2])
+                else:
+                    pairs.append(run[0])
+                    pairs.append(run[-1])
+                run = []
+        return pairs
+
+    def _rebuild_clusters(self, clusters):
+        """重建clusters四周所有边界上的入口，再重算受影响区域内的入口间距离"""
+        borders = set()
+        for cluster in clusters:
+            borders.update(self._borders_of(cluster))
+        inter = self.inter
+        touched = set(clusters)
+        for border in borders:
+            for a, b in self.border_pairs.get(border, ()):
+                inter[a].discard(b)
+                inter[b].discard(a)
+            pairs = self._scan_border(border)
+            self.border_pairs[border] = pairs
+            for a, b in pairs:
+                inter.setdefault(a, set()).add(b)
+                inter.setdefault(b, set()).add(a)
+            kind, cx, cy = border
+            touched.add((cx, cy))
+            touched.add((cx + 1, cy) if kind == 'v' else (cx, cy + 1))
+        for cluster in touched:
+            nodes = set()
+            for border in self._borders_of(cluster):
+                for a, b in self.border_pairs.get(border, ()):
+                    nodes.add(a if self._cluster_of(a) == cluster else b)
+            for i in self.cluster_nodes.get(cluster, set()) - nodes:
+                self.intra.pop(i, None)
+                if not inter.get(i):
+                    inter.pop(i, None)
+            self.cluster_nodes[cluster] = nodes
+            bounds = self._bounds(cluster)
+            for i in nodes:
+                dist, _ = self._cluster_bfs(i, bounds)
+                self.intra[i] = {j: dist[j] for j in nodes if j != i and j in dist}
+
+    def _cluster_bfs(self, source, bounds, avoid=None, target=None):
+        """限制在bounds（含端点）内的BFS，返回(距离, 父节点)；到达target时提前结束"""
+        cells, width = self.cells, self.width
+        x0, y0, x1, y1 = bounds
+        dist = {source: 0}
+        parent = {source: -1}
+        queue = deque([source])
+        while queue:
+            i = queue.popleft()
+            if i == target:
+                break
+            d = dist[i] + 1
+            x, y = i % width, i // width
+            for j, ok in ((i - 1, x > x0), (i + 1, x < x1), (i - width, y > y0), (i + width, y < y1)):
+                if ok and j not in dist and not cells[j] and not (avoid and j in avoid):
+                    dist[j] = d
+                    parent[j] = i
+                    queue.append(j)
+        return dist, parent
+
+    # ---- 查询 ----
+
+    def plan(self, start, goals, avoid_tiles=None):
+        """从start到goals中任意一个的路径（格子坐标列表，含起点）；远距离时只展开靠近起点的一段，找不到时返回[start]"""
+        grid = self.map_manager.collision_map
+        width, height = grid.width, grid.height
+        sx, sy = start
+        if not (0 <= sx < width and 0 <= sy < height) or not goals:
+            return astar_multi_goal_reference(grid, start, goals, avoid_tiles)
+        if min(abs(gx - sx) + abs(gy - sy) for gx, gy in goals) <= 2 * self.cluster_size:
+            return self.fallback.find_path(start, goals, avoid_tiles)
+        if grid is not self._grid or (grid.version != self._grid_version and not self._pending):
+            # 网格被替换，或没有经过MapManager通知就被修改了：整体重建
+            self._reset(grid)
+        if self._pending:
+            clusters = set()
+            size = self.cluster_size
+            for x0, y0, x1, y1 in self._pending:
+                # 边界两侧的格子都会影响入口，所以向外扩一格
+                for cy in range(max(0, y0 - 1) // size, min(height - 1, y1 + 1) // size + 1):
+                    for cx in range(max(0, x0 - 1) // size, min(width - 1, x1 + 1) // size + 1):
+                        clusters.add((cx, cy))
+            self._pending = []
+            self._rebuild_clusters(clusters)
+
+        goals = tuple(goals)
+        cache_key = (start, goals, frozenset(avoid_tiles) if avoid_tiles else frozenset())
+        path = self.path_cache.get(cache_key)
+        if path is not None:
+            self.cache_hits += 1
+            return list(path)
+        self.cache_misses += 1
+        path = self._plan_abstract(start, goals, avoid_tiles)
+        if len(self.path_cache) >= self.CACHE_SIZE:
+            self.path_cache.clear()
+        self.path_cache[cache_key] = tuple(path)
+        return path
+
+    def _plan_abstract(self, start, goals, avoid_tiles):
+        width, height = self.width, self.height
+        avoid = {ax + ay * width for ax, ay in avoid_tiles if 0 <= ax < width and 0 <= ay < height} \
+            if avoid_tiles else None
+        start_i = start[1] * width + start[0]
+        # 起点和每个目标各自在所在区域里连到入口
+        dist, _ = self._cluster_bfs(start_i, self._bounds(self._cluster_of(start_i)), avoid)
+        start_edges = {j: d for j, d in dist.items() if j in self.cluster_nodes[self._cluster_of(start_i)]}
+        goal_edges = {}  # 入口 -> (到目标的步数, 目标格子)
+        for gx, gy in goals:
+            if not (0 <= gx < width and 0 <= gy < height) or self.cells[gy * width + gx]:
+                continue
+            goal_i = gy * width + gx
+            cluster = self._cluster_of(goal_i)
+            dist, _ = self._cluster_bfs(goal_i, self._bounds(cluster), avoid)
+            for j in self.cluster_nodes[cluster]:
+                if j in dist and (j not in goal_edges or dist[j] < goal_edges[j][0]):
+                    goal_edges[j] = (dist[j], goal_i)
+
+        # 抽象图上的A*，-1是起点，-2是虚拟终点
+        goal_points = [(gx, gy) for gx, gy in goals]
+
+        def heuristic(i):
+            x, y = i % width, i // width
+            return min(abs(x - gx) + abs(y - gy) for gx, gy in goal_points)
+        g = {-1: 0}
+        parent = {-1: None}
+        heap = [(0, -1)]
+        closed = set()
+        found = False
+        while heap:
+            _, i = heapq.heappop(heap)
+            if i in closed:
+                continue
+            closed.add(i)
+            if i == -2:
+                found = True
+                break
+            if i == -1:
+                edges = list(start_edges.items())
+            else:
+                edges = list(self.intra.get(i, {}).items()) + [(j, 1) for j in self.inter.get(i, ())]
+                if i in goal_edges:
+                    edges.append((-2, goal_edges[i][0]))
+            for j, cost in edges:
+                if avoid and j in avoid:
+                    continue
+                ng = g[i] + cost
+                if j not in g or ng < g[j]:
+                    g[j] = ng
+                    parent[j] = i
+                    heapq.heappush(heap, (ng + (0 if j == -2 else heuristic(j)), j))
+        if not found:
+            return self.fallback.find_path(start, goals, avoid_tiles) if avoid else [start]
+
+        waypoints = []
+        i = parent[-2]
+        waypoints.append(goal_edges[i][1])
+        while i != -1:
+            waypoints.append(i)
+            i = parent[i]
+        waypoints.append(start_i)
+        waypoints.reverse()
+
+        # 只展开前REFINE_HOPS段，每段都在同一区域内（或跨边界的相邻两格）
+        path = [start_i]
+        for a, b in list(zip(waypoints, waypoints[1:]))[:self.REFINE_HOPS]:
+            if a == b:
+                continue
+            cluster = self._cluster_of(a)
+            if self._cluster_of(b) != cluster:
+                path.append(b)  # 跨边界的入口对，本来就相邻
+                continue
+            _, prev = self._cluster_bfs(a, self._bounds(cluster), avoid, target=b)
+            if b not in prev:
+                # 临时障碍把区域内的路堵住了，退回格子A*
+                return self.fallback.find_path(start, goals, avoid_tiles)
+            segment = []
+            while b != a:
+                segment.append(b)
+                b = prev[b]
+            path.extend(reversed(segment))
+        return [(i % width, i // width) for i in path]
+
+
+# 格子数超过这个值时Boss改用分层寻路
+HIERARCHICAL_MIN_TILES = 128 * 128
+
+
+def create_planner(map_manager):
+    """按地图大小选择Boss用的寻路器：小地图用GridPathfinder，大地图用HierarchicalPlanner"""
+    grid = map_manager.collision_map
+    if grid.width * grid.height >= HIERARCHICAL_MIN_TILES:
+        return HierarchicalPlanner(map_manager)
+    return GridPathfinder(map_manager)
@@ -1,6 +1,9 @@
 import pygame
 import os
-import time
+import game_clock
+import sprite_cache
+import sprite_atlas
+import preloader
 import math
 import random
 from audio_manager import SoundCategory  # 新增导入
@@ -40,16 +43,20 @@ class SkillBullet:
         elif self.direction == 'down':
             self.pos[1] += self.speed
         self.update_rect()
-        self.frame_timer += 1/60
+        self.frame_timer += game_clock.dt()
         if self.frame_timer >= self.frame_interval:
             self.frame_timer = 0
             self.frame_idx += 1
             if self.frame_idx >= len(self.frames):
                 self.alive = False
         if enemies:
-            current_time = time.time()
+            current_time = game_clock.now()
             if current_time - self.last_damage_time >= self.damage_interval:
                 self.last_damage_time = current_time
+                index = getattr(self.enemy_manager, 'spatial_index', None)
+                if index is not None:
+                    # 只看判定框附近的敌人（敌人判定框四周各扩15像素）
+                    enemies = index.query_rect(self.rect, margin=15)
                 for enemy in enemies:
                     if enemy not in self.hit_enemies and enemy.alive:
                         enemy_rect = pygame.Rect(
@@ -74,7 +81,7 @@ class SkillBullet:
             surface.blit(frame, rect)
 
 class Player:
-    def __init__(self, spawn_pos, tile_size, is_valid_position, enemy_manager=None):
+    def __init__(self, spawn_pos, tile_size, is_valid_position, enemy_manager=None, map_manager=None):
         self.tile_width, self.tile_height = tile_size
         # 更贴合人物的碰撞体
         sprite_w, sprite_h = 48, 48
@@ -123,11 +130,11 @@ class Player:
         self.orbit_attack_hit = False  # 防止多次判定
         self.orbit_trail_length = 8  # 剑影数量
         self.orbit_particles = []  # 粒子特效
-        self.attack_sound = pygame.mixer.Sound("assets/sound/hit.wav")
+        self.attack_sound = preloader.load_sound("assets/sound/hit.wav")
         self.attack_sound.set_volume(0.5)
-        self.attack_none_sound = pygame.mixer.Sound("assets/sound/hitnone.wav")
+        self.attack_none_sound = preloader.load_sound("assets/sound/hitnone.wav")
         self.attack_none_sound.set_volume(0.5)
-        self.firehit_sound = pygame.mixer.Sound("assets/sound/firehit.wav")
+        self.firehit_sound = preloader.load_sound("assets/sound/firehit.wav")
         self.firehit_sound.set_volume(0.5)
         self.is_dashing = False
         self.dash_cooldown = 1.8  # 冲刺冷却（秒）
@@ -137,24 +144,24 @@ class Player:
         self.dash_timer = 0
         self.base_dash_speed = self.move_speed * 1.8
         self.dash_speed = self.base_dash_speed
-        self.dash_sound = pygame.mixer.Sound("assets/sound/dash.wav")
+        self.dash_sound = preloader.load_sound("assets/sound/dash.wav")
         self.dash_sound.set_volume(0.3)
-        self.firedash_sound = pygame.mixer.Sound("assets/sound/firedash.wav")
+        self.firedash_sound = preloader.load_sound("assets/sound/firedash.wav")
         self.firedash_sound.set_volume(0.3)
-        self.walk_sound = pygame.mixer.Sound("assets/sound/walk.wav")
+        self.walk_sound = preloader.load_sound("assets/sound/walk.wav")
         self.walk_sound.set_volume(0.3)
         self.walk_channel = None  # 用于控制走路音效的播放
         
         # 受伤音效
-        self.hurt_sound = pygame.mixer.Sound("assets/sound/hurt_out.wav")
+        self.hurt_sound = preloader.load_sound("assets/sound/hurt_out.wav")
         self.hurt_sound.set_volume(0.1)
-        self.scream_sound = pygame.mixer.Sound("assets/sound/Tom_Scream.wav")
+        self.scream_sound = preloader.load_sound("assets/sound/Tom_Scream.wav")
         self.scream_sound.set_volume(1)
         self.hurt_sound_toggle = False
         
         # 死亡音效相关设置
         try:
-            self.death_sound = pygame.mixer.Sound("assets/sound/death.wav")
+            self.death_sound = preloader.load_sound("assets/sound/death.wav")
             self.death_sound.set_volume(0.5)
             print("死亡音效加载成功")
             # 预先尝试播放一次（音量为0）以确保声道正常工作
@@ -171,6 +178,7 @@ class Player:
         self.death_channel = None  # 专用于死亡音效的声道
         self.dash_trail = []  # 拖尾记录（x, y, t）
         self.is_valid_position = is_valid_position  # 保存碰撞检测函数
+        self.map_manager = map_manager  # 有地图管理器时用批量碰撞查询
         
         # 变身相关
         self.has_maoluan = False  # 是否拥有耄耋之卵
@@ -178,18 +186,21 @@ class Player:
         self.transform_frames = {}  # 变身后的动画帧
         # 变身动画相关
         self.is_transforming = False  # 是否正在播放变身动画
-        self.transform_anim_frames = self._load_bianshen_frames()
+        # 变身、技能、弹幕的帧只有拿到耄耋之卵才用得到，第一次用到时再加载（Boss出现时提前预读）
+        transform_atlas = sprite_atlas.image_paths(("transform",))
+        self.transform_frames_asset = preloader.LazyAsset(self._load_transform_frames, transform_atlas)
+        self.transform_anim_asset = preloader.LazyAsset(self._load_bianshen_frames, transform_atlas)
+        self.skill_frames_asset = preloader.LazyAsset(self._load_skill_frames, transform_atlas)
+        self.bullet_frames_asset = preloader.LazyAsset(self._load_bullet_frames, transform_atlas)
         self.transform_anim_idx = 0
         self.transform_anim_timer = 0
         self.transform_anim_interval = 0.08  # 变身动画帧间隔
         # 技能动画相关
         self.is_using_skill = False
-        self.skill_frames = self._load_skill_frames()
         self.skill_idx = 0
         self.skill_timer = 0
         self.skill_interval = 0.08  # 技能动画帧间隔
         # 技能弹幕相关
-        self.bullet_frames = self._load_bullet_frames()
         self.skill_bullets = []
         self.enemy_manager = enemy_manager  # 新增
         # 技能冷却相关
@@ -201,15 +212,36 @@ class Player:
         self.transform_last_time = 0    # 上次解除变身的时间
         self.transform_start_time = 0   # 变身开始时间
         self.transform_end_invincible = 0  # 变身解除后无敌结束时间
-        self.wuhu_sound = pygame.mixer.Sound("assets/sound/wuhu.wav")
+        self.wuhu_sound = preloader.load_sound("assets/sound/wuhu.wav")
         self.wuhu_sound.set_volume(0.5)
-        self.fireskill_sound = pygame.mixer.Sound("assets/sound/fireskill.wav")
+        self.fireskill_sound = preloader.load_sound("assets/sound/fireskill.wav")
         self.fireskill_sound.set_volume(0.5)
         
         # 添加audio_manager引用
         self.audio_manager = None  # 将在main.py中设置
     
+    @property
+    def transform_anim_frames(self):
+        return self.transform_anim_asset.get()
+
+    @property
+    def skill_frames(self):
+        return self.skill_frames_asset.get()
+
+    @property
+    def bullet_frames(self):
+        return self.bullet_frames_asset.get()
+
+    def prefetch_transform_assets(self):
+        """快要用到变身相关的帧时调用（Boss出现），后台先把图集解码好"""
+        for asset in (self.transform_frames_asset, self.transform_anim_asset,
+                      self.skill_frames_asset, self.bullet_frames_asset):
+            asset.prefetch()
+
     def _load_frames(self, action):
+        frames = sprite_atlas.frames("player", f"player_frames/{action}")
+        if frames is not None:
+            return frames
         img_dir = "assets/characters/player_frames"
         frames = []
         idx = 1
@@ -267,7 +299,10 @@ class Player:
         return frames
     
     def _load_dir_frames(self, dir_path):
-        """从目录加载所有png文件作为动画帧"""
+        """从目录加载所有png文件作为动画帧，有图集时直接取图集里的"""
+        frames = sprite_atlas.frames("transform", sprite_atlas.group_name(dir_path))
+        if frames is not None:
+            return frames
         frames = []
         try:
             if not os.path.exists(dir_path):
@@ -286,6 +321,9 @@ class Player:
         return frames
 
     def _load_bianshen_frames(self):
+        frames = sprite_atlas.frames("transform", "transform/bianshen")
+        if frames is not None:
+            return frames
         frames = []
         dir_path = "assets/characters/transform/bianshen"
         try:
@@ -304,6 +342,9 @@ class Player:
         return frames
 
     def _load_skill_frames(self):
+        frames = sprite_atlas.frames("transform", "transform/skill")
+        if frames is not None:
+            return frames
         frames = []
         dir_path = "assets/characters/transform/skill"
         try:
@@ -322,6 +363,9 @@ class Player:
         return frames
 
     def _load_bullet_frames(self):
+        frames = sprite_atlas.frames("transform", "transform/bullet")
+        if frames is not None:
+            return frames
         frames = []
         dir_path = "assets/characters/transform/bullet"
         try:
@@ -344,39 +388,73 @@ class Player:
             return  # 死亡、变身、技能期间不能移动
         if self.is_dashing:
             return  # 冲刺期间不能手动移动
-        old_x, old_y = self.rect.topleft
         self.is_moving = False
         # 处理水平移动
         if keys[pygame.K_a]:
-            self.rect.x -= self.move_speed
             self.facing_left = True
             self.direction = "left"
             self.is_moving = True
-            if not all(is_valid_position(self.rect.left, y) for y in range(self.rect.top + 4, self.rect.bottom - 4, 4)):
-                self.rect.x = old_x
+            self._move_axis(-self.move_speed, 0, is_valid_position)
         if keys[pygame.K_d]:
-            self.rect.x += self.move_speed
             self.facing_left = False
             self.direction = "right"
             self.is_moving = True
-            if not all(is_valid_position(self.rect.right - 1, y) for y in range(self.rect.top + 4, self.rect.bottom - 4, 4)):
-                self.rect.x = old_x
+            self._move_axis(self.move_speed, 0, is_valid_position)
         # 处理垂直移动
         if keys[pygame.K_w]:
-            self.rect.y -= self.move_speed
             self.direction = "up"
             self.is_moving = True
-            if not all(is_valid_position(x, self.rect.top) for x in range(self.rect.left + 4, self.rect.right - 4, 4)):
-                self.rect.y = old_y
+            self._move_axis(0, -self.move_speed, is_valid_position)
         if keys[pygame.K_s]:
-            self.rect.y += self.move_speed
             self.direction = "down"
             self.is_moving = True
-            if not all(is_valid_position(x, self.rect.bottom - 1) for x in range(self.rect.left + 4, self.rect.right - 4, 4)):
-                self.rect.y = old_y
+            self._move_axis(0, self.move_speed, is_valid_position)
+
+    def _move_axis(self, dx, dy, is_valid_position):
+        """沿单个轴移动碰撞体；碰撞只看移动方向前沿上、两端各缩进4像素的那一段边"""
+        moved = self.rect.copy()
+        moved.x += dx
+        moved.y += dy
+        if dx:
+            span = range(self.rect.top + 4, self.rect.bottom - 4, 4)
+        else:
+            span = range(self.rect.left + 4, self.rect.right - 4, 4)
+        if not span:
+            self.rect.topleft = moved.topleft
+            return
+        if self.map_manager:
+            # 扫掠整段前沿，一次调用得到不穿墙的最远位置
+            if dx:
+                self.rect.x, _ = self.map_manager.sweep_rect(
+                    self.rect.x, span[0], self.rect.width, span[-1] - span[0] + 1, moved.x - self.rect.x, 0)
+            else:
+                _, self.rect.y = self.map_manager.sweep_rect(
+                    span[0], self.rect.y, span[-1] - span[0] + 1, self.rect.height, 0, moved.y - self.rect.y)
+            return
+        if dx < 0:
+            clear = all(is_valid_position(moved.left, y) for y in span)
+        elif dx > 0:
+            clear = all(is_valid_position(moved.right - 1, y) for y in span)
+        elif dy < 0:
+            clear = all(is_valid_position(x, moved.top) for x in span)
+        else:
+            clear = all(is_valid_position(x, moved.bottom - 1) for x in span)
+        if clear:
+            self.rect.topleft = moved.topleft
+
+    def _dash_steps(self, dx, dy, steps):
+        """返回沿(dx, dy)逐像素冲刺时，在撞墙前最多能走的步数（以碰撞体中心判定）"""
+        cx, cy = self.rect.center
+        if self.map_manager:
+            new_cx, new_cy = self.map_manager.sweep_rect(cx, cy, 1, 1, dx * steps, dy * steps)
+            return abs(new_cx - cx) + abs(new_cy - cy)
+        for i in range(1, steps + 1):
+            if not self.is_valid_position(cx + dx * i, cy + dy * i):
+                return i - 1
+        return steps
 
     def attack(self):
-        current_time = time.time()
+        current_time = game_clock.now()
         if not self.attacking and current_time - self.attack_last_time >= self.attack_cooldown:
             self.attacking = True
             self.attack_timer = current_time
@@ -436,13 +514,13 @@ class Player:
             )
 
     def update(self):
-        now = time.time()
+        now = game_clock.now()
         prev_action = self.action
         # 变身动画流程
         if self.is_transforming:
             self.action = "bianshen"
             if self.transform_anim_idx < len(self.transform_anim_frames) - 1:
-                self.transform_anim_timer += 1/60
+                self.transform_anim_timer += game_clock.dt()
                 if self.transform_anim_timer >= self.transform_anim_interval:
                     self.transform_anim_timer = 0
                     self.transform_anim_idx += 1
@@ -473,7 +551,7 @@ class Player:
                     print(f"update中播放死亡音效失败: {e}")
             
             if frames_list and self.frame_idx < len(frames_list) - 1:
-                self.frame_timer += 1/60
+                self.frame_timer += game_clock.dt()
                 if self.frame_timer >= self.frame_interval:
                     self.frame_timer = 0
                     self.frame_idx += 1
@@ -509,15 +587,12 @@ class Player:
                 dy = -1
             elif self.direction == "down":
                 dy = 1
-            for _ in range(int(speed)):
-                old_x, old_y = self.rect.x, self.rect.y
-                self.rect.x += dx
-                self.rect.y += dy
-                if not self.is_valid_position(self.rect.centerx, self.rect.centery):
-                    self.rect.x, self.rect.y = old_x, old_y
-                    break
-                if not self.transformed:
-                    self.dash_trail.append((self.rect.x, self.rect.y, time.time()))
+            steps = self._dash_steps(dx, dy, int(speed))
+            if not self.transformed:
+                for i in range(1, steps + 1):
+                    self.dash_trail.append((self.rect.x + dx * i, self.rect.y + dy * i, game_clock.now()))
+            self.rect.x += dx * steps
+            self.rect.y += dy * steps
             if not self.transformed:
                 self.dash_trail = [t for t in self.dash_trail if now - t[2] < 0.2]
             if self.transformed and "dash" in self.transform_frames:
@@ -569,7 +644,7 @@ class Player:
             frames_list = frames_dict.get("idle_down")
         if not frames_list:
             return
-        self.frame_timer += 1/60
+        self.frame_timer += game_clock.dt()
         if self.frame_timer >= self.frame_interval:
             self.frame_timer = 0
             self.frame_idx = (self.frame_idx + 1) % len(frames_list)
@@ -596,7 +671,7 @@ class Player:
                 self.skill_bullets.append(SkillBullet(bullet_pos, direction, self.bullet_frames, self.enemy_manager))
                 self.skill_bullet_fired = True
             if self.skill_idx < len(self.skill_frames) - 1:
-                self.skill_timer += 1/60
+                self.skill_timer += game_clock.dt()
                 if self.skill_timer >= self.skill_interval:
                     self.skill_timer = 0
                     self.skill_idx += 1
@@ -614,7 +689,7 @@ class Player:
         if not self.is_dead and not self.invincible:
             self.current_health = max(0, self.current_health - damage)
             self.invincible = True
-            self.invincible_timer = time.time()
+            self.invincible_timer = game_clock.now()
             # 播放受伤音效，轮流播放
             try:
                 channel = pygame.mixer.Channel(6)
@@ -673,7 +748,7 @@ class Player:
     def jump(self):
         if not self.is_jumping and not self.is_dead:
             self.is_jumping = True
-            self.jump_timer = time.time()
+            self.jump_timer = game_clock.now()
             self.frame_idx = 0
 
     def draw(self, surface, camera_x, camera_y, show_debug_hitbox=False):
@@ -720,7 +795,7 @@ class Player:
                     frames_list = frames_dict.get("idle_down")
                 if frames_list:
                     frame = frames_list[self.frame_idx % len(frames_list)]
-                    alpha = int(120 * (1 - (time.time() - t) / 0.2))
+                    alpha = int(120 * (1 - (game_clock.now() - t) / 0.2))
                     trail_img = frame.copy()
                     trail_img.set_alpha(alpha)
                     draw_x = tx - (48 - self.rect.width) // 2
@@ -766,14 +841,13 @@ class Player:
             draw_y = self.rect.y - (frame_height - self.rect.height)
         # 保证变身解除后无敌1秒期间必定闪烁
         visible = True
-        if (self.invincible or (hasattr(self, 'transform_end_invincible') and self.transform_end_invincible > time.time())) and not self.is_dashing:
-            visible = int(time.time() * 10) % 2 == 0
+        if (self.invincible or (hasattr(self, 'transform_end_invincible') and self.transform_end_invincible > game_clock.now())) and not self.is_dashing:
+            visible = int(game_clock.now() * 10) % 2 == 0
         if visible:
             surface.blit(frame, (draw_x - camera_x, draw_y - camera_y))
         # 只在show_debug_hitbox为True时绘制碰撞体和攻击范围
         if show_debug_hitbox:
-            collision_surface = pygame.Surface((self.rect.width, self.rect.height), pygame.SRCALPHA)
-            pygame.draw.rect(collision_surface, (255, 0, 0, 128), collision_surface.get_rect())
+            collision_surface = sprite_cache.rect(self.rect.size, (255, 0, 0), 128)
             surface.blit(collision_surface, (self.rect.x - camera_x, self.rect.y - camera_y))
             margin = 4
             for y in range(self.rect.top + margin, self.rect.bottom - margin, 4):
@@ -849,14 +923,14 @@ class Player:
         return self.is_dead and frames_list and self.frame_idx == len(frames_list) - 1 
 
     def dash(self):
-        now = time.time()
+        now = game_clock.now()
         if not self.is_dead and not self.is_dashing and now - self.dash_last_time >= self.dash_cooldown:
             self.is_dashing = True
             self.dash_timer = now
             self.dash_last_time = now
             self.invincible = True  # 冲刺期间无敌
             self.dash_trail.clear()  # dash开始时清空拖尾
-            self.dash_trail.append((self.rect.x, self.rect.y, time.time()))  # 记录起点
+            self.dash_trail.append((self.rect.x, self.rect.y, game_clock.now()))  # 记录起点
             # 无论是否移动，都播放冲刺音效
             try:
                 if self.transformed:
@@ -883,11 +957,11 @@ class Player:
         if img_path == "assets/weapon/maoluan.png":
             self.has_maoluan = True
             # 加载变身动画帧
-            self.transform_frames = self._load_transform_frames()
+            self.transform_frames = self.transform_frames_asset.get()
             print("获得了耄耋之卵，按L键可以变身！")
     
     def toggle_transform(self):
-        now = time.time()
+        now = game_clock.now()
         # 冷却判定
         if self.has_maoluan and not self.is_dead and not self.is_transforming:
             if not self.transformed and now - self.transform_last_time < self.transform_cooldown:
@@ -913,7 +987,7 @@ class Player:
             self.dash_speed = self.base_dash_speed 
 
     def use_skill(self):
-        now = time.time()
+        now = game_clock.now()
         if self.transformed and not self.is_using_skill and not self.is_transforming and not self.is_dead:
             # 技能冷却判定
             if now - self.skill_last_time < self.skill_cooldown:
@@ -963,28 +1037,28 @@ class Player:
 
     def get_dash_cooldown_info(self):
         """返回(剩余冷却时间, 总冷却时间)"""
-        now = time.time()
+        now = game_clock.now()
         elapsed = now - self.dash_last_time
         remain = max(0, self.dash_cooldown - elapsed)
         return remain, self.dash_cooldown
 
     def get_attack_cooldown_info(self):
         """返回(剩余冷却时间, 总冷却时间)"""
-        now = time.time()
+        now = game_clock.now()
         elapsed = now - self.attack_last_time
         remain = max(0, self.attack_cooldown - elapsed)
         return remain, self.attack_cooldown
 
     def get_skill_cooldown_info(self):
         """返回(剩余冷却时间, 总冷却时间)"""
-        now = time.time()
+        now = game_clock.now()
         elapsed = now - self.skill_last_time
         remain = max(0, self.skill_cooldown - elapsed)
         return remain, self.skill_cooldown
 
     def get_transform_cooldown_info(self):
         """返回(剩余冷却时间, 总冷却时间)"""
-        now = time.time()
+        now = game_clock.now()
         elapsed = now - self.transform_last_time
         remain = max(0, self.transform_cooldown - elapsed)
         return remain, self.transform_cooldown
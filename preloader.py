@@ -0,0 +1,233 @@
+"""标题菜单期间在后台线程预读资源，点"开始游戏"之后不再卡在加载上
+
+工作线程做磁盘读取和解码：PNG解码成还没convert的Surface，WAV解码并转成混音器格式的原始采样bytes。
+convert_alpha和创建Sound必须在主线程，由菜单每帧调用pump()分批完成。
+游戏代码通过load_image/load_sound取资源：已预读的直接拿，还在读的等它读完，没预读的同步加载。
+图片先查disk_cache里上次存下的像素，命中就不用解码PNG；缩放等派生图按recipe单独缓存。
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+import disk_cache
+
+
+def _decode_image(path):
+    """返回(贴图, 是否来自磁盘缓存)；不能convert：工作线程里convert不安全"""
+    cache = disk_cache.get_cache()
+    if cache is not None:
+        surface = cache.read(path)
+        if surface is not None:
+            return surface, True
+    return pygame.image.load(path), False
+
+
+def _decode_sound(path):
+    # 解码和重采样在这里做，主线程用原始采样建Sound只是一次拷贝
+    return pygame.mixer.Sound(path).get_raw()
+
+
+_alpha_format = None  # convert_alpha之后的(位数, 掩码)，第一次用到时取
+
+
+def _convert(surface):
+    """convert_alpha；磁盘缓存读出的贴图本来就是这个格式时直接用，不再整图拷贝一次"""
+    global _alpha_format
+    if _alpha_format is None:
+        probe = pygame.Surface((1, 1), pygame.SRCALPHA).convert_alpha()
+        _alpha_format = (probe.get_bitsize(), probe.get_masks())
+    if (surface.get_bitsize(), surface.get_masks()) == _alpha_format and surface.get_flags() & pygame.SRCALPHA:
+        return surface
+    return surface.convert_alpha()
+
+
+class AssetPreloader:
+    def __init__(self, workers=2):
+        self.workers = workers
+        self.images = {}  # (路径, recipe) -> convert_alpha后的Surface，所有调用方共用，不能在上面画
+        self.sounds = {}  # 路径 -> 原始采样bytes，每次load_sound都新建Sound，音量互不影响
+        self.tasks = []  # [(名字, 函数)]，主线程上按顺序执行的加载步骤（地图等）
+        self.results = {}  # 任务名 -> (结果, 异常)
+        self.total = 0
+        self.done = 0
+        self._pending = {}  # (类型, 路径) -> Future
+        self._executor = None
+
+    def start(self, images=(), sounds=()):
+        """把要预读的图片和音效交给工作线程"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="preload")
+        for kind, paths, decode in (("image", images, _decode_image), ("sound", sounds, _decode_sound)):
+            for path in paths:
+                key = (kind, os.path.normpath(path))
+                if not os.path.exists(key[1]):
+                    continue  # 缺失的文件留给同步加载按原来的方式报错
+                if key in self._pending or (key[1], "") in self.images or key[1] in self.sounds:
+                    continue
+                self._pending[key] = self._executor.submit(decode, key[1])
+                self.total += 1
+
+    def add_task(self, name, func):
+        """加一个必须在主线程执行的加载步骤，pump()每次最多执行一个"""
+        self.tasks.append((name, func))
+        self.total += 1
+
+    def pump(self, max_items=8):
+        """主线程每帧调用：收下解码好的资源并convert，再执行一个任务；返回本次完成的个数"""
+        finished = 0
+        for key, future in list(self._pending.items()):
+            if finished >= max_items:
+                break
+            if future.done():
+                self._finish(key)
+                finished += 1
+        if self.tasks and finished < max_items:
+            self._run_task()
+            finished += 1
+        return finished
+
+    def _finish(self, key):
+        future = self._pending.pop(key)
+        kind, path = key
+        self.done += 1
+        try:
+            result = future.result()
+        except Exception as e:
+            # 留给load_image/load_sound同步加载时按原来的方式报错
+            print(f"预加载失败 {path}: {e}")
+            return
+        if kind == "image":
+            surface, cached = result
+            self.images[(path, "")] = _convert(surface) if cached else surface.convert_alpha()
+            if not cached:
+                self._store(path, self.images[(path, "")])
+        else:
+            self.sounds[path] = result
+
+    def _run_task(self):
+        name, func = self.tasks.pop(0)
+        self.done += 1
+        try:
+            self.results[name] = (func(), None)
+        except Exception as e:
+            self.results[name] = (None, e)
+
+    def progress(self):
+        """已完成的比例（0~1），没有要加载的东西时为1"""
+        return self.done / self.total if self.total else 1.0
+
+    def is_done(self):
+        return not self._pending and not self.tasks
+
+    def finish(self):
+        """阻塞到全部加载完成"""
+        for key in list(self._pending):
+            self._finish(key)  # future.result()会等工作线程读完
+        while self.tasks:
+            self._run_task()
+
+    def result(self, name):
+        """任务的返回值，任务还没执行时先执行完它前面的所有任务；任务抛出的异常在这里重新抛出"""
+        while name not in self.results and self.tasks:
+            self._run_task()
+        value, error = self.results[name]
+        if error is not None:
+            raise error
+        return value
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def load_image(self, path, recipe="", build=None):
+        """convert_alpha后的图片，等价于pygame.image.load(path).convert_alpha()，但返回的Surface是共用的
+
+        传recipe和build时返回派生图build(原图)，recipe要能唯一描述build做的事（如"scale32x32"）。
+        """
+        path = os.path.normpath(path)
+        if ("image", path) in self._pending:
+            self._finish(("image", path))
+        image = self.images.get((path, recipe))
+        if image is not None:
+            return image
+        cache = disk_cache.get_cache()
+        cached = cache.read(path, recipe) if cache is not None else None
+        if cached is not None:
+            image = _convert(cached)
+        elif recipe:
+            image = build(self.load_image(path))
+            self._store(path, image, recipe)
+        else:
+            image = pygame.image.load(path).convert_alpha()
+            self._store(path, image)
+        self.images[(path, recipe)] = image
+        return image
+
+    @staticmethod
+    def _store(path, image, recipe=""):
+        cache = disk_cache.get_cache()
+        if cache is not None:
+            cache.write(path, image, recipe)
+
+    def load_sound(self, path):
+        """新建一个Sound，等价于pygame.mixer.Sound(path)"""
+        path = os.path.normpath(path)
+        if ("sound", path) in self._pending:
+            self._finish(("sound", path))
+        raw = self.sounds.get(path)
+        if raw is None:
+            return pygame.mixer.Sound(path)
+        return pygame.mixer.Sound(buffer=raw)
+
+
+class LazyAsset:
+    """第一次get()时才加载的资源句柄
+
+    prefetch()是"快要用到了"的提示：把加载要读的图片交给预加载线程先解码，
+    之后get()在主线程上只剩convert和组装。没有提示时get()就地同步加载。
+    """
+
+    def __init__(self, loader, prefetch_images=()):
+        self.loader = loader
+        self.prefetch_images = tuple(prefetch_images)
+        self.value = None
+        self.loaded = False
+
+    def get(self):
+        if not self.loaded:
+            self.value = self.loader()
+            self.loaded = True
+        return self.value
+
+    def prefetch(self):
+        if not self.loaded and self.prefetch_images:
+            _preloader.start(self.prefetch_images)
+
+    def unload(self):
+        self.value = None
+        self.loaded = False
+
+
+_preloader = AssetPreloader()
+
+
+def get_preloader():
+    return _preloader
+
+
+def set_preloader(preloader):
+    """替换共用的预加载器，返回旧的"""
+    global _preloader
+    old = _preloader
+    _preloader = preloader
+    return old
+
+
+def load_image(path, recipe="", build=None):
+    return _preloader.load_image(path, recipe, build)
+
+
+def load_sound(path):
+    return _preloader.load_sound(path)
@@ -0,0 +1,118 @@
+"""帧耗时分析器：把主循环的每个阶段计时，显示滚动的p50/p95/p99，并可导出CSV
+
+用法：每帧开头begin_frame()，每个阶段结束时lap("阶段名")，帧末end_frame()。
+同名阶段在一帧里多次lap会累加（例如固定步长一帧内走了多步）。
+"""
+import csv
+import time
+from collections import deque
+
+import pygame
+
+import sprite_cache
+
+
+class FrameProfiler:
+    FRAME_BUDGET_MS = 1000 / 60
+
+    def __init__(self, window=300, trace_limit=36000, refresh_interval=30):
+        self.enabled = False
+        self.window = window  # 计算百分位用的最近帧数
+        self.samples = {}  # 阶段名 -> 最近window帧的耗时(ms)
+        self.section_order = []  # 按第一次出现的顺序显示
+        self.trace = deque(maxlen=trace_limit)  # 每帧一行，用于导出CSV
+        self.frame_index = 0
+        self.refresh_interval = refresh_interval  # 每隔多少帧重新计算一次百分位
+        self._stats = {}
+        self._stats_age = 0
+        self._current = {}
+        self._last = 0.0
+        self._frame_start = 0.0
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        self._current = {}
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self._current = {}
+        self._frame_start = self._last = time.perf_counter()
+
+    def lap(self, name):
+        """记录从上一次lap（或帧开始）到现在的耗时，记到name阶段"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._current[name] = self._current.get(name, 0.0) + (now - self._last) * 1000
+        self._last = now
+
+    def end_frame(self):
+        if not self.enabled or not self._current:
+            return
+        current = self._current
+        current["总计"] = (time.perf_counter() - self._frame_start) * 1000
+        for name in current:
+            if name not in self.samples:
+                self.samples[name] = deque(maxlen=self.window)
+                self.section_order.append(name)
+        # 本帧没出现的阶段记0，保证各阶段的样本按帧对齐
+        for name in self.section_order:
+            self.samples[name].append(current.get(name, 0.0))
+        self.trace.append((self.frame_index, current))
+        self.frame_index += 1
+        self._stats_age += 1
+        self._current = {}
+
+    def percentiles(self, name):
+        """返回某阶段最近window帧的(p50, p95, p99)，单位ms"""
+        values = sorted(self.samples.get(name, ()))
+        if not values:
+            return 0.0, 0.0, 0.0
+        last = len(values) - 1
+        return tuple(values[min(last, int(last * p))] for p in (0.5, 0.95, 0.99))
+
+    def stats(self):
+        """各阶段的百分位，每refresh_interval帧才重新排序一次"""
+        if self._stats_age >= self.refresh_interval or len(self._stats) != len(self.section_order):
+            self._stats = {name: self.percentiles(name) for name in self.section_order}
+            self._stats_age = 0
+        return self._stats
+
+    def draw(self, surface, font, x, y, bar_width=160):
+        """绘制条形图：条长为p95相对16.7ms帧预算的比例，文字为p50/p95/p99"""
+        stats = self.stats()
+        if not stats:
+            return
+        line_height = font.get_linesize()
+        panel = sprite_cache.rect((bar_width + 300, line_height * (len(stats) + 2) + 10), (0, 0, 0), 150)
+        surface.blit(panel, (x - 5, y - 5))
+        title = font.render("阶段  p50 / p95 / p99 (ms)", True, (255, 255, 255))
+        surface.blit(title, (x, y))
+        for i, name in enumerate(self.section_order):
+            p50, p95, p99 = stats.get(name, (0.0, 0.0, 0.0))
+            row_y = y + line_height * (i + 1)
+            ratio = min(1.0, p95 / self.FRAME_BUDGET_MS)
+            color = (80, 200, 80) if ratio < 0.5 else (230, 200, 60) if ratio < 0.9 else (230, 70, 70)
+            pygame.draw.rect(surface, (60, 60, 60), (x, row_y + 4, bar_width, line_height - 8))
+            pygame.draw.rect(surface, color, (x, row_y + 4, int(bar_width * ratio), line_height - 8))
+            text = font.render(f"{name}  {p50:.2f} / {p95:.2f} / {p99:.2f}", True, (255, 255, 255))
+            surface.blit(text, (x + bar_width + 8, row_y))
+        cache = sprite_cache.get_cache().stats()
+        text = font.render(f"贴图缓存  命中率 {cache['hit_rate'] * 100:.1f}%  条目 {cache['entries']}  "
+                           f"{cache['bytes'] / 1048576:.1f}MB", True, (200, 200, 200))
+        surface.blit(text, (x, y + line_height * (len(self.section_order) + 1)))
+
+    def dump_csv(self, path="profiler_trace.csv"):
+        """把记录的每帧耗时写成CSV（每行一帧，每列一个阶段）"""
+        try:
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["frame"] + self.section_order)
+                for frame, sections in self.trace:
+                    writer.writerow([frame] + [f"{sections.get(name, 0.0):.4f}" for name in self.section_order])
+            print(f"帧耗时记录已导出到 {path}（{len(self.trace)} 帧）")
+            return True
+        except Exception as e:
+            print(f"导出帧耗时记录时出错: {e}")
+            return False
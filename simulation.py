@@ -0,0 +1,269 @@
+"""无窗口模拟：不打开显示窗口、不限帧率地推进游戏世界，用于浸泡测试和性能测试
+
+用法:
+    python simulation.py --frames 20000 --seed 1 --quiet
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import contextlib
+import pygame
+import game_clock
+
+
+def step_world(player, map_manager, enemy_manager, keys, delta_time, audio_manager=None, profiler=None):
+    """推进一帧游戏逻辑（移动、攻击、敌人），主循环和无窗口模拟共用
+
+    keys是按键状态（pygame.key.get_pressed()或同样可以按键码下标访问的对象）。
+    传入profiler时按阶段计时。返回玩家这一帧是否发起了攻击。
+    """
+    player.move(keys, map_manager.is_valid_position)
+
+    # 更新玩家状态
+    player.update()
+    if profiler:
+        profiler.lap("玩家更新")
+
+    # 环绕攻击模式下，动画期间每帧都判定一次
+    if player.attack_mode == "orbit" and player.orbit_attack_anim:
+        attack_rect = player.get_orbit_attack_rect()
+        if attack_rect.width > 0 and not player.orbit_attack_hit:
+            if enemy_manager.check_attacks(attack_rect):
+                player.orbit_attack_hit = True
+
+    # 更新敌人管理器
+    enemy_manager.update(map_manager.is_valid_position, delta_time)
+
+    # 更新音频管理器
+    if audio_manager:
+        audio_manager.update(delta_time)
+
+    # 更新玩家的敌人列表
+    player.set_enemies(enemy_manager.targets)
+    if profiler:
+        profiler.lap("敌人更新")
+
+    # 处理攻击按键
+    attacked = False
+    if keys[pygame.K_j]:
+        if player.attack():
+            attacked = True
+            if player.attack_mode == "orbit":
+                attack_rect = player.get_orbit_attack_rect()
+                if attack_rect.width > 0:
+                    enemy_manager.check_attacks(attack_rect)
+            else:
+                enemy_manager.check_attacks(player.attack_rect)
+    if profiler:
+        profiler.lap("攻击判定")
+    return attacked
+
+
+class ScriptedKeys:
+    """模拟pygame.key.get_pressed()的返回值，按下的键保存在一个集合里"""
+
+    def __init__(self, pressed=()):
+        self.pressed = set(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+class InputScript:
+    """按帧编排的输入脚本
+
+    hold(key, start, end)：在[start, end)帧内按住某键（移动、攻击）
+    tap(key, frame)：在某一帧触发一次按键事件（冲刺、变身、技能）
+    """
+
+    def __init__(self):
+        self.holds = []
+        self.taps = {}
+
+    def hold(self, key, start, end):
+        self.holds.append((key, start, end))
+        return self
+
+    def tap(self, key, frame):
+        self.taps.setdefault(frame, []).append(key)
+        return self
+
+    def keys_at(self, frame):
+        return ScriptedKeys(key for key, start, end in self.holds if start <= frame < end)
+
+    def taps_at(self, frame):
+        return self.taps.get(frame, ())
+
+    @classmethod
+    def random(cls, frames, seed=0, segment=30):
+        """生成随机输入：每segment帧换一次移动/攻击组合，偶尔冲刺、变身、放技能"""
+        rng = random.Random(seed)
+        script = cls()
+        for start in range(0, frames, segment):
+            for key in (pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d, pygame.K_j):
+                if rng.random() < 0.4:
+                    script.hold(key, start, start + segment)
+            if rng.random() < 0.2:
+                script.tap(pygame.K_k, start)
+            if rng.random() < 0.02:
+                script.tap(pygame.K_l, start)
+            if rng.random() < 0.05:
+                script.tap(pygame.K_i, start)
+        return script
+
+
+class HeadlessSimulation:
+    """不打开窗口地创建MapManager/Player/EnemyManager/EffectManager，并按固定dt推进"""
+
+    def __init__(self, tmx_path="Tiled/myMap.tmx", script=None, delta_time=game_clock.FIXED_DT, seed=None,
+                 render=False, view_size=(320, 240), collision_file="collision_map.bin", profiler=None):
+        from map_manager import MapManager
+        from player import Player
+        from enemy_manager import EnemyManager
+        from effects import EffectManager
+
+        if seed is not None:
+            random.seed(seed)
+        # 每个模拟用自己的时钟，时间只随step前进，和真实时间无关
+        self.clock = game_clock.GameClock(fixed_dt=delta_time)
+        game_clock.set_clock(self.clock)
+        # 必须在pygame初始化之前设置，使用SDL的dummy驱动（main.py也会导入本模块，所以不能放在模块顶层）
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        pygame.init()
+        # dummy驱动下也需要一个显示模式，convert_alpha才能工作
+        if pygame.display.get_surface() is None:
+            pygame.display.set_mode((1, 1))
+
+        self.map_manager = MapManager(tmx_path, collision_file=collision_file, debug=False)
+        self.player = Player(self.map_manager.find_safe_spawn(),
+                             (self.map_manager.tile_width, self.map_manager.tile_height),
+                             self.map_manager.is_valid_position, map_manager=self.map_manager)
+        self.enemy_manager = EnemyManager(self.map_manager, self.player)
+        self.player.enemy_manager = self.enemy_manager
+        self.effect_manager = EffectManager()
+        self.enemy_manager.on_enemy_dead = self.effect_manager.create_small_explosion
+        self.enemy_manager.on_boss_dead = self._on_boss_dead
+
+        self.script = script or InputScript()
+        self.delta_time = delta_time
+        self.frame = 0
+        self.attacks = 0
+        self.render = render
+        self.view_size = view_size
+        self.view = pygame.Surface(view_size, pygame.SRCALPHA) if render else None
+        self.profiler = profiler
+
+    def _on_boss_dead(self, pos=None):
+        if pos is None and self.enemy_manager.boss:
+            pos = self.enemy_manager.boss.rect.center
+        if pos:
+            self.effect_manager.create_explosion(pos)
+
+    def _handle_tap(self, key):
+        """和main.py里KEYDOWN的玩法按键对应"""
+        if key == pygame.K_k:
+            self.player.dash()
+        elif key == pygame.K_l:
+            self.player.toggle_transform()
+        elif key == pygame.K_i:
+            self.player.use_skill()
+
+    def step(self):
+        profiler = self.profiler
+        if profiler:
+            profiler.begin_frame()
+        self.clock.advance()
+        for key in self.script.taps_at(self.frame):
+            self._handle_tap(key)
+        keys = self.script.keys_at(self.frame)
+        if step_world(self.player, self.map_manager, self.enemy_manager, keys, self.delta_time,
+                      profiler=profiler):
+            self.attacks += 1
+        self.effect_manager.update(self.delta_time)
+        if self.enemy_manager.weapon_drop:
+            self.enemy_manager.weapon_drop.update()
+        if profiler:
+            profiler.lap("特效")
+        if self.render:
+            self._draw()
+            if profiler:
+                profiler.lap("绘制")
+        if profiler:
+            profiler.end_frame()
+        self.frame += 1
+
+    def _draw(self):
+        view_w, view_h = self.view_size
+        camera_x = self.player.rect.centerx - view_w // 2
+        camera_y = self.player.rect.centery - view_h // 2
+        camera_x = max(0, min(camera_x, self.map_manager.map_width - view_w))
+        camera_y = max(0, min(camera_y, self.map_manager.map_height - view_h))
+        self.view.fill((20, 20, 20, 255))
+        self.map_manager.draw_map(self.view, camera_x, camera_y, view_w, view_h)
+        self.enemy_manager.draw(self.view, camera_x, camera_y)
+        self.player.draw(self.view, camera_x, camera_y)
+        self.effect_manager.draw(self.view, camera_x, camera_y)
+
+    def run(self, frames):
+        """推进frames帧，返回统计信息"""
+        start = time.perf_counter()
+        for _ in range(frames):
+            self.step()
+        elapsed = time.perf_counter() - start
+        simulated = frames * self.delta_time
+        return {
+            "frames": frames,
+            "elapsed": elapsed,
+            "simulated_seconds": simulated,
+            "speedup": simulated / elapsed if elapsed > 0 else float("inf"),
+            "attacks": self.attacks,
+            "enemies": len(self.enemy_manager.enemies),
+            "killed": self.enemy_manager.killed_count,
+            "boss": bool(self.enemy_manager.boss and self.enemy_manager.boss.alive),
+            "player_health": self.player.current_health,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="无窗口运行游戏模拟")
+    parser.add_argument("--frames", type=int, default=3600, help="模拟帧数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子（输入脚本和游戏逻辑）")
+    parser.add_argument("--dt", type=float, default=game_clock.FIXED_DT, help="每帧的模拟时间（秒）")
+    parser.add_argument("--map", default="Tiled/myMap.tmx", help="TMX地图路径")
+    parser.add_argument("--render", action="store_true", help="同时绘制到离屏表面")
+    parser.add_argument("--quiet", action="store_true", help="屏蔽游戏内部的print输出")
+    parser.add_argument("--profile", metavar="CSV", help="按阶段计时并把每帧耗时导出到CSV")
+    args = parser.parse_args(argv)
+
+    profiler = None
+    if args.profile:
+        from profiler import FrameProfiler
+        profiler = FrameProfiler(window=args.frames, trace_limit=args.frames)
+        profiler.set_enabled(True)
+
+    output = open(os.devnull, "w") if args.quiet else sys.stdout
+    try:
+        with contextlib.redirect_stdout(output):
+            sim = HeadlessSimulation(args.map, InputScript.random(args.frames, args.seed),
+                                     delta_time=args.dt, seed=args.seed, render=args.render,
+                                     profiler=profiler)
+            stats = sim.run(args.frames)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(f"模拟 {stats['frames']} 帧用时 {stats['elapsed']:.2f}s，"
+          f"相当于游戏内 {stats['simulated_seconds']:.1f}s（{stats['speedup']:.0f}x 实时）")
+    print(f"击杀: {stats['killed']}  剩余敌人: {stats['enemies']}  Boss: {stats['boss']}  "
+          f"玩家血量: {stats['player_health']}")
+    if profiler:
+        for name, (p50, p95, p99) in profiler.stats().items():
+            print(f"  {name}: p50 {p50:.3f}ms  p95 {p95:.3f}ms  p99 {p99:.3f}ms")
+        profiler.dump_csv(args.profile)
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 import pygame
 import os
-import time
-from enemy import Enemy
+import game_clock
+import sprite_cache
+import asset_registry
+import sprite_atlas
+from enemy import Enemy, move_with_collision
 
 class SkeletonEnemy(Enemy):
     def __init__(self, pos, size=(48, 48)):
@@ -23,10 +26,8 @@ class SkeletonEnemy(Enemy):
         self.death_last_frame_hold = 0.5  # 最后一帧停留0.5秒
         self.death_last_frame_timer = 0
         
-        # 动画相关
-        print("开始加载骷髅动画帧...")
-        self.frames = self._load_all_frames()
-        print("骷髅动画帧加载完成")
+        # 动画相关：所有骷髅共用一份帧，只有第一只生成时加载
+        self.frames = asset_registry.get("skeleton.frames", self._load_all_frames)
         
         self.frame_idx = 0
         self.frame_timer = 0
@@ -63,48 +64,43 @@ class SkeletonEnemy(Enemy):
             self.rect.topleft = pos
             print("警告：无法加载骷髅动画帧，使用默认图像")
 
+    def _load_sequence(self, base_dir, prefix):
+        """prefix_01.png、prefix_02.png...连续的一组帧，有图集时直接取图集里的"""
+        frames = sprite_atlas.frames("skeleton", f"{sprite_atlas.group_name(base_dir)}/{prefix}")
+        if frames is not None:
+            return frames
+        frames = []
+        idx = 1
+        while True:
+            fname = f"{prefix}_{idx:02d}.png"
+            fpath = os.path.join(base_dir, fname)
+            if not os.path.exists(fpath):
+                break
+            try:
+                frame = pygame.image.load(fpath).convert_alpha()
+                frames.append(frame)
+            except Exception as e:
+                print(f"加载帧失败 {fpath}: {e}")
+                break
+            idx += 1
+        return frames
+
     def _load_frames(self, action):
         frames = {}
         base_dir = "assets/characters/skeleton_frames"
         if action == "death":
             # 死亡动画不分方向
-            frames["none"] = []
-            idx = 1
-            while True:
-                fname = f"death_{idx:02d}.png"
-                fpath = os.path.join(base_dir, fname)
-                if not os.path.exists(fpath):
-                    break
-                try:
-                    frame = pygame.image.load(fpath).convert_alpha()
-                    frames["none"].append(frame)
-                except Exception as e:
-                    print(f"加载帧失败 {fpath}: {e}")
-                    break
-                idx += 1
+            frames["none"] = tuple(self._load_sequence(base_dir, "death"))
         else:
             directions = ["down", "right", "up", "left"]
             for direction in directions:
-                frames[direction] = []
-                idx = 1
-                while True:
-                    fname = f"{action}_{direction}_{idx:02d}.png"
-                    fpath = os.path.join(base_dir, fname)
-                    if not os.path.exists(fpath):
-                        break
-                    try:
-                        frame = pygame.image.load(fpath).convert_alpha()
-                        frames[direction].append(frame)
-                    except Exception as e:
-                        print(f"加载帧失败 {fpath}: {e}")
-                        break
-                    idx += 1
+                frames[direction] = tuple(self._load_sequence(base_dir, f"{action}_{direction}"))
                 if direction == "left" and not frames["left"] and frames["right"]:
-                    frames["left"] = [pygame.transform.flip(frame, True, False) for frame in frames["right"]]
+                    frames["left"] = tuple(pygame.transform.flip(frame, True, False) for frame in frames["right"])
         return frames
 
     def _load_all_frames(self):
-        """加载所有动作的动画帧"""
+        """加载所有动作的动画帧（帧列表是元组，多只骷髅共用）"""
         frames = {}
         actions = ["idle", "move", "attack", "hurt", "death"]
         
@@ -122,7 +118,7 @@ class SkeletonEnemy(Enemy):
             return
             
         # 更新动画计时器
-        self.frame_timer += 0.016  # 假设60FPS
+        self.frame_timer += game_clock.dt()
         
         # 如果正在死亡，只更新死亡动画
         if self.is_dying:
@@ -199,7 +195,7 @@ class SkeletonEnemy(Enemy):
             interval = 0.28
         else:
             interval = self.frame_interval
-        self.frame_timer += 0.016
+        self.frame_timer += game_clock.dt()
         if self.frame_timer >= interval:
             self.frame_timer = 0
             self.frame_idx = (self.frame_idx + 1) % len(frames)
@@ -228,7 +224,7 @@ class SkeletonEnemy(Enemy):
         is_last_frame = self.frame_idx == len(frames) - 1
 
         # 帧切换
-        self.frame_timer += 0.016
+        self.frame_timer += game_clock.dt()
         if self.frame_timer >= interval and not is_last_frame:
             self.frame_timer = 0
             self.frame_idx += 1
@@ -237,7 +233,7 @@ class SkeletonEnemy(Enemy):
 
         # 最后一帧停留
         if is_last_frame:
-            self.attack_anim_timer += 0.016
+            self.attack_anim_timer += game_clock.dt()
             if not hasattr(self, '_attack_damage_applied'):
                 self._attack_damage_applied = True
                 if self.attack_rect.colliderect(self.target_player.rect):
@@ -254,7 +250,7 @@ class SkeletonEnemy(Enemy):
 
     def _update_hurt_animation(self):
         """更新受伤动画"""
-        self.hurt_anim_timer += 0.016
+        self.hurt_anim_timer += game_clock.dt()
         if self.hurt_anim_timer >= self.hurt_anim_duration:
             self.is_hurt = False
             self.hurt_anim_timer = 0
@@ -266,7 +262,7 @@ class SkeletonEnemy(Enemy):
     def _update_death_animation(self):
         """更新死亡动画"""
         frames = self.frames["death"]["none"]
-        self.death_anim_timer += 0.016
+        self.death_anim_timer += game_clock.dt()
         if not frames:
             self.alive = False
             return
@@ -275,7 +271,7 @@ class SkeletonEnemy(Enemy):
             self._update_image()
         else:
             # 最后一帧停留
-            self.death_last_frame_timer += 0.016
+            self.death_last_frame_timer += game_clock.dt()
             if self.death_last_frame_timer >= self.death_last_frame_hold or self.death_anim_timer >= self.death_anim_duration:
                 self.alive = False
             else:
@@ -302,14 +298,14 @@ class SkeletonEnemy(Enemy):
 
     def try_attack(self, player):
         """尝试攻击玩家"""
-        if not self.attacking and time.time() - self.last_attack_time >= self.attack_cooldown:
+        if not self.attacking and game_clock.now() - self.last_attack_time >= self.attack_cooldown:
             # 生成攻击判定区域
             self.attack_rect = self.generate_attack_rect()
             self.attacking = True
             self.action = "attack"
             self.frame_idx = 0
             self.attack_anim_timer = 0
-            self.last_attack_time = time.time()
+            self.last_attack_time = game_clock.now()
             self.target_player = player  # 记录本次攻击的目标
         return False
 
@@ -345,32 +341,33 @@ class SkeletonEnemy(Enemy):
         bar_x = x + (self.rect.width - bar_width) // 2
         self.draw_health_bar(surface, bar_x, y - 10, bar_width, 6)
         if show_debug_hitbox:
-            debug_rect = pygame.Surface((self.rect.width - 12, self.rect.height - 12), pygame.SRCALPHA)
-            pygame.draw.rect(debug_rect, (255, 0, 0, 128), debug_rect.get_rect())
+            debug_rect = sprite_cache.rect((self.rect.width - 12, self.rect.height - 12), (255, 0, 0), 128)
             surface.blit(debug_rect, (x + 6, y + 6))
             if self.attacking:
                 attack_rect = self.attack_rect.move(-camera_x, -camera_y)
                 pygame.draw.rect(surface, (255, 0, 0, 128), attack_rect, 2)
 
     def chase_player(self, dx, dy, dist, is_valid_position):
-        """追踪玩家的移动逻辑（只能上下左右单轴移动，有碰撞检测）"""
+        """追踪玩家的移动逻辑（只能上下左右单轴移动，有碰撞检测）
+
+        有流场时沿流场走向下一格，能绕过墙壁；和玩家同格或流场不可达时直接朝玩家走。
+        """
         if dist == 0:
             return
+        if self.flow_field:
+            step = self.flow_field.next_step(self.rect.center)
+            if step is not None:
+                dx = step[0] - self.rect.centerx
+                dy = step[1] - self.rect.centery
         # 优先移动距离更远的轴
         if abs(dx) > abs(dy):
-            move_x = self.move_speed * (1 if dx > 0 else -1)
-            next_x = self.float_x + move_x
-            if is_valid_position(int(next_x + self.rect.width//2), int(self.float_y + self.rect.height//2)):
-                self.float_x = next_x
+            move_with_collision(self, self.move_speed * (1 if dx > 0 else -1), 0, is_valid_position)
         else:
-            move_y = self.move_speed * (1 if dy > 0 else -1)
-            next_y = self.float_y + move_y
-            if is_valid_position(int(self.float_x + self.rect.width//2), int(next_y + self.rect.height//2)):
-                self.float_y = next_y
+            move_with_collision(self, 0, self.move_speed * (1 if dy > 0 else -1), is_valid_position)
 
     def patrol(self, is_valid_position):
         """巡逻行为的移动逻辑（只能单轴移动，有碰撞检测）"""
-        now = time.time()
+        now = game_clock.now()
         if now - self.patrol_timer > self.patrol_interval:
             self.patrol_dir *= -1
             self.patrol_axis = 'y' if self.patrol_axis == 'x' else 'x'
@@ -389,10 +386,6 @@ class SkeletonEnemy(Enemy):
             self.patrol_dir *= -1
         # 只允许单轴移动并检测碰撞
         if move_x != 0:
-            next_x = self.float_x + move_x
-            if is_valid_position(int(next_x + self.rect.width//2), int(self.float_y + self.rect.height//2)):
-                self.float_x = next_x
+            move_with_collision(self, move_x, 0, is_valid_position)
         elif move_y != 0:
-            next_y = self.float_y + move_y
-            if is_valid_position(int(self.float_x + self.rect.width//2), int(next_y + self.rect.height//2)):
-                self.float_y = next_y 
\ No newline at end of file
+            move_with_collision(self, 0, move_y, is_valid_position) 
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""均匀网格空间索引：按格子登记实体的矩形，矩形/半径查询只看覆盖到的格子
+
+查询结果按登记顺序返回，和原来按列表顺序遍历的结果一致，模拟保持可复现。
+"""
+import math
+
+
+class SpatialHash:
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = {}  # (cx, cy) -> {实体: None}，dict保持插入顺序
+        self.entries = {}  # 实体 -> [登记序号, (left, top, right, bottom), (cx0, cy0, cx1, cy1)]
+        self._next_seq = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, obj):
+        return obj in self.entries
+
+    def _cell_range(self, left, top, right, bottom):
+        size = self.cell_size
+        return left // size, top // size, (right - 1) // size, (bottom - 1) // size
+
+    def insert(self, obj, rect):
+        """登记或更新实体obj的矩形（pygame.Rect或带left/top/right/bottom的对象）"""
+        bounds = (rect.left, rect.top, rect.right, rect.bottom)
+        span = self._cell_range(*bounds)
+        entry = self.entries.get(obj)
+        if entry is not None:
+            entry[1] = bounds
+            if entry[2] == span:
+                return
+            self._unlink(obj, entry[2])
+            entry[2] = span
+        else:
+            self.entries[obj] = [self._next_seq, bounds, span]
+            self._next_seq += 1
+        cells = self.cells
+        cx0, cy0, cx1, cy1 = span
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    bucket = cells[(cx, cy)] = {}
+                bucket[obj] = None
+
+    update = insert
+
+    def remove(self, obj):
+        entry = self.entries.pop(obj, None)
+        if entry is not None:
+            self._unlink(obj, entry[2])
+
+    def clear(self):
+        self.cells.clear()
+        self.entries.clear()
+
+    def _unlink(self, obj, span):
+        cells = self.cells
+        cx0, cy0, cx1, cy1 = span
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is not None:
+                    bucket.pop(obj, None)
+                    if not bucket:
+                        del cells[(cx, cy)]
+
+    def _candidates(self, left, top, right, bottom):
+        cells = self.cells
+        cx0, cy0, cx1, cy1 = self._cell_range(left, top, right, bottom)
+        if cx0 == cx1 and cy0 == cy1:
+            return cells.get((cx0, cy0), {})
+        found = {}
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.update(bucket)
+        return found
+
+    def query_rect(self, rect, margin=0):
+        """与rect（四周各扩margin像素）相交的实体，按登记顺序"""
+        left, top = rect.left - margin, rect.top - margin
+        right, bottom = rect.right + margin, rect.bottom + margin
+        if right <= left or bottom <= top:
+            return []
+        entries = self.entries
+        hits = []
+        for obj in self._candidates(left, top, right, bottom):
+            entry = entries[obj]
+            l, t, r, b = entry[1]
+            if l < right and left < r and t < bottom and top < b:
+                hits.append((entry[0], obj))
+        hits.sort(key=lambda hit: hit[0])
+        return [obj for _, obj in hits]
+
+    def query_radius(self, x, y, radius):
+        """矩形与圆(x, y, radius)相交的实体，按登记顺序"""
+        left, top = math.floor(x - radius), math.floor(y - radius)
+        right, bottom = math.floor(x + radius) + 1, math.floor(y + radius) + 1
+        entries = self.entries
+        r2 = radius * radius
+        hits = []
+        for obj in self._candidates(left, top, right, bottom):
+            entry = entries[obj]
+            l, t, r, b = entry[1]
+            # 圆心到矩形的最近点
+            nx = l if x < l else r if x > r else x
+            ny = t if y < t else b if y > b else y
+            if (nx - x) ** 2 + (ny - y) ** 2 <= r2:
+                hits.append((entry[0], obj))
+        hits.sort(key=lambda hit: hit[0])
+        return [obj for _, obj in hits]
@@ -0,0 +1,224 @@
+"""敌人出生点索引：地图内圈可通行格子的集合，随碰撞地图修改同步
+
+出生点按格子左上角的像素坐标计算，离玩家的距离要大于min_distance（和原来的逐格扫描一致）。
+先在可通行格子里做拒绝采样，连续失败（玩家排除区域占了大半张图）时按分桶精确计数再抽，
+所以每次出生的开销和地图大小基本无关。
+"""
+import re
+import random
+from array import array
+
+_OPEN = re.compile(b"\x00")
+
+
+class SpawnZone:
+    """加权出生区域，rect为格子矩形(x0, y0, x1, y1)（含端点）"""
+
+    def __init__(self, name, rect, weight=1.0):
+        self.name = name
+        self.rect = rect
+        self.weight = weight
+
+
+class SpawnIndex:
+    REJECTION_TRIES = 32
+
+    def __init__(self, map_manager, bucket_size=16):
+        self.map_manager = map_manager
+        self.bucket_size = bucket_size
+        self.zones = []  # 为空时整张图均匀抽取
+        self._grid = None
+        self._grid_version = -1
+        map_manager.add_collision_listener(self._on_collision_changed)
+
+    def close(self):
+        self.map_manager.remove_collision_listener(self._on_collision_changed)
+
+    def add_zone(self, name, rect, weight=1.0):
+        """添加加权出生区域；有区域时先按权重选区域，再在区域内抽格子"""
+        self.zones.append(SpawnZone(name, rect, weight))
+
+    def remove_zone(self, name):
+        self.zones = [zone for zone in self.zones if zone.name != name]
+
+    def __len__(self):
+        self._sync()
+        return len(self.tiles)
+
+    # ---- 索引维护 ----
+
+    def _sync(self):
+        grid = self.map_manager.collision_map
+        if grid is not self._grid or grid.version != self._grid_version:
+            # 第一次使用、网格被替换，或没有经过MapManager通知就被修改了
+            self._rebuild(grid)
+        return grid
+
+    def _rebuild(self, grid):
+        width, height = grid.width, grid.height
+        size = self.bucket_size
+        self._grid = grid
+        self._grid_version = grid.version
+        self.width, self.height = width, height
+        self.bucket_cols = (width + size - 1) // size
+        self.bucket_counts = array('i', [0]) * (self.bucket_cols * ((height + size - 1) // size))
+        self.tiles = array('i')  # 可通行格子下标，删除时和末尾交换
+        self.slot = array('i', [-1]) * (width * height)  # 格子在tiles里的位置，-1表示不在
+        cells = grid.cells
+        tiles = self.tiles
+        counts = self.bucket_counts
+        for y in range(1, height - 1):
+            base = y * width
+            row = bytes(cells[base + 1:base + width - 1])
+            tiles.extend([base + 1 + m.start() for m in _OPEN.finditer(row)])
+            # 这一行在每个桶里的可通行格子数，row[k]对应x=k+1
+            bucket_base = y // size * self.bucket_cols
+            for bx in range(self.bucket_cols):
+                lo, hi = max(1, bx * size), min(width - 1, bx * size + size)
+                if lo < hi:
+                    counts[bucket_base + bx] += row.count(0, lo - 1, hi - 1)
+        slot = self.slot
+        for pos, i in enumerate(tiles):
+            slot[i] = pos
+
+    def _bucket_of(self, i):
+        size = self.bucket_size
+        return (i // self.width) // size * self.bucket_cols + (i % self.width) // size
+
+    def _add(self, i):
+        self.slot[i] = len(self.tiles)
+        self.tiles.append(i)
+        self.bucket_counts[self._bucket_of(i)] += 1
+
+    def _discard(self, i):
+        pos = self.slot[i]
+        last = self.tiles.pop()
+        if last != i:
+            self.tiles[pos] = last
+            self.slot[last] = pos
+        self.slot[i] = -1
+        self.bucket_counts[self._bucket_of(i)] -= 1
+
+    def _on_collision_changed(self, x0, y0, x1, y1):
+        grid = self.map_manager.collision_map
+        if grid is not self._grid:
+            return  # 还没建过或网格已换，下次_sync整体重建
+        width, cells, slot = self.width, grid.cells, self.slot
+        for y in range(max(1, y0), min(self.height - 2, y1) + 1):
+            for x in range(max(1, x0), min(width - 2, x1) + 1):
+                i = y * width + x
+                if cells[i] and slot[i] >= 0:
+                    self._discard(i)
+                elif not cells[i] and slot[i] < 0:
+                    self._add(i)
+        self._grid_version = grid.version
+
+    # ---- 抽样 ----
+
+    def sample(self, player_pos, min_distance, rng=random):
+        """抽一个离player_pos超过min_distance像素的出生点（像素坐标），没有时返回None"""
+        self._sync()
+        if self.zones:
+            zones = list(self.zones)
+            while zones:
+                total = sum(zone.weight for zone in zones)
+                if total <= 0:
+                    break
+                pick = rng.random() * total
+                for zone in zones:
+                    pick -= zone.weight
+                    if pick < 0:
+                        break
+                pos = self._sample_rect(zone.rect, player_pos, min_distance, rng)
+                if pos is not None:
+                    return pos
+                zones.remove(zone)  # 这个区域里没有合适的格子，换一个
+            return None
+        tiles = self.tiles
+        if not tiles:
+            return None
+        for _ in range(self.REJECTION_TRIES):
+            i = tiles[rng.randrange(len(tiles))]
+            pos = self._far_enough(i, player_pos, min_distance)
+            if pos is not None:
+                return pos
+        return self._sample_exact((1, 1, self.width - 2, self.height - 2), player_pos, min_distance, rng)
+
+    def _far_enough(self, i, player_pos, min_distance):
+        tw, th = self.map_manager.tile_width, self.map_manager.tile_height
+        pos_x = (i % self.width) * tw
+        pos_y = (i // self.width) * th
+        if min_distance < 0 or (pos_x - player_pos[0]) ** 2 + (pos_y - player_pos[1]) ** 2 > min_distance ** 2:
+            return pos_x, pos_y
+        return None
+
+    def _sample_rect(self, rect, player_pos, min_distance, rng):
+        x0, y0, x1, y1 = rect
+        x0, y0 = max(1, x0), max(1, y0)
+        x1, y1 = min(self.width - 2, x1), min(self.height - 2, y1)
+        if x0 > x1 or y0 > y1:
+            return None
+        slot, width = self.slot, self.width
+        for _ in range(self.REJECTION_TRIES):
+            i = rng.randint(y0, y1) * width + rng.randint(x0, x1)
+            if slot[i] >= 0:
+                pos = self._far_enough(i, player_pos, min_distance)
+                if pos is not None:
+                    return pos
+        return self._sample_exact((x0, y0, x1, y1), player_pos, min_distance, rng)
+
+    def _sample_exact(self, rect, player_pos, min_distance, rng):
+        """按桶精确计数：整桶都在排除圆外的直接用计数，跨圆边界或被rect截断的桶逐格检查"""
+        x0, y0, x1, y1 = rect
+        size, width = self.bucket_size, self.width
+        tw, th = self.map_manager.tile_width, self.map_manager.tile_height
+        px, py = player_pos
+        d2 = min_distance ** 2 if min_distance >= 0 else -1
+        candidates = []  # (权重, 整桶的格子矩形或逐格筛出的格子下标列表, 是否为列表)
+        total = 0
+        for by in range(y0 // size, y1 // size + 1):
+            for bx in range(x0 // size, x1 // size + 1):
+                count = self.bucket_counts[by * self.bucket_cols + bx]
+                if not count:
+                    continue
+                full = (bx * size, by * size, min(bx * size + size, self.width) - 1, min(by * size + size, self.height) - 1)
+                sub = (max(x0, full[0]), max(y0, full[1]), min(x1, full[2]), min(y1, full[3]))
+                # 桶内格子左上角像素坐标的范围，离玩家的最近/最远距离
+                lx, hx, ly, hy = sub[0] * tw, sub[2] * tw, sub[1] * th, sub[3] * th
+                nx = lx if px < lx else hx if px > hx else px
+                ny = ly if py < ly else hy if py > hy else py
+                near2 = (nx - px) ** 2 + (ny - py) ** 2
+                far2 = max((lx - px) ** 2, (hx - px) ** 2) + max((ly - py) ** 2, (hy - py) ** 2)
+                if far2 <= d2:
+                    continue
+                if near2 > d2 and sub == full:
+                    candidates.append((count, sub, False))
+                    total += count
+                    continue
+                eligible = self._eligible_in(sub, player_pos, min_distance)
+                if eligible:
+                    candidates.append((len(eligible), eligible, True))
+                    total += len(eligible)
+        if not total:
+            return None
+        pick = rng.randrange(total)
+        for weight, area, listed in candidates:
+            if pick < weight:
+                break
+            pick -= weight
+        if listed:
+            i = area[pick]
+        else:
+            i = self._eligible_in(area, None, 0)[pick]
+        return (i % width) * tw, (i // width) * th
+
+    def _eligible_in(self, rect, player_pos, min_distance):
+        x0, y0, x1, y1 = rect
+        slot, width = self.slot, self.width
+        found = []
+        for y in range(y0, y1 + 1):
+            for x in range(x0, x1 + 1):
+                i = y * width + x
+                if slot[i] >= 0 and (player_pos is None or self._far_enough(i, player_pos, min_distance)):
+                    found.append(i)
+        return found
@@ -1,5 +1,18 @@
-from PIL import Image
+"""把精灵表拆成单帧PNG，以及把各角色的单帧打包成图集
+
+    python split_player_sheet.py          拆分骷髅精灵表到skeleton_frames
+    python split_player_sheet.py --atlas  把player_frames、transform/*、skeleton_frames分别打包成
+                                          assets/characters/atlas/下的大图+JSON索引（sprite_atlas读取）
+
+改了任何单帧之后要重新打包图集，否则游戏里读到的还是旧图集。
+"""
+import argparse
+import json
 import os
+import re
+
+from PIL import Image
+
 
 sheet_path = "assets/characters/skeleton.png"  # 骷髅精灵表图片
 output_dir = "assets/characters/skeleton_frames"  # 输出目录改为skeleton_frames
@@ -31,47 +44,162 @@ left_actions = [
     "hurt"
 ]
 
-os.makedirs(output_dir, exist_ok=True)
-sheet = Image.open(sheet_path)
-sheet_w, sheet_h = sheet.size
-frames_per_row = sheet_w // frame_w
-
-# 存储向右动作的帧，用于生成向左动作
-right_frames = {}
-
-for action, row_start, row_end in actions:
-    frame_idx = 0
-    frames = []
-    for row in range(row_start, row_end + 1):
-        # 根据动作类型决定每行的帧数
-        if action.startswith('attack'):
-            frames_count = 4  # 攻击动作4帧
-        elif action == 'death':
-            frames_count = 6  # 死亡动作6帧
-        else:
-            frames_count = frames_per_row  # 其他动作使用完整行
+
+def split_sheet():
+    os.makedirs(output_dir, exist_ok=True)
+    sheet = Image.open(sheet_path)
+    sheet_w, sheet_h = sheet.size
+    frames_per_row = sheet_w // frame_w
+
+    # 存储向右动作的帧，用于生成向左动作
+    right_frames = {}
+
+    for action, row_start, row_end in actions:
+        frame_idx = 0
+        frames = []
+        for row in range(row_start, row_end + 1):
+            # 根据动作类型决定每行的帧数
+            if action.startswith('attack'):
+                frames_count = 4  # 攻击动作4帧
+            elif action == 'death':
+                frames_count = 6  # 死亡动作6帧
+            else:
+                frames_count = frames_per_row  # 其他动作使用完整行
             
-        for col in range(frames_count):
-            x = col * frame_w
-            y = row * frame_h
-            frame = sheet.crop((x, y, x+frame_w, y+frame_h))
-            frame.save(os.path.join(output_dir, f"{action}_{frame_idx+1:02d}.png"))
-            frames.append(frame)
-            frame_idx += 1
+            for col in range(frames_count):
+                x = col * frame_w
+                y = row * frame_h
+                frame = sheet.crop((x, y, x+frame_w, y+frame_h))
+                frame.save(os.path.join(output_dir, f"{action}_{frame_idx+1:02d}.png"))
+                frames.append(frame)
+                frame_idx += 1
     
-    # 如果是向右的动作，保存帧用于生成向左动作
-    if action.endswith('_right'):
-        base_action = action.replace('_right', '')
-        right_frames[base_action] = frames
-
-# 生成向左动作的帧
-for base_action in left_actions:
-    if base_action in right_frames:
-        frames = right_frames[base_action]
-        for idx, frame in enumerate(frames):
-            # 水平翻转帧
-            flipped_frame = frame.transpose(Image.FLIP_LEFT_RIGHT)
-            flipped_frame.save(os.path.join(output_dir, f"{base_action}_left_{idx+1:02d}.png"))
-
-print(f"已完成拆分，所有帧已保存到 {output_dir}")
-print("注意：向左的动作是通过水平翻转向右的动作生成的")
\ No newline at end of file
+        # 如果是向右的动作，保存帧用于生成向左动作
+        if action.endswith('_right'):
+            base_action = action.replace('_right', '')
+            right_frames[base_action] = frames
+
+    # 生成向左动作的帧
+    for base_action in left_actions:
+        if base_action in right_frames:
+            frames = right_frames[base_action]
+            for idx, frame in enumerate(frames):
+                # 水平翻转帧
+                flipped_frame = frame.transpose(Image.FLIP_LEFT_RIGHT)
+                flipped_frame.save(os.path.join(output_dir, f"{base_action}_left_{idx+1:02d}.png"))
+
+    print(f"已完成拆分，所有帧已保存到 {output_dir}")
+    print("注意：向左的动作是通过水平翻转向右的动作生成的")
+
+
+CHARACTER_DIR = "assets/characters"
+ATLAS_DIR = os.path.join(CHARACTER_DIR, "atlas")
+ATLAS_MAX_WIDTH = 1024
+ATLAS_PADDING = 1  # 帧之间留1像素空隙，缩放绘制时不会采样到相邻帧
+
+# 图集名 -> 打包进去的目录（相对CHARACTER_DIR）
+# 序列目录的帧名是"动作_01.png"这样的编号，按编号连续读到第一个缺号为止，和原来的逐张加载一致；
+# 其他目录里的png按文件名排序作为一组
+ATLASES = {
+    "player": {
+        "sequences": ["player_frames"],
+        "directories": [],
+    },
+    # 变身相关的帧单独一张图集，拿到耄耋之卵之前不用加载
+    "transform": {
+        "sequences": [],
+        "directories": ["transform/idle", "transform/move", "transform/attack", "transform/die",
+                        "transform/hurt", "transform/dash", "transform/bianshen", "transform/skill",
+                        "transform/bullet"],
+    },
+    "skeleton": {
+        "sequences": ["skeleton_frames"],
+        "directories": [],
+    },
+}
+
+_SEQUENCE_NAME = re.compile(r"^(.+)_(\d+)\.png$")
+
+
+def _collect_groups(sequences, directories):
+    """返回[(组名, [帧文件路径...])]，组名是相对CHARACTER_DIR的"目录/动作"或目录本身"""
+    groups = []
+    for directory in sequences:
+        dir_path = os.path.join(CHARACTER_DIR, directory)
+        actions = sorted({m.group(1) for m in map(_SEQUENCE_NAME.match, os.listdir(dir_path)) if m})
+        for action in actions:
+            paths = []
+            idx = 1
+            while os.path.exists(os.path.join(dir_path, f"{action}_{idx:02d}.png")):
+                paths.append(os.path.join(dir_path, f"{action}_{idx:02d}.png"))
+                idx += 1
+            if paths:
+                groups.append((f"{directory}/{action}", paths))
+    for directory in directories:
+        dir_path = os.path.join(CHARACTER_DIR, directory)
+        if not os.path.isdir(dir_path):
+            print(f"警告: 目录不存在 {dir_path}")
+            continue
+        files = sorted(f for f in os.listdir(dir_path) if f.endswith('.png'))
+        groups.append((directory, [os.path.join(dir_path, f) for f in files]))
+    return groups
+
+
+def _pack(sizes, max_width, padding):
+    """货架式装箱：按高度从高到低一行行排，返回每个矩形的位置和图集尺寸"""
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    positions = [None] * len(sizes)
+    x = y = shelf_height = width = 0
+    for i in order:
+        w, h = sizes[i]
+        if x and x + w > max_width:
+            y += shelf_height + padding
+            x = shelf_height = 0
+        positions[i] = (x, y)
+        x += w + padding
+        width = max(width, x - padding)
+        shelf_height = max(shelf_height, h)
+    return positions, (width, y + shelf_height)
+
+
+def build_atlas(name, sequences, directories, output_dir=ATLAS_DIR, max_width=ATLAS_MAX_WIDTH):
+    groups = _collect_groups(sequences, directories)
+    images = {}
+    for _, paths in groups:
+        for path in paths:
+            if path not in images:
+                images[path] = Image.open(path).convert("RGBA")
+    paths = list(images)
+    positions, size = _pack([images[p].size for p in paths], max_width, ATLAS_PADDING)
+    sheet = Image.new("RGBA", size, (0, 0, 0, 0))
+    rects = {}
+    for path, (x, y) in zip(paths, positions):
+        sheet.paste(images[path], (x, y))
+        rects[path] = [x, y, images[path].width, images[path].height]
+
+    os.makedirs(output_dir, exist_ok=True)
+    image_name = f"{name}.png"
+    sheet.save(os.path.join(output_dir, image_name), optimize=True)
+    index = {
+        "image": image_name,
+        "size": list(size),
+        "groups": {group: [rects[p] for p in group_paths] for group, group_paths in groups},
+    }
+    with open(os.path.join(output_dir, f"{name}.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+    print(f"图集 {name}: {len(paths)} 帧, {len(groups)} 组, {size[0]}x{size[1]}")
+
+
+def build_atlases(output_dir=ATLAS_DIR):
+    for name, spec in ATLASES.items():
+        build_atlas(name, spec["sequences"], spec["directories"], output_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="拆分精灵表 / 打包角色图集")
+    parser.add_argument("--atlas", action="store_true", help="把单帧打包成图集，而不是拆分精灵表")
+    args = parser.parse_args()
+    if args.atlas:
+        build_atlases()
+    else:
+        split_sheet()
@@ -0,0 +1,98 @@
+"""角色动画帧图集：split_player_sheet.py --atlas离线把一个角色的几百张单帧打包成一张大图和JSON索引
+
+运行时每个图集只解码一次大图，各帧都是大图的subsurface，省掉逐张exists探测和几百次PNG解码。
+图集不存在或读取失败时frames()返回None，调用方照旧逐张加载单帧。
+"""
+import json
+import os
+
+import preloader
+
+CHARACTER_DIR = "assets/characters"
+ATLAS_DIR = os.path.join(CHARACTER_DIR, "atlas")
+
+
+class TextureAtlas:
+    def __init__(self, sheet, groups):
+        self.sheet = sheet
+        self.groups = groups  # 组名 -> [(x, y, w, h), ...]，组名是相对CHARACTER_DIR的"目录/动作"或目录
+        self._frames = {}
+
+    def __contains__(self, group):
+        return group in self.groups
+
+    def frames(self, group):
+        """group组的帧列表；subsurface只建一次，每次返回新的列表"""
+        frames = self._frames.get(group)
+        if frames is None:
+            frames = [self.sheet.subsurface(rect) for rect in self.groups[group]]
+            self._frames[group] = frames
+        return list(frames)
+
+
+_atlases = {}
+
+
+def load_atlas(name, atlas_dir=ATLAS_DIR):
+    """读取name.json和对应的大图，没有图集时返回None"""
+    index_path = os.path.join(atlas_dir, f"{name}.json")
+    if not os.path.exists(index_path):
+        return None
+    try:
+        with open(index_path, encoding="utf-8") as f:
+            index = json.load(f)
+        sheet = preloader.load_image(os.path.join(atlas_dir, index["image"]))
+        groups = {group: [tuple(rect) for rect in rects] for group, rects in index["groups"].items()}
+    except Exception as e:
+        print(f"加载图集失败 {index_path}: {e}")
+        return None
+    return TextureAtlas(sheet, groups)
+
+
+def image_paths(names=None, atlas_dir=ATLAS_DIR):
+    """图集大图的路径（names为None时是全部图集），给预加载用"""
+    paths = []
+    if not os.path.isdir(atlas_dir):
+        return paths
+    for fname in sorted(os.listdir(atlas_dir)):
+        if not fname.endswith(".json"):
+            continue
+        if names is not None and fname[:-len(".json")] not in names:
+            continue
+        try:
+            with open(os.path.join(atlas_dir, fname), encoding="utf-8") as f:
+                paths.append(os.path.join(atlas_dir, json.load(f)["image"]))
+        except Exception as e:
+            print(f"读取图集索引失败 {fname}: {e}")
+    return paths
+
+
+def get_atlas(name):
+    """进程内每个图集只加载一次"""
+    if name not in _atlases:
+        _atlases[name] = load_atlas(name)
+    return _atlases[name]
+
+
+def set_atlas(name, atlas):
+    """替换name图集（传None表示不用图集、逐张加载），返回旧的"""
+    old = _atlases.get(name)
+    _atlases[name] = atlas
+    return old
+
+
+def clear():
+    _atlases.clear()
+
+
+def group_name(dir_path):
+    """目录路径 -> 图集里的组名"""
+    return os.path.relpath(dir_path, CHARACTER_DIR).replace(os.sep, "/")
+
+
+def frames(name, group):
+    """name图集里group组的帧，没有图集或没有这一组时返回None"""
+    atlas = get_atlas(name)
+    if atlas is None or group not in atlas:
+        return None
+    return atlas.frames(group)
@@ -0,0 +1,176 @@
+"""预渲染贴图缓存：圆、圆环、半透明矩形、冷却扇形等每帧都要画的alpha图形只生成一次
+
+按(形状, 尺寸, 颜色, 透明度档位, ...)缓存，超过内存预算时淘汰最久没用的（LRU），记录命中/未命中次数。
+旋转/缩放后的贴图也放在这里：角度和缩放比例按档位取整，转满一圈之后每帧都不用再做变换。
+所有调用方共用一个缓存（get_cache()），无窗口模拟、测试时可以用set_cache换成自己的。
+"""
+import math
+from collections import OrderedDict
+
+import pygame
+
+
+class SurfaceCache:
+    def __init__(self, max_bytes=32 * 1024 * 1024, alpha_step=4, angle_step=2, scale_step=0.02):
+        self.max_bytes = max_bytes
+        self.alpha_step = alpha_step  # 透明度按档位缓存，肉眼看不出差别
+        self.angle_step = angle_step  # 旋转角度的档位（度）
+        self.scale_step = scale_step  # 缩放比例的档位
+        self.entries = OrderedDict()  # key -> surface，最近使用的在末尾
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def quantize_alpha(self, alpha):
+        alpha = max(0, min(255, int(alpha)))
+        return alpha - alpha % self.alpha_step if alpha < 255 else 255
+
+    def get(self, key, render):
+        """取key对应的贴图，没有时调用render()生成并放入缓存"""
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = render()
+        self.entries[key] = surface
+        self.bytes += surface.get_width() * surface.get_height() * 4
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            _, old = self.entries.popitem(last=False)
+            self.bytes -= old.get_width() * old.get_height() * 4
+            self.evictions += 1
+        return surface
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def circle(self, radius, color, alpha=255, width=0, padding=0):
+        """(2r+2p)见方的贴图，圆心在正中；width>0时为圆环"""
+        alpha = self.quantize_alpha(alpha)
+        key = ("circle", radius, tuple(color[:3]), alpha, width, padding)
+
+        def render():
+            size = radius * 2 + padding * 2
+            surface = pygame.Surface((size, size), pygame.SRCALPHA)
+            pygame.draw.circle(surface, tuple(color[:3]) + (alpha,), (radius + padding, radius + padding), radius, width)
+            return surface
+        return self.get(key, render)
+
+    def rect(self, size, color, alpha=255):
+        """整块填充的半透明矩形（调试碰撞框、文字底色）"""
+        alpha = self.quantize_alpha(alpha)
+        key = ("rect", tuple(size), tuple(color[:3]), alpha)
+
+        def render():
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            surface.fill(tuple(color[:3]) + (alpha,))
+            return surface
+        return self.get(key, render)
+
+    def sector(self, size, end_degrees, color, alpha=255):
+        """size见方贴图里从正上方顺时针扫过end_degrees度的扇形（技能冷却遮罩）"""
+        end_degrees = max(0, min(360, int(end_degrees)))
+        alpha = self.quantize_alpha(alpha)
+        key = ("sector", size, end_degrees, tuple(color[:3]), alpha)
+
+        def render():
+            surface = pygame.Surface((size, size), pygame.SRCALPHA)
+            center = (size // 2, size // 2)
+            radius = size // 2
+            start_angle = -90
+            points = [center]
+            steps = max(6, int(60 * end_degrees / 360))
+            for i in range(steps + 1):
+                angle = math.radians(start_angle + end_degrees * i / steps)
+                points.append((center[0] + radius * math.cos(angle), center[1] + radius * math.sin(angle)))
+            pygame.draw.polygon(surface, tuple(color[:3]) + (alpha,), points)
+            return surface
+        return self.get(key, render)
+
+    def quantize_angle(self, angle):
+        step = self.angle_step
+        return int(round(angle / step)) * step % 360
+
+    def quantize_scale(self, scale):
+        step = self.scale_step
+        return max(1, int(round(scale / step))) * step
+
+    def rotate(self, surface, angle):
+        """pygame.transform.rotate，角度按angle_step取整"""
+        angle = self.quantize_angle(angle)
+        return self.get(("rotate", surface, angle), lambda: pygame.transform.rotate(surface, angle))
+
+    def rotozoom(self, surface, angle, scale):
+        """pygame.transform.rotozoom，角度和缩放比例都取整到档位"""
+        angle = self.quantize_angle(angle)
+        scale = round(self.quantize_scale(scale), 6)
+        return self.get(("rotozoom", surface, angle, scale), lambda: pygame.transform.rotozoom(surface, angle, scale))
+
+    def smoothscale(self, surface, size):
+        """pygame.transform.smoothscale到固定尺寸；调用方应先把尺寸取整到有限的几档"""
+        size = (int(size[0]), int(size[1]))
+        return self.get(("smoothscale", surface, size), lambda: pygame.transform.smoothscale(surface, size))
+
+    def rotated_rect(self, surface, angle, center):
+        """surface旋转angle度后以center为中心的外接矩形（和rotate取同一张缓存贴图）"""
+        return self.rotate(surface, angle).get_rect(center=center)
+
+
+_cache = SurfaceCache()
+
+
+def get_cache():
+    return _cache
+
+
+def set_cache(cache):
+    """替换共用的缓存，返回旧缓存"""
+    global _cache
+    old = _cache
+    _cache = cache
+    return old
+
+
+def circle(radius, color, alpha=255, width=0, padding=0):
+    return _cache.circle(radius, color, alpha, width, padding)
+
+
+def rect(size, color, alpha=255):
+    return _cache.rect(size, color, alpha)
+
+
+def sector(size, end_degrees, color, alpha=255):
+    return _cache.sector(size, end_degrees, color, alpha)
+
+
+def rotate(surface, angle):
+    return _cache.rotate(surface, angle)
+
+
+def rotozoom(surface, angle, scale):
+    return _cache.rotozoom(surface, angle, scale)
+
+
+def smoothscale(surface, size):
+    return _cache.smoothscale(surface, size)
+
+
+def rotated_rect(surface, angle, center):
+    return _cache.rotated_rect(surface, angle, center)
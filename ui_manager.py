@@ -1,6 +1,9 @@
 import pygame
 import time
 import math
+import game_clock
+import sprite_cache
+import preloader
 import os
 from game_state import GameStateManager
 
@@ -32,9 +35,12 @@ class UIManager:
         self.boss_warning_duration = 2.0
         
         try:
-            self.boss_warning_img = pygame.image.load("assets/title/Bosswarning.png").convert_alpha()
+            self.boss_warning_img = preloader.load_image("assets/title/Bosswarning.png")
         except Exception as e:
             print(f"Boss提示图片加载失败: {e}")
+
+        # 技能按钮上按键字母用的字体
+        self.key_font = pygame.font.Font(None, 28)
         
     def draw_fps(self, surface):
         self.fps_counter += 1
@@ -59,7 +65,7 @@ class UIManager:
         
         # 绘制开发者控制台提示
         if self.game_state_manager and self.game_state_manager.console_tip and \
-           time.time() - self.game_state_manager.console_tip_timer < 2.0:
+           game_clock.now() - self.game_state_manager.console_tip_timer < 2.0:
             tip_text = self.font.render(self.game_state_manager.console_tip, True, (0, 255, 0))
             tip_rect = tip_text.get_rect(center=(self.window_width//2, 50))
             # 绘制半透明背景
@@ -75,7 +81,7 @@ class UIManager:
         
     def draw_boss_warning(self, surface):
         if self.boss_warning_img and self.boss_warning_timer > 0:
-            elapsed = time.time() - self.boss_warning_timer
+            elapsed = game_clock.now() - self.boss_warning_timer
             if elapsed < self.boss_warning_duration:
                 # 缩放图片
                 scale = 0.6
@@ -93,5 +99,120 @@ class UIManager:
             else:
                 self.boss_warning_timer = 0
         
+    def draw_skill_button(self, surface, icon, x, y, label, label_color, remain=0, total=0,
+                          base_icon=None, icon_size=48, base_offset=6):
+        """绘制一个技能按钮：底座、图标、冷却扇形遮罩和右下角的按键字母"""
+        if base_icon:
+            base_size = icon_size + base_offset * 2
+            scaled_base = pygame.transform.smoothscale(base_icon, (base_size, base_size))
+            surface.blit(scaled_base, (x - base_offset, y - base_offset))
+        scaled_icon = pygame.transform.smoothscale(icon, (icon_size, icon_size))
+        surface.blit(scaled_icon, (x, y))
+        # 冷却扇形遮罩
+        if remain > 0 and total > 0:
+            ratio = remain / total
+            mask_surf = sprite_cache.sector(icon_size, 360 * ratio, (0, 0, 0), 120)
+            surface.blit(mask_surf, (x, y))
+        text = self.key_font.render(label, True, label_color)
+        text_rect = text.get_rect(bottomright=(x + icon_size - 4, y + icon_size - 2))
+        text_bg = sprite_cache.rect((text_rect.width+6, text_rect.height+2), (0, 0, 0), 120)
+        surface.blit(text_bg, (text_rect.x-3, text_rect.y-1))
+        surface.blit(text, text_rect)
+
     def trigger_boss_warning(self):
-        self.boss_warning_timer = time.time() 
\ No newline at end of file
+        self.boss_warning_timer = game_clock.now() 
+
+class SkillSlot:
+    """技能栏上的一个按钮：按键字母、颜色、图标，以及从Player读冷却/是否显示的函数"""
+
+    def __init__(self, label, color, icon, cooldown, visible=None, row=0, column=0):
+        self.label = label
+        self.color = color
+        self.icon = icon
+        self.cooldown = cooldown  # player -> (剩余冷却, 总冷却)
+        self.visible = visible  # player -> bool，None表示总是显示
+        self.row = row  # 0为底行，1为上面一行
+        self.column = column  # 从左数第几列
+
+
+class SkillBar:
+    """右下角的技能栏
+
+    图标和底座只缩放一次，按键字母和底色渲染一次，冷却遮罩是预先算好的SECTOR_STEPS张扇形贴图。
+    整个技能栏先合成到一张贴图上，只有某个按钮的显示状态或冷却档位变化时才重新合成，其余帧只blit一次。
+    """
+    SECTOR_STEPS = 60
+
+    def __init__(self, window_width, window_height, slots, key_font, base_icon=None,
+                 icon_size=48, gap=18, base_offset=6, margin=20):
+        self.slots = slots
+        self.icon_size = icon_size
+        self.gap = gap
+        self.base_offset = base_offset
+        columns = max((slot.column for slot in slots), default=0) + 1
+        rows = max((slot.row for slot in slots), default=0) + 1
+        self.rows = rows
+        # 图标离窗口右下角margin像素，贴图四周再留出底座超出图标的部分
+        content_width = columns * icon_size + (columns - 1) * gap
+        content_height = rows * icon_size + (rows - 1) * gap
+        self.topleft = (window_width - margin - content_width - base_offset,
+                        window_height - margin - content_height - base_offset)
+        self.surface = pygame.Surface((content_width + base_offset * 2, content_height + base_offset * 2),
+                                      pygame.SRCALPHA)
+        self.icons = {slot.label: pygame.transform.smoothscale(slot.icon, (icon_size, icon_size))
+                      for slot in slots if slot.icon}
+        base_size = icon_size + base_offset * 2
+        self.base = pygame.transform.smoothscale(base_icon, (base_size, base_size)) if base_icon else None
+        self.masks = [None] + [sprite_cache.sector(icon_size, 360 * i / self.SECTOR_STEPS, (0, 0, 0), 120)
+                               for i in range(1, self.SECTOR_STEPS + 1)]
+        self.labels = {}
+        for slot in slots:
+            text = key_font.render(slot.label, True, slot.color)
+            text_rect = text.get_rect(bottomright=(icon_size - 4, icon_size - 2))
+            text_bg = pygame.Surface((text_rect.width + 6, text_rect.height + 2), pygame.SRCALPHA)
+            text_bg.fill((0, 0, 0, 120))
+            self.labels[slot.label] = (text_bg, (text_rect.x - 3, text_rect.y - 1), text, text_rect.topleft)
+        self._state = None
+        self.redraw_count = 0
+
+    def slot_position(self, slot):
+        """按钮图标左上角在技能栏贴图里的坐标"""
+        x = self.base_offset + slot.column * (self.icon_size + self.gap)
+        y = self.base_offset + (self.rows - 1 - slot.row) * (self.icon_size + self.gap)
+        return x, y
+
+    def _bucket(self, remain, total):
+        if remain <= 0 or total <= 0:
+            return 0
+        return min(self.SECTOR_STEPS, math.ceil(remain / total * self.SECTOR_STEPS))
+
+    def update(self, player):
+        """按玩家当前的冷却更新档位，有变化时重新合成；返回是否重新合成了"""
+        state = tuple(
+            self._bucket(*slot.cooldown(player)) if slot.label in self.icons and
+            (slot.visible is None or slot.visible(player)) else -1
+            for slot in self.slots
+        )
+        if state == self._state:
+            return False
+        self._state = state
+        self.redraw_count += 1
+        surface = self.surface
+        surface.fill((0, 0, 0, 0))
+        for slot, bucket in zip(self.slots, state):
+            if bucket < 0:
+                continue
+            x, y = self.slot_position(slot)
+            if self.base:
+                surface.blit(self.base, (x - self.base_offset, y - self.base_offset))
+            surface.blit(self.icons[slot.label], (x, y))
+            if bucket:
+                surface.blit(self.masks[bucket], (x, y))
+            text_bg, bg_pos, text, text_pos = self.labels[slot.label]
+            surface.blit(text_bg, (x + bg_pos[0], y + bg_pos[1]))
+            surface.blit(text, (x + text_pos[0], y + text_pos[1]))
+        return True
+
+    def draw(self, surface, player):
+        self.update(player)
+        surface.blit(self.surface, self.topleft)
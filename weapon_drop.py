@@ -1,25 +1,33 @@
 import pygame
-import time
+import game_clock
+import sprite_cache
+import asset_registry
+import preloader
 
 class WeaponDrop:
     def __init__(self, pos, img_path="assets/weapon/swd2.png"):
         self.pos = pos
         self.rect = pygame.Rect(pos[0]-16, pos[1]-16, 32, 32)
         self.image_path = img_path  # 保存图片路径
-        try:
-            self.image = pygame.image.load(img_path).convert_alpha()
-            self.image = pygame.transform.scale(self.image, (32, 32))
-        except Exception as e:
-            print(f"加载武器图片时出错: {e}")
-            self.image = pygame.Surface((32, 32), pygame.SRCALPHA)
-            pygame.draw.rect(self.image, (255, 215, 0), (0, 0, 32, 32))
+        # 同一张武器图所有掉落物共用，不再每次掉落都重新加载缩放
+        self.image = asset_registry.get(("weapon_drop", img_path), lambda: self._load_image(img_path))
         self.hover_offset = 0
         self.hover_speed = 2
         self.hover_direction = 1
         self.glow_alpha = 0
         self.glow_direction = 5
-        self.birth_time = time.time()
+        self.birth_time = game_clock.now()
         
+    @staticmethod
+    def _load_image(img_path):
+        try:
+            return preloader.load_image(img_path, "scale32x32", lambda image: pygame.transform.scale(image, (32, 32)))
+        except Exception as e:
+            print(f"加载武器图片时出错: {e}")
+            image = pygame.Surface((32, 32), pygame.SRCALPHA)
+            pygame.draw.rect(image, (255, 215, 0), (0, 0, 32, 32))
+            return image
+
     def update(self):
         # 上下浮动动画
         self.hover_offset += self.hover_speed * self.hover_direction * 0.05
@@ -33,15 +41,14 @@ class WeaponDrop:
             
     def draw(self, surface, camera_x, camera_y):
         # 绘制光环
-        glow_surf = pygame.Surface((48, 48), pygame.SRCALPHA)
-        pygame.draw.circle(glow_surf, (255, 215, 0, self.glow_alpha), (24, 24), 20)
+        glow_surf = sprite_cache.circle(20, (255, 215, 0), self.glow_alpha, padding=4)
         draw_x = self.pos[0] - camera_x - 24
         draw_y = self.pos[1] - camera_y - 24 + self.hover_offset
         surface.blit(glow_surf, (draw_x, draw_y))
         
         # 绘制旋转后的武器图像
-        angle = (time.time() - self.birth_time) * 20 % 360
-        rotated_img = pygame.transform.rotate(self.image, angle)
+        angle = (game_clock.now() - self.birth_time) * 20 % 360
+        rotated_img = sprite_cache.rotate(self.image, angle)
         rot_rect = rotated_img.get_rect(center=(self.pos[0] - camera_x, self.pos[1] - camera_y + self.hover_offset))
         surface.blit(rotated_img, rot_rect)
         